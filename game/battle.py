@@ -0,0 +1,812 @@
+import heapq
+import os
+import random
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+from .battlestate import BattleState
+from .drops import DropSampler
+from .entities import Ability, BattleEntity, StatusEffect
+from .inventory import InventoryIndex
+from .outcomes import ExpectedOutcomes, OutcomeCdf
+from .scheduler import TurnScheduler
+from .tactics import TacticalSearch, TacticalSnapshot
+from .utils import *
+
+
+class BattleEngine:
+    """Battle rules without any pygame dependency.
+
+    `Game` builds its UI on top of this; `game.sim` drives it headless.
+    """
+
+    def __init__(self, Seed: Optional[int]=None, AutoPersist: bool=True):
+        self.Rng = random.Random(Seed)
+        self.AutoPersist = AutoPersist
+
+        self.QteSpeed = 420.0  # needed before LoadDatabase
+        self.LoadDatabase()
+
+        self.Mode = "Title"  # "Title" | "Battle" | "Dev"
+        self.SubMode = ""
+
+        self.ActiveSave: Optional[Dict] = None
+        self.Inventory: Optional[InventoryIndex] = None  # index over ActiveSave["Inventory"]
+
+        # Battle runtime
+        self.BattleTime = 0.0
+        self.BattleFrame = 0  # headless stepping only; BattleTime == BattleFrame * Dt
+        self.BattleFrozen = False
+        self.BattleState = BattleState()  # HP/MP/timing columns behind every combatant
+        self.PlayerParty: List[BattleEntity] = []
+        self.EnemyParty: List[BattleEntity] = []
+        self.BattleRewards: Dict = {}
+        self.EncounterName = ""
+        self.Scheduler = TurnScheduler()
+        self.StatusExpiries: List[Tuple] = []  # min-heap of (ExpiresAt, seq, entity, status)
+        self.Outcomes = ExpectedOutcomes(self)
+        self.StatusExpirySeq = 0
+
+    # ---------------- Database ----------------
+
+    def LoadDatabase(self):
+        self.EntitiesDb = LoadJson(os.path.join(DataFolder, "Entities.json"), [])
+        self.AbilitiesDb = LoadJson(os.path.join(DataFolder, "Abilities.json"), [])
+        self.ItemsDb = LoadJson(os.path.join(DataFolder, "Items.json"), [])
+        self.AreasDb = LoadJson(os.path.join(DataFolder, "Areas.json"), [])
+        self.EncountersDb = LoadJson(os.path.join(DataFolder, "Encounters.json"), [])
+        self.BalanceDb = LoadJson(os.path.join(DataFolder, "Balance.json"), {})
+        self.StatusesDb = LoadJson(os.path.join(DataFolder, "Statuses.json"), [])
+
+        self.EntitiesByName = {E["Name"]: E for E in self.EntitiesDb}
+        self.AbilitiesByName = {A["Name"]: A for A in self.AbilitiesDb}
+        self.ItemsByName = {I["Name"]: I for I in self.ItemsDb}
+        self.EncountersByName = {C["Name"]: C for C in self.EncountersDb}
+        self.AreasByName = {A["Name"]: A for A in self.AreasDb}
+        # entity name -> (Weights copy, read-only Weights, abilities, drops, {level: (stat block, MP costs)})
+        self.TemplateParts: Dict[str, Tuple] = {}
+        self.StatusesByName = {S["Name"]: S for S in self.StatusesDb}
+        self.StatusByAbility = {S["Granted By"]: S for S in self.StatusesDb if S.get("Granted By")}
+        self.BuildAbilityRegistry()
+        self.DropSamplers: Dict[str, DropSampler] = {}  # entity name -> compiled Drop Table
+        # precision ratio -> enemy outcome CDF; None until the player CDF is first needed.
+        # Both read BalanceDb, so they are rebuilt with it
+        self.EnemyQteCdfs: Dict[float, OutcomeCdf] = {}
+        self.PlayerQteCdfCache: Optional[OutcomeCdf] = None
+
+        self.QteSpeed = float(self.BalanceDb.get("QTE Ring Speed", self.QteSpeed))
+
+    def SaveDatabase(self):
+        SaveJson(os.path.join(DataFolder, "Entities.json"), self.EntitiesDb)
+        SaveJson(os.path.join(DataFolder, "Abilities.json"), self.AbilitiesDb)
+        SaveJson(os.path.join(DataFolder, "Items.json"), self.ItemsDb)
+        SaveJson(os.path.join(DataFolder, "Areas.json"), self.AreasDb)
+        SaveJson(os.path.join(DataFolder, "Encounters.json"), self.EncountersDb)
+        SaveJson(os.path.join(DataFolder, "Balance.json"), self.BalanceDb)
+        SaveJson(os.path.join(DataFolder, "Statuses.json"), self.StatusesDb)
+        self.LoadDatabase()
+
+    # ---------------- Saves ----------------
+
+    def SavePath(self, SlotName: str) -> str:
+        return os.path.join(SavesFolder, SlotName, "Save.json")
+
+    def LoadSave(self, SlotName: str) -> Optional[Dict]:
+        Path = self.SavePath(SlotName)
+        if not os.path.exists(Path):
+            return None
+        return LoadJson(Path, None)
+
+    def NewSaveData(self, SlotName: str) -> Dict:
+        return {
+            "Slot": SlotName,
+            "Gold": 0,
+            "Party": [
+                {"Name": "Hero", "Level": 6, "Xp": 0},
+                {"Name": "Rogue", "Level": 6, "Xp": 0},
+            ],
+            "Inventory": [
+                {"Name": "Potion", "Amount": 2},
+                {"Name": "Ether", "Amount": 1},
+            ],
+            "Area": "Starter Field",
+            "Options": {"Difficulty": "Normal"}
+        }
+
+    def CreateNewSave(self, SlotName: str):
+        EnsureFolder(os.path.join(SavesFolder, SlotName))
+        Save = self.NewSaveData(SlotName)
+        SaveJson(self.SavePath(SlotName), Save)
+        self.ActiveSave = Save
+
+    def PersistSave(self):
+        if not self.ActiveSave or not self.AutoPersist:
+            return
+        EnsureFolder(os.path.join(SavesFolder, self.ActiveSave["Slot"]))
+        SaveJson(self.SavePath(self.ActiveSave["Slot"]), self.ActiveSave)
+
+    # ============================================================
+    # Battle Setup
+    # ============================================================
+
+    def MakeBattleEntity(self, EntityName: str, Team: str, OverrideLevel: Optional[int]=None,
+                         State: Optional[BattleState]=None) -> BattleEntity:
+        T = self.EntitiesByName[EntityName]
+        Level = int(OverrideLevel if OverrideLevel is not None else T.get("Level", 1))
+        # Entities of one template share these, so Weights is read-only; assign a new dict to
+        # change a single entity. Parts are checked against the template's content, so
+        # in-place template edits (tune.py) reach every entity built afterwards.
+        AbilityNames = tuple(T.get("Abilities", []))
+        DropTable = tuple(T.get("Drop Table", []))
+        Parts = self.TemplateParts.get(EntityName)
+        if Parts is None or Parts[0] != T.get("Weights", {}) or Parts[2] != AbilityNames or Parts[3] != DropTable:
+            Copy = dict(T.get("Weights", {}))
+            Parts = (Copy, MappingProxyType(Copy), AbilityNames, DropTable, {})
+            self.TemplateParts[EntityName] = Parts
+        _, Weights, AbilityNames, DropTable, Blocks = Parts
+        E = BattleEntity(
+            Name=T["Name"],
+            Level=Level,
+            Weights=Weights,
+            AbilityNames=AbilityNames,
+            DropTable=DropTable,
+            Team=Team,
+            State=State,
+        )
+        Block = Blocks.get(Level)
+        if Block is None:
+            E.BuildStatBlock()
+            Blocks[Level] = (E.StatBlock, E.MpCosts)
+        else:
+            E.UseStatBlock(*Block)
+        E.CurrentHp = E.MaxHp()
+        E.CurrentMp = E.MaxMp()
+        E.LagHp = E.CurrentHp
+        E.LagMp = E.CurrentMp
+        return E
+
+    def ExpandParty(self, Entries: List) -> List[str]:
+        """Encounter party entries are entity names or {"Name": ..., "Count": n} groups."""
+        Names = []
+        for Entry in Entries:
+            if isinstance(Entry, str):
+                Names.append(Entry)
+            else:
+                Names.extend([Entry["Name"]] * int(Entry.get("Count", 1)))
+        return Names
+
+    def MakeEncounterParties(self, Encounter: Dict, State: Optional[BattleState]=None
+                             ) -> Tuple[List[BattleEntity], List[BattleEntity]]:
+        """Save party plus the encounter's optional "Ally Party" (engine-played) vs its "Enemy Party"."""
+        Players = []
+        for P in self.ActiveSave["Party"]:
+            Name = P["Name"]
+            Level = int(P.get("Level", self.EntitiesByName[Name].get("Level", 1)))
+            Players.append(self.MakeBattleEntity(Name, "Player", OverrideLevel=Level, State=State))
+        for AllyName in self.ExpandParty(Encounter.get("Ally Party", [])):
+            Ally = self.MakeBattleEntity(AllyName, "Player", State=State)
+            Ally.AutoControl = True
+            Players.append(Ally)
+
+        Enemies = [self.MakeBattleEntity(N, "Enemy", State=State) for N in self.ExpandParty(Encounter["Enemy Party"])]
+        return Players, Enemies
+
+    def StartBattleFromArea(self):
+        if not self.ActiveSave:
+            S = self.LoadSave("Slot 1")
+            if not S:
+                self.CreateNewSave("Slot 1")
+            else:
+                self.ActiveSave = S
+
+        AreaName = self.ActiveSave.get("Area", "Starter Field")
+        Area = self.AreasByName.get(AreaName, None)
+        EncounterNames = Area.get("Encounters", []) if Area else []
+        if not EncounterNames:
+            EncounterNames = ["Field Encounter 1"]
+        EncounterName = self.Rng.choice(EncounterNames)
+        self.StartBattle(EncounterName)
+
+    def StartBattle(self, EncounterName: str):
+        Encounter = self.EncountersByName.get(EncounterName)
+        self.EncounterName = EncounterName
+
+        # Fresh columns per battle; rows are allocated in party order
+        self.BattleState = BattleState()
+        self.PlayerParty, self.EnemyParty = self.MakeEncounterParties(Encounter, self.BattleState)
+
+        self.BattleTime = 0.0
+        self.BattleFrame = 0
+        self.BattleFrozen = False
+        self.BattleRewards = {}
+
+        # Initialize starting next-action times using dex bias
+        All = self.PlayerParty + self.EnemyParty
+        AvgDex = sum(e.Stat("Dexterity") for e in All) / max(1, len(All))
+        for E in All:
+            DexRatio = PowRatio(E.Stat("Dexterity"), AvgDex)
+            StartDelay = RoundTenths(max(0.5, 5.0 / max(0.15, DexRatio)))
+            E.NextActionTime = StartDelay
+        self.Scheduler.Reset(self.PlayerParty, self.EnemyParty)
+        self.StatusExpiries = []
+        self.Outcomes.Reset()
+
+        self.Mode = "Battle"
+        self.SubMode = "Free"
+
+    # ============================================================
+    # Abilities / Costs / Effects
+    # ============================================================
+
+    def BuildAbilityRegistry(self):
+        # One shared, immutable Ability per name; only LoadDatabase (and so SaveDatabase) rebuilds it
+        self.AbilityRegistry: Dict[str, Ability] = {}
+        for A in self.AbilitiesDb:
+            self.AbilityRegistry[A["Name"]] = Ability(
+                Name=A["Name"],
+                Kind=A["Kind"],
+                Targeting=A["Targeting"],
+                BaseDelay=float(A["Base Delay"]),
+                Mult=float(A["Mult"]),
+                BaseMpCost=float(A["Base MP Cost"]),
+                Description=A.get("Description", "")
+            )
+
+    def GetAbility(self, AbilityName: str) -> Ability:
+        return self.AbilityRegistry[AbilityName]
+
+    def ComputeMpCost(self, Caster: BattleEntity, AbilityObj: Ability) -> int:
+        Base = AbilityObj.BaseMpCost
+        if Base <= 0:
+            return 0
+        # Stat() first: a stale stat block is rebuilt, which also clears the cost memo
+        Vit = max(1.0, Caster.Stat("Vitality"))
+        Cost = Caster.MpCosts.get(Base)
+        if Cost is None:
+            Scaled = Base * ((Vit / MpVitalityScale) ** MpVitalityExponent)
+            Cost = Caster.MpCosts[Base] = int(round(max(1.0, Scaled)))
+        return Cost
+
+    def AddOrExtendStatusTurns(self, EntityObj: BattleEntity, StatusName: str, Turns: int, Description: str=""):
+        for S in EntityObj.Statuses:
+            if S.Name == StatusName and S.DurationMaxSeconds <= 0:
+                S.ExpiresAtTurn += Turns
+                self.PushTurnExpiry(EntityObj, S)
+                self.RebuildStatusMultipliers(EntityObj)
+                return
+        S = StatusEffect(Name=StatusName, ExpiresAtTurn=EntityObj.TurnsTaken + Turns, Description=Description)
+        EntityObj.Statuses.append(S)
+        self.PushTurnExpiry(EntityObj, S)
+        self.RebuildStatusMultipliers(EntityObj)
+
+    def PushTurnExpiry(self, EntityObj: BattleEntity, S: StatusEffect):
+        # Same stale-entry rule as PushStatusExpiry, on the owner's own heap
+        self.StatusExpirySeq += 1
+        heapq.heappush(EntityObj.TurnExpiries, (S.ExpiresAtTurn, self.StatusExpirySeq, S))
+
+    def StatusTurnsLeft(self, EntityObj: BattleEntity, S: StatusEffect) -> int:
+        return max(0, S.ExpiresAtTurn - EntityObj.TurnsTaken)
+
+    def AddTimedBuff(self, EntityObj: BattleEntity, BuffName: str, DurationSeconds: float, Description: str=""):
+        # stack duration of same exact kind
+        for S in EntityObj.Statuses:
+            if S.Name == BuffName and S.DurationMaxSeconds > 0:
+                # extend both remaining and max so % stays consistent for display simplicity
+                S.ExpiresAt += DurationSeconds
+                S.DurationMaxSeconds += DurationSeconds
+                self.PushStatusExpiry(EntityObj, S)
+                self.RebuildStatusMultipliers(EntityObj)
+                return
+        S = StatusEffect(Name=BuffName,
+                         ExpiresAt=self.BattleTime + DurationSeconds,
+                         DurationMaxSeconds=DurationSeconds,
+                         Description=Description)
+        EntityObj.Statuses.append(S)
+        self.PushStatusExpiry(EntityObj, S)
+        self.RebuildStatusMultipliers(EntityObj)
+
+    def PushStatusExpiry(self, EntityObj: BattleEntity, S: StatusEffect):
+        # An extended buff leaves its old entry behind; PeekStatusExpiry drops it
+        self.StatusExpirySeq += 1
+        heapq.heappush(self.StatusExpiries, (S.ExpiresAt, self.StatusExpirySeq, EntityObj, S))
+
+    def PeekStatusExpiry(self) -> Optional[float]:
+        Heap = self.StatusExpiries
+        while Heap:
+            T, _, E, S = Heap[0]
+            if S.ExpiresAt == T and any(X is S for X in E.Statuses):
+                return T
+            heapq.heappop(Heap)
+        return None
+
+    def ExpireTimedBuffs(self):
+        # same tolerance as GetNextActor, so one big step expires like many small ones
+        Expired = []
+        while True:
+            T = self.PeekStatusExpiry()
+            if T is None or T - self.BattleTime > 1e-6:
+                break
+            _, _, E, S = heapq.heappop(self.StatusExpiries)
+            E.Statuses = [X for X in E.Statuses if X is not S]
+            if E not in Expired:
+                Expired.append(E)
+        for E in Expired:
+            self.RebuildStatusMultipliers(E)
+
+    def StatusSecondsLeft(self, S: StatusEffect) -> float:
+        return max(0.0, S.ExpiresAt - self.BattleTime)
+
+    def RebuildStatusMultipliers(self, E: BattleEntity):
+        Mults: Dict[str, float] = {}
+        for S in E.Statuses:
+            Definition = self.StatusesByName.get(S.Name)
+            if not Definition:
+                continue
+            for StatName, M in Definition.get("Multipliers", {}).items():
+                Mults[StatName] = Mults.get(StatName, 1.0) * float(M)
+        E.StatusMultipliers = Mults
+        self.Outcomes.Invalidate(E)
+
+    def StatBuffs(self) -> List[Tuple[str, Dict[str, float]]]:
+        """(ability name, stat multipliers) for each Buff ability whose Statuses.json status changes a stat."""
+        Buffs = []
+        for AbilityName, Definition in self.StatusByAbility.items():
+            Mults = {S: float(M) for S, M in Definition.get("Multipliers", {}).items() if float(M) != 1.0}
+            AObj = self.AbilityRegistry.get(AbilityName)
+            if Mults and AObj and AObj.Kind == "Buff":
+                Buffs.append((AbilityName, Mults))
+        return Buffs
+
+    def EffectiveStat(self, E: BattleEntity, StatName: str) -> float:
+        return E.Stat(StatName) * E.StatusMultipliers.get(StatName, 1.0)
+
+    # Visual feedback hooks; the pygame front end overrides these.
+    def SpawnFloatOnEntity(self, EntityObj: BattleEntity, Text: str, Color: Tuple[int,int,int], Size: int):
+        pass
+
+    def SpawnFloatMessage(self, Text: str, Color: Tuple[int,int,int], Size: int, Life: float=0.8):
+        pass
+
+    def ApplyAbility(self, Caster: BattleEntity, Target: BattleEntity, AbilityObj: Ability, QteOutcome: str):
+        if AbilityObj.Kind == "Passive":
+            return
+
+        MpCost = self.ComputeMpCost(Caster, AbilityObj)
+        if MpCost > 0 and not Caster.SpendMp(MpCost):
+            self.SpawnFloatMessage("Not enough MP!", (255,120,120), 22, Life=0.9)
+            return
+
+        QteMult = QteMultipliersAttack.get(QteOutcome, 1.0)
+
+        if AbilityObj.Kind == "Attack":
+            Damage = self.AbilityAmount(Caster, Target, AbilityObj, QteMult, MpCost)
+            Target.TakeDamage(Damage)
+
+            Color = (240,240,240)
+            Size = 22
+            if QteOutcome == "Crit":
+                Color = (255, 235, 80)
+                Size = 28
+            elif QteOutcome == "Vital":
+                Color = (255, 80, 80)
+                Size = 36
+            elif QteOutcome == "Miss":
+                Color = (200,200,200)
+                Size = 20
+            self.SpawnFloatOnEntity(Target, f"{FormatNumber(Damage)}", Color, Size)
+
+        elif AbilityObj.Kind == "Heal":
+            Heal = self.AbilityAmount(Caster, Target, AbilityObj, QteMult, MpCost)
+            Target.HealHp(Heal)
+            self.SpawnFloatOnEntity(Target, f"+{FormatNumber(Heal)}", (70,255,110), 28 if QteOutcome != "Miss" else 20)
+
+        elif AbilityObj.Kind == "Defend":
+            Definition = self.StatusesByName.get("Defend", {})
+            self.AddOrExtendStatusTurns(
+                Caster,
+                "Defend",
+                1,
+                Description=Definition.get("Description", "1 turn: -25% damage taken, x2 regen, +25% defense QTE window.")
+            )
+
+        elif AbilityObj.Kind == "Buff":
+            Duration = self.AbilityAmount(Caster, Target, AbilityObj, QteMult, MpCost)
+
+            Definition = self.StatusByAbility.get(AbilityObj.Name)
+            if Definition:
+                self.AddTimedBuff(Target, Definition["Name"], Duration, Description=Definition.get("Description", ""))
+            else:
+                self.AddTimedBuff(Target, f"{AbilityObj.Name} (Buff)", Duration, Description=AbilityObj.Description)
+
+    def AbilityAmount(self, Caster: BattleEntity, Target: BattleEntity, AbilityObj: Ability, QteMult: float,
+                      MpCost: float) -> float:
+        """Damage, heal or buff seconds ApplyAbility produces at one QTE multiplier (0 for other kinds)."""
+        if AbilityObj.Kind == "Attack":
+            Base = self.EffectiveStat(Caster, "Power") / 5.0
+            Ratio = PowRatio(self.EffectiveStat(Caster, "Power"), self.EffectiveStat(Target, "Power"))
+            Damage = Base * Ratio * QteMult * AbilityObj.Mult
+            if AddMpCostToOutput:
+                Damage += MpCost
+            return max(0.0, round(Damage))
+
+        if AbilityObj.Kind == "Heal":
+            Base = self.EffectiveStat(Caster, "Power") / 5.0
+            Ratio = PowRatio(self.EffectiveStat(Caster, "Vitality"), self.EffectiveStat(Target, "Vitality"))
+            Heal = Base * Ratio * QteMult * AbilityObj.Mult
+            if AddMpCostToOutput:
+                Heal += MpCost
+            return max(0.0, round(Heal))
+
+        if AbilityObj.Kind == "Buff":
+            BaseDuration = 6.0
+            DurRatio = PowRatio(self.EffectiveStat(Caster, "Vitality"), self.EffectiveStat(Target, "Vitality"))
+            return RoundTenths(BaseDuration * DurRatio * QteMult)
+
+        return 0.0
+
+    # ============================================================
+    # Enemy Virtual QTE
+    # ============================================================
+
+    def ChooseFromProbabilities(self, ProbDict: Dict[str, float]) -> str:
+        Roll = self.Rng.random()
+        Acc = 0.0
+        for K, V in ProbDict.items():
+            Acc += V
+            if Roll <= Acc:
+                return K
+        return list(ProbDict.keys())[-1]
+
+    def EnemyQteOdds(self, PrecRatio: float) -> Dict[str, float]:
+        """Normalized outcome odds for an enemy attack at the given precision ratio."""
+        Strength = float(self.BalanceDb.get("Enemy QTE Shift Strength", EnemyQteShiftStrength))
+        Base = dict(self.BalanceDb.get("Enemy QTE Baseline Attack", EnemyQteBaselineAttack))
+        Shift = Clamp((PrecRatio - 1.0) * Strength, -0.45, 0.45)
+
+        HitTake = min(Base["Hit"], abs(Shift))
+        if Shift > 0:
+            Base["Hit"] -= HitTake
+            Base["Crit"] += HitTake * 0.70
+            Base["Vital"] += HitTake * 0.30
+        else:
+            Base["Hit"] -= HitTake
+            Base["Miss"] += HitTake
+
+        Total = sum(max(0.0, v) for v in Base.values())
+        if Total <= 0:
+            return {"Hit": 1.0}
+        return {k: max(0.0, v) / Total for k, v in Base.items()}
+
+    def EnemyQteCdf(self, PrecRatio: float) -> OutcomeCdf:
+        # The ratio only moves when a Precision status lands or ends, so a battle
+        # touches a handful of these
+        Cdf = self.EnemyQteCdfs.get(PrecRatio)
+        if Cdf is None:
+            Cdf = self.EnemyQteCdfs[PrecRatio] = OutcomeCdf(self.EnemyQteOdds(PrecRatio))
+        return Cdf
+
+    def EnemyVirtualQteAttack(self, Attacker: BattleEntity, Defender: BattleEntity) -> str:
+        PrecRatio = PowRatio(self.EffectiveStat(Attacker, "Precision"), self.EffectiveStat(Defender, "Precision"))
+        Cdf = self.EnemyQteCdf(PrecRatio)
+        if len(Cdf.Keys) == 1:
+            return "Hit"
+        return Cdf.Sample(self.Rng)
+
+    def EnemyVirtualQteAttacks(self, Attacker: BattleEntity, Defender: BattleEntity, Count: int) -> List[str]:
+        """Count independent enemy QTE outcomes, same stream as Count EnemyVirtualQteAttack calls."""
+        PrecRatio = PowRatio(self.EffectiveStat(Attacker, "Precision"), self.EffectiveStat(Defender, "Precision"))
+        Cdf = self.EnemyQteCdf(PrecRatio)
+        if len(Cdf.Keys) == 1:
+            return ["Hit"] * Count
+        return Cdf.SampleMany(self.Rng, Count)
+
+    def PlayerQteOdds(self) -> Dict[str, float]:
+        Probs = self.BalanceDb.get("Sim Player QTE Odds", SimPlayerQteProbabilities)
+        Total = sum(max(0.0, v) for v in Probs.values())
+        if Total <= 0:
+            return {"Hit": 1.0}
+        return {k: max(0.0, v) / Total for k, v in Probs.items()}
+
+    def QteOddsFor(self, Caster: BattleEntity, Target: BattleEntity) -> Dict[str, float]:
+        """Outcome odds behind Caster's action on Target (the sim stand-in for players)."""
+        if Caster.Team == "Player":
+            return self.PlayerQteOdds()
+        return self.EnemyQteOdds(PowRatio(self.EffectiveStat(Caster, "Precision"), self.EffectiveStat(Target, "Precision")))
+
+    def PlayerQteCdf(self) -> OutcomeCdf:
+        if self.PlayerQteCdfCache is None:
+            self.PlayerQteCdfCache = OutcomeCdf(self.PlayerQteOdds())
+        return self.PlayerQteCdfCache
+
+    def SimulatedPlayerQte(self) -> str:
+        # Headless stand-in for the ring QTE a human would play
+        Cdf = self.PlayerQteCdf()
+        if len(Cdf.Keys) == 1:
+            return "Hit"
+        return Cdf.Sample(self.Rng)
+
+    # ============================================================
+    # Turn Flow
+    # ============================================================
+
+    def GetEntityByTeamIndex(self, Team: str, Index: int) -> Optional[BattleEntity]:
+        if Team == "Player":
+            if 0 <= Index < len(self.PlayerParty):
+                return self.PlayerParty[Index]
+        if Team == "Enemy":
+            if 0 <= Index < len(self.EnemyParty):
+                return self.EnemyParty[Index]
+        return None
+
+    def PartyOf(self, Team: str) -> List[BattleEntity]:
+        return self.PlayerParty if Team == "Player" else self.EnemyParty
+
+    def AliveMember(self, Team: str, Ordinal: int) -> BattleEntity:
+        """The Ordinal-th living member of Team, in party order (O(log n))."""
+        return self.PartyOf(Team)[self.BattleState.Teams[Team].Kth(Ordinal)]
+
+    def RandomAlive(self, Team: str) -> Optional[BattleEntity]:
+        # Same draw as Rng.choice over the living members, without building that list
+        Count = self.BattleState.AliveCount(Team)
+        if Count <= 0:
+            return None
+        return self.AliveMember(Team, self.Rng.randrange(Count))
+
+    def GetNextActor(self) -> Optional[Tuple[str, int, BattleEntity]]:
+        Top = self.Scheduler.Peek()
+        if Top and Top[2].NextActionTime <= self.BattleTime + 1e-6:
+            return Top
+        return None
+
+    def BeginTurn(self, Team: str, Index: int) -> Optional[BattleEntity]:
+        Actor = self.GetEntityByTeamIndex(Team, Index)
+        if Actor and Actor.Alive:
+            Actor.ApplyTurnRegen()
+        return Actor
+
+    def CompleteActionAndScheduleNext(self, Actor: BattleEntity, Target: BattleEntity, AbilityObj: Ability):
+        DexRatio = PowRatio(self.EffectiveStat(Actor, "Dexterity"), self.EffectiveStat(Target, "Dexterity"))
+        Delay = RoundTenths(AbilityObj.BaseDelay / max(0.15, DexRatio))
+        Actor.NextActionTime = RoundTenths(self.BattleTime + Delay)
+        self.Scheduler.Schedule(Actor)
+
+        # End of the actor's turn: turn-based statuses like Defend run out from its
+        # heap, so the statuses are only touched when one is due
+        Actor.TurnsTaken += 1
+        Heap = Actor.TurnExpiries
+        Expired = False
+        while Heap and Heap[0][0] <= Actor.TurnsTaken:
+            T, _, S = heapq.heappop(Heap)
+            if S.ExpiresAtTurn == T and any(X is S for X in Actor.Statuses):
+                Actor.Statuses = [X for X in Actor.Statuses if X is not S]
+                Expired = True
+        if Expired:
+            self.RebuildStatusMultipliers(Actor)
+
+    def Difficulty(self) -> str:
+        return (self.ActiveSave or {}).get("Options", {}).get("Difficulty", "Normal")
+
+    def TacticalAiApplies(self) -> bool:
+        # Expert difficulty, and few enough combatants for the search to see a few turns ahead
+        return (self.Difficulty() == "Expert" and
+                self.BattleState.AliveCount("Player") + self.BattleState.AliveCount("Enemy") <= EnemyAiMaxCombatants)
+
+    def BeginTacticalSearch(self, Enemy: BattleEntity, MaxDepth: Optional[int]=None,
+                            BudgetMs: Optional[float]=None) -> TacticalSearch:
+        if MaxDepth is None:
+            MaxDepth = EnemyAiMaxDepth
+        Snapshot = TacticalSnapshot(self)
+        return TacticalSearch(Snapshot, Snapshot.Entities.index(Enemy), MaxDepth, BudgetMs)
+
+    def TacticalChoice(self, Search: TacticalSearch) -> Optional[Tuple[Ability, BattleEntity]]:
+        if Search.Best is None:
+            return None
+        Name, TargetIndex = Search.Best
+        return (self.GetAbility(Name), Search.Snapshot.Entities[TargetIndex])
+
+    def ChooseEnemyAction(self, Enemy: BattleEntity) -> Optional[Tuple[Ability, BattleEntity]]:
+        if self.TacticalAiApplies():
+            Search = self.BeginTacticalSearch(Enemy, MaxDepth=EnemyAiSimDepth)
+            Search.Run()
+            Choice = self.TacticalChoice(Search)
+            if Choice:
+                return Choice
+        return self.ChooseRandomEnemyAction(Enemy)
+
+    def ChooseRandomEnemyAction(self, Enemy: BattleEntity) -> Optional[Tuple[Ability, BattleEntity]]:
+        """Normal difficulty: a random ability, "Attack" when MP can't pay for it."""
+        target = self.RandomAlive("Player")
+        if target is None:
+            return None
+
+        ability_name = self.Rng.choice(Enemy.AbilityNames)
+        AObj = self.GetAbility(ability_name)
+
+        cost = self.ComputeMpCost(Enemy, AObj)
+        if cost > 0 and Enemy.CurrentMp < cost:
+            AObj = self.GetAbility("Attack")
+
+        if AObj.Targeting == "Self":
+            target = Enemy
+        elif AObj.Targeting == "Ally Single":
+            target = self.RandomAlive("Enemy")
+        else:
+            target = self.RandomAlive("Player")
+        return (AObj, target)
+
+    def EnemyTakeTurn(self, Enemy: BattleEntity, Choice: Optional[Tuple[Ability, BattleEntity]]=None) -> bool:
+        """Run one enemy action (Choice if given). Returns False when no player is left to target."""
+        Choice = Choice or self.ChooseEnemyAction(Enemy)
+        if not Choice:
+            return False
+        AObj, target = Choice
+        outcome = self.EnemyVirtualQteAttack(Enemy, target)
+        self.ApplyAbility(Enemy, target, AObj, outcome)
+        self.CompleteActionAndScheduleNext(Enemy, target, AObj)
+        return True
+
+    def ChooseAutoPlayerAction(self, Actor: BattleEntity) -> Optional[Tuple[Ability, BattleEntity]]:
+        Usable = []
+        for Name in Actor.AbilityNames:
+            AObj = self.GetAbility(Name)
+            if AObj.Kind == "Passive":
+                continue
+            cost = self.ComputeMpCost(Actor, AObj)
+            if cost > 0 and Actor.CurrentMp < cost:
+                continue
+            Usable.append(AObj)
+        if not Usable or not self.BattleState.AliveCount("Enemy"):
+            return None
+        AObj = self.Rng.choice(Usable)
+        if AObj.Targeting == "Self":
+            target = Actor
+        elif AObj.Targeting == "Ally Single":
+            target = self.RandomAlive("Player")
+        else:
+            target = self.RandomAlive("Enemy")
+        return (AObj, target)
+
+    def AutoPlayerTurn(self, Actor: BattleEntity) -> bool:
+        """Headless player turn: random usable ability, simulated QTE press.
+
+        With nothing usable the turn is skipped, but the actor is rescheduled so it stays in the rotation.
+        """
+        Choice = self.ChooseAutoPlayerAction(Actor)
+        if not Choice:
+            Actor.NextActionTime = RoundTenths(self.BattleTime + BaselineAbilityDelay)
+            self.Scheduler.Schedule(Actor)
+            return False
+        AObj, target = Choice
+        outcome = self.SimulatedPlayerQte()
+        self.ApplyAbility(Actor, target, AObj, outcome)
+        self.CompleteActionAndScheduleNext(Actor, target, AObj)
+        return True
+
+    def CheckBattleEnd(self) -> bool:
+        if not self.BattleState.AliveCount("Enemy"):
+            self.EndBattle(PlayerWon=True)
+        if not self.BattleState.AliveCount("Player"):
+            self.EndBattle(PlayerWon=False)
+        return self.SubMode == "Battle End"
+
+    def StepFrame(self, Dt: float):
+        """Advance a headless battle by one frame, auto-playing any turn that comes up."""
+        self.AdvanceFrames(1, Dt)
+
+    def StepEvent(self, Dt: float, Limit: Optional[float]=None):
+        """Jump to the frame of the next turn or buff expiry; same results as StepFrame.
+
+        Time still lands on the Dt grid (and at most one turn runs per frame) because
+        schedules are rounded from the frame time an actor acted on.
+        """
+        Frames = 1
+        NextTime = self.NextEventTime()
+        if NextTime is not None:
+            Frames = max(1, self.FrameAtTime(NextTime, Dt) - self.BattleFrame)
+        if Limit is not None:
+            Frames = max(1, min(Frames, self.FrameAtTime(Limit, Dt) - self.BattleFrame))
+        self.AdvanceFrames(Frames, Dt)
+
+    def NextEventTime(self) -> Optional[float]:
+        Times = []
+        Top = self.Scheduler.Peek()
+        if Top:
+            Times.append(Top[2].NextActionTime)
+        Expiry = self.PeekStatusExpiry()
+        if Expiry is not None:
+            Times.append(Expiry)
+        return min(Times) if Times else None
+
+    def FrameAtTime(self, T: float, Dt: float) -> int:
+        # First frame whose time passes GetNextActor's readiness test for T
+        Frame = max(0, int((T - 1e-6) / Dt) - 1)
+        while Frame * Dt + 1e-6 < T:
+            Frame += 1
+        return Frame
+
+    def AdvanceFrames(self, Frames: int, Dt: float):
+        if self.SubMode != "Free":
+            return
+        self.BattleFrame += Frames
+        self.BattleTime = max(0.0, self.BattleFrame * Dt)
+
+        self.ExpireTimedBuffs()
+
+        nxt = self.GetNextActor()
+        if nxt:
+            Team, Index, Actor = nxt
+            self.BeginTurn(Team, Index)
+            if Team == "Player":
+                self.AutoPlayerTurn(Actor)
+            elif not self.EnemyTakeTurn(Actor):
+                self.EndBattle(PlayerWon=False)
+                return
+
+        self.CheckBattleEnd()
+
+    # ============================================================
+    # Rewards / Drops / XP
+    # ============================================================
+
+    def XpForEnemy(self, EnemyLevel: int) -> int:
+        return int(round((5 + EnemyLevel) ** 1.5))
+
+    def GoldForEnemy(self, EnemyLevel: int) -> int:
+        return self.XpForEnemy(EnemyLevel)
+
+    def DropSamplerFor(self, EntityName: str) -> DropSampler:
+        Sampler = self.DropSamplers.get(EntityName)
+        if Sampler is None:
+            Sampler = DropSampler(self.EntitiesByName[EntityName].get("Drop Table", []))
+            self.DropSamplers[EntityName] = Sampler
+        return Sampler
+
+    def RollDropTable(self, Enemy: BattleEntity) -> List[Tuple[str, int]]:
+        return self.DropSamplerFor(Enemy.Name).Roll(self.Rng)
+
+    def RollDrops(self, EntityName: str, Kills: int) -> Dict[str, int]:
+        """Aggregated drops of Kills kills of one entity (idle farming, simulation)."""
+        return self.DropSamplerFor(EntityName).RollMany(self.Rng, Kills)
+
+    def InventoryModel(self) -> Optional[InventoryIndex]:
+        # rebuilt when the active save (or the item database) is swapped out
+        if not self.ActiveSave:
+            return None
+        Items = self.ActiveSave.setdefault("Inventory", [])
+        Model = self.Inventory
+        if Model is None or Model.Items is not Items or Model.ItemsByName is not self.ItemsByName:
+            Model = self.Inventory = InventoryIndex(Items, self.ItemsByName)
+        return Model
+
+    def GiveItemToInventory(self, ItemName: str, Amount: int):
+        self.InventoryModel().Add(ItemName, Amount)
+
+    def EndBattle(self, PlayerWon: bool):
+        self.SubMode = "Battle End"
+        self.BattleFrozen = True
+
+        TotalXp = 0
+        TotalGold = 0
+        LootDrops: List[Tuple[str,int]] = []
+
+        if PlayerWon and self.ActiveSave:
+            for E in self.EnemyParty:
+                TotalXp += self.XpForEnemy(E.Level)
+                TotalGold += self.GoldForEnemy(E.Level)
+                LootDrops.extend(self.RollDropTable(E))
+
+            self.ActiveSave["Gold"] += TotalGold
+            for P in self.ActiveSave["Party"]:
+                P["Xp"] = int(P.get("Xp", 0) + TotalXp)
+
+            for Name, Qty in LootDrops:
+                self.GiveItemToInventory(Name, Qty)
+
+            self.PersistSave()
+
+        self.BattleRewards = {
+            "PlayerWon": PlayerWon,
+            "TotalXp": TotalXp,
+            "TotalGold": TotalGold,
+            "Loot": LootDrops
+        }
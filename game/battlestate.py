@@ -0,0 +1,151 @@
+from array import array
+from typing import Dict, Set, Tuple
+
+from .utils import Clamp
+
+# Per-combatant float columns and their defaults; BattleEntity exposes each as an attribute
+FloatColumns: Dict[str, float] = {
+    "CurrentHp": 1.0,
+    "CurrentMp": 1.0,
+    "Atp": 0.0,
+    "AtpRate": 0.0,
+    "NextActionTime": 0.0,
+
+    # Animated bars (visual only)
+    "LagHp": 1.0,
+    "LagMp": 1.0,
+
+    "LagHpFrom": 1.0,
+    "LagHpTo": 1.0,
+    "LagHpTimer": 0.0,
+    "LagHpDuration": 0.0,
+
+    "LagMpFrom": 1.0,
+    "LagMpTo": 1.0,
+    "LagMpTimer": 0.0,
+    "LagMpDuration": 0.0,
+}
+
+
+class AliveIndex:
+    """Fenwick tree over one team's alive flags, indexed by party slot.
+
+    Count is O(1); Rank (alive slots before a slot) and Kth (slot of the k-th
+    alive member) are O(log n), so random or ordinal target picks never scan
+    the whole party.
+    """
+
+    def __init__(self):
+        self.Tree = array("l", [0])  # 1-based
+        self.Flags = array("b")
+        self.Count = 0
+
+    def Prefix(self, n: int) -> int:
+        # alive among slots [0, n)
+        total = 0
+        while n > 0:
+            total += self.Tree[n]
+            n &= n - 1
+        return total
+
+    def Append(self, alive: bool) -> int:
+        slot = len(self.Flags)
+        i = slot + 1
+        flag = 1 if alive else 0
+        self.Flags.append(flag)
+        self.Tree.append(flag + self.Prefix(i - 1) - self.Prefix(i - (i & -i)))
+        self.Count += flag
+        return slot
+
+    def Set(self, slot: int, alive: bool):
+        flag = 1 if alive else 0
+        delta = flag - self.Flags[slot]
+        if not delta:
+            return
+        self.Flags[slot] = flag
+        self.Count += delta
+        i = slot + 1
+        while i < len(self.Tree):
+            self.Tree[i] += delta
+            i += i & -i
+
+    def Rank(self, slot: int) -> int:
+        return self.Prefix(slot)
+
+    def Kth(self, k: int) -> int:
+        pos = 0
+        step = 1 << (len(self.Tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.Tree) and self.Tree[nxt] <= k:
+                pos = nxt
+                k -= self.Tree[nxt]
+            step >>= 1
+        return pos
+
+
+class BattleState:
+    """Struct-of-arrays storage for every combatant in one battle.
+
+    Each column is a contiguous array("d") (Alive is array("b")) indexed by the
+    row Allocate hands out; BattleEntity is a view onto one row. Whole-battle
+    passes such as TickVisualBars work on the columns directly. Alive flags are
+    mirrored per team in an AliveIndex for O(log n) target lookups.
+    """
+
+    def __init__(self):
+        for Name in FloatColumns:
+            setattr(self, Name, array("d"))
+        self.Alive = array("b")
+        self.RowTeam = []
+        self.RowSlot = array("l")
+        self.Teams: Dict[str, AliveIndex] = {}
+        self.Count = 0
+        self.Animating: Dict[str, Set[int]] = {"Hp": set(), "Mp": set()}  # rows with a lag bar in motion
+
+    def Allocate(self, Team: str="") -> Tuple[int, int]:
+        """New row for a member of Team; returns (row, slot within the team)."""
+        for Name, Default in FloatColumns.items():
+            getattr(self, Name).append(Default)
+        self.Alive.append(1)
+        Index = self.Teams.get(Team)
+        if Index is None:
+            Index = self.Teams[Team] = AliveIndex()
+        Slot = Index.Append(True)
+        self.RowTeam.append(Team)
+        self.RowSlot.append(Slot)
+        self.Count += 1
+        return self.Count - 1, Slot
+
+    def SetAlive(self, row: int, alive: bool):
+        self.Alive[row] = 1 if alive else 0
+        self.Teams[self.RowTeam[row]].Set(self.RowSlot[row], alive)
+
+    def AliveCount(self, Team: str) -> int:
+        Index = self.Teams.get(Team)
+        return Index.Count if Index else 0
+
+    def StartLag(self, Bar: str, row: int, From: float, To: float, Duration: float):
+        """Animate row's Hp or Mp lag bar from From to To over Duration seconds."""
+        getattr(self, f"Lag{Bar}From")[row] = From
+        getattr(self, f"Lag{Bar}To")[row] = To
+        getattr(self, f"Lag{Bar}Timer")[row] = 0.0
+        getattr(self, f"Lag{Bar}Duration")[row] = Duration
+        self.Animating[Bar].add(row)
+
+    def TickVisualBars(self, dt: float):
+        self.TickLag(self.Animating["Hp"], self.LagHp, self.CurrentHp, self.LagHpFrom, self.LagHpTo, self.LagHpTimer, self.LagHpDuration, dt)
+        self.TickLag(self.Animating["Mp"], self.LagMp, self.CurrentMp, self.LagMpFrom, self.LagMpTo, self.LagMpTimer, self.LagMpDuration, dt)
+
+    def TickLag(self, animating, lag, current, lag_from, lag_to, timer, duration, dt: float):
+        # settled bars follow their value: one column copy; only bars in motion are stepped
+        lag[:] = current
+        for i in list(animating):
+            timer[i] += dt
+            t = Clamp(timer[i] / duration[i], 0.0, 1.0)
+            t = 1 - (1 - t) * (1 - t)
+            lag[i] = lag_from[i] + (lag_to[i] - lag_from[i]) * t
+            if timer[i] >= duration[i]:
+                lag[i] = lag_to[i]
+                duration[i] = 0.0
+                animating.discard(i)
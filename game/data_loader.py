@@ -12,6 +12,7 @@ def CreateDefaultData():
     areas_path = os.path.join(DataFolder, "Areas.json")
     encounters_path = os.path.join(DataFolder, "Encounters.json")
     balance_path = os.path.join(DataFolder, "Balance.json")
+    statuses_path = os.path.join(DataFolder, "Statuses.json")
 
     if not os.path.exists(items_path):
         items = [
@@ -171,3 +172,26 @@ def CreateDefaultData():
             "Damage Variance": "80-120%",
         }
         SaveJson(balance_path, balance)
+
+    if not os.path.exists(statuses_path):
+        # "Granted By" maps a Buff ability to its status; "Multipliers" scale EffectiveStat while active
+        statuses = [
+            {
+                "Name": "Defend",
+                "Description": "1 turn: -25% damage taken, x2 regen, +25% defense QTE window.",
+                "Multipliers": {},
+            },
+            {
+                "Name": "Rally (Power +20%)",
+                "Granted By": "Rally",
+                "Description": "Power +20%.",
+                "Multipliers": {"Power": 1.20},
+            },
+            {
+                "Name": "Focus (Precision +25%)",
+                "Granted By": "Focus",
+                "Description": "Precision +25%.",
+                "Multipliers": {"Precision": 1.25},
+            },
+        ]
+        SaveJson(statuses_path, statuses)
@@ -0,0 +1,84 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+# RollMany samples the joint outcome of up to this many entries (2^n cells); longer tables roll per entry
+MaxJointEntries = 10
+
+
+class DropSampler:
+    """One entity's Drop Table, parsed once.
+
+    Roll makes one Rng.random() call per entry in table order, exactly like
+    parsing the table per kill did. RollMany rolls K kills at once: which subset
+    of entries drops is one categorical distribution, sampled with Vose's alias
+    method at one draw per kill, and item counts come back aggregated.
+    """
+
+    __slots__ = ("Entries", "Prob", "Alias", "Cells")
+
+    def __init__(self, DropTable: List[Dict]):
+        self.Entries: Tuple[Tuple[str, int, float], ...] = tuple(
+            (Entry["Item"], int(Entry["Quantity"]), int(Entry["Chance Numerator"]) / int(Entry["Chance Denominator"]))
+            for Entry in DropTable if int(Entry["Chance Denominator"]) > 0
+        )
+        self.Prob: Optional[List[float]] = None
+        self.Alias: Optional[List[int]] = None
+        self.Cells: List[Tuple[Tuple[str, int], ...]] = []
+
+    def Roll(self, Rng: random.Random) -> List[Tuple[str, int]]:
+        return [(ItemName, Qty) for ItemName, Qty, Chance in self.Entries if Rng.random() <= Chance]
+
+    def BuildAlias(self):
+        # Cell mask m: entry k dropped iff bit k is set
+        n = len(self.Entries)
+        Weights = []
+        for m in range(1 << n):
+            W = 1.0
+            for k, (_, _, Chance) in enumerate(self.Entries):
+                p = min(1.0, max(0.0, Chance))
+                W *= p if m >> k & 1 else 1.0 - p
+            Weights.append(W)
+            self.Cells.append(tuple((Name, Qty) for k, (Name, Qty, _) in enumerate(self.Entries) if m >> k & 1))
+
+        Count = len(Weights)
+        Total = sum(Weights)
+        Scaled = [W * Count / Total for W in Weights]
+        Prob = [1.0] * Count
+        Alias = list(range(Count))
+        Small = [i for i, v in enumerate(Scaled) if v < 1.0]
+        Large = [i for i, v in enumerate(Scaled) if v >= 1.0]
+        while Small and Large:
+            s = Small.pop()
+            l = Large.pop()
+            Prob[s] = Scaled[s]
+            Alias[s] = l
+            Scaled[l] -= 1.0 - Scaled[s]
+            (Small if Scaled[l] < 1.0 else Large).append(l)
+        self.Prob, self.Alias = Prob, Alias
+
+    def RollMany(self, Rng: random.Random, Kills: int) -> Dict[str, int]:
+        """Aggregated item counts for Kills independent kills."""
+        Totals: Dict[str, int] = {}
+        if not self.Entries or Kills <= 0:
+            return Totals
+        if len(self.Entries) > MaxJointEntries:
+            for _ in range(Kills):
+                for ItemName, Qty in self.Roll(Rng):
+                    Totals[ItemName] = Totals.get(ItemName, 0) + Qty
+            return Totals
+
+        if self.Prob is None:
+            self.BuildAlias()
+        Prob, Alias = self.Prob, self.Alias
+        Count = len(Prob)
+        Hits = [0] * Count
+        Draw = Rng.random
+        for _ in range(Kills):
+            u = Draw() * Count
+            i = int(u)
+            Hits[i if u - i < Prob[i] else Alias[i]] += 1
+        for m, h in enumerate(Hits):
+            if h:
+                for ItemName, Qty in self.Cells[m]:
+                    Totals[ItemName] = Totals.get(ItemName, 0) + Qty * h
+        return Totals
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+from .battlestate import BattleState
 from .utils import (
     Clamp,
     DefendDamageTakenMultiplier,
@@ -9,12 +10,17 @@ from .utils import (
     TurnRegenPercent,
 )
 
+StatNames = ("Vitality", "Power", "Dexterity", "Precision")
+
+# Shared until the first status lands (RebuildStatusMultipliers assigns a fresh dict); never mutate
+NoStatusMultipliers: Dict[str, float] = {}
+
 
 @dataclass
 class StatusEffect:
     Name: str
-    RemainingTurns: int = 0  # for turn-based statuses (e.g. Defend)
-    DurationSeconds: float = 0.0  # for timed buffs
+    ExpiresAtTurn: int = 0  # owner's TurnsTaken a turn-based status (e.g. Defend) ends at; BattleEngine.StatusTurnsLeft for display
+    ExpiresAt: float = 0.0  # battle time a timed buff ends; BattleEngine.StatusSecondsLeft for display
     DurationMaxSeconds: float = 0.0
     Description: str = ""
 
@@ -22,7 +28,7 @@ class StatusEffect:
         return self.DurationMaxSeconds > 0.0
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Ability:
     Name: str
     Kind: str  # "Attack" | "Defend" | "Heal" | "Buff" | "Passive"
@@ -41,43 +47,122 @@ class Item:
     Description: str
 
 
-@dataclass
-class BattleEntity:
-    Name: str
-    Level: int
-    Weights: Dict[str, float]
-    AbilityNames: List[str]
-    DropTable: List[Dict]
-    Team: str  # "Player" | "Enemy"
-
-    CurrentHp: float = 1.0
-    CurrentMp: float = 1.0
-    Atp: float = 0.0
-    AtpRate: float = 0.0
-    NextActionTime: float = 0.0
-    Statuses: List[StatusEffect] = field(default_factory=list)
+class StateColumn:
+    """BattleEntity attribute stored in its BattleState column at the entity's row."""
 
-    # Animated bars (visual only)
-    LagHp: float = 1.0
-    LagMp: float = 1.0
+    def __set_name__(self, owner, name: str):
+        self.Name = name
 
-    LagHpFrom: float = 1.0
-    LagHpTo: float = 1.0
-    LagHpTimer: float = 0.0
-    LagHpDuration: float = 0.0
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return getattr(obj.State, self.Name)[obj.Row]
 
-    LagMpFrom: float = 1.0
-    LagMpTo: float = 1.0
-    LagMpTimer: float = 0.0
-    LagMpDuration: float = 0.0
+    def __set__(self, obj, value):
+        getattr(obj.State, self.Name)[obj.Row] = value
 
-    Alive: bool = True
 
-    def Stat(self, stat_name: str) -> float:
+class AliveColumn(StateColumn):
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return bool(obj.State.Alive[obj.Row])
+
+    def __set__(self, obj, value):
+        obj.State.SetAlive(obj.Row, value)
+
+
+class BattleEntity:
+    """One combatant: identity, stats and statuses here, per-frame numbers in a BattleState row.
+
+    Entities built without a State get a private one-row BattleState.
+    """
+
+    __slots__ = (
+        "Name", "Level", "Weights", "AbilityNames", "DropTable", "Team", "State", "Row", "Slot", "AutoControl",
+        "Statuses", "TurnsTaken", "TurnExpiries", "StatusMultipliers", "StatBlock", "StatLevel", "StatWeights", "MpCosts",
+    )
+
+    CurrentHp = StateColumn()
+    CurrentMp = StateColumn()
+    Atp = StateColumn()
+    AtpRate = StateColumn()
+    NextActionTime = StateColumn()
+
+    # Animated bars (visual only)
+    LagHp = StateColumn()
+    LagMp = StateColumn()
+
+    LagHpFrom = StateColumn()
+    LagHpTo = StateColumn()
+    LagHpTimer = StateColumn()
+    LagHpDuration = StateColumn()
+
+    LagMpFrom = StateColumn()
+    LagMpTo = StateColumn()
+    LagMpTimer = StateColumn()
+    LagMpDuration = StateColumn()
+
+    Alive = AliveColumn()
+
+    def __init__(self, Name: str, Level: int, Weights: Mapping[str, float], AbilityNames: List[str],
+                 DropTable: List[Dict], Team: str, State: Optional[BattleState]=None):
+        self.Name = Name
+        self.Level = Level
+        self.Weights = Weights
+        self.AbilityNames = AbilityNames
+        self.DropTable = DropTable
+        self.Team = Team  # "Player" | "Enemy"
+        self.State = State if State is not None else BattleState()
+        self.Row, self.Slot = self.State.Allocate(Team)  # Slot == index in the party list
+        self.AutoControl = False  # player-side ally played by the engine
+
+        self.Statuses: List[StatusEffect] = []
+        self.TurnsTaken = 0  # completed turns; turn-based statuses count against it
+        self.TurnExpiries: List[Tuple] = []  # min-heap of (ExpiresAtTurn, seq, status)
+        # Product of active status multipliers per stat; BattleEngine.RebuildStatusMultipliers keeps it current
+        self.StatusMultipliers: Dict[str, float] = NoStatusMultipliers
+
+        # Precomputed stats; rebuilt when Level or Weights is reassigned (in-place
+        # edits to a private Weights dict need InvalidateStats). Template instances
+        # share a read-only Weights and one block per level, so they never edit in place.
+        self.StatBlock: Dict[str, float] = {}
+        self.StatLevel = -1
+        self.StatWeights: Optional[Dict[str, float]] = None
+        self.MpCosts: Dict[float, int] = {}  # base MP cost -> scaled
+
+    def __repr__(self) -> str:
+        return f"BattleEntity({self.Name!r}, Level={self.Level}, Team={self.Team!r}, Hp={self.CurrentHp:g})"
+
+    def ComputeStat(self, stat_name: str) -> float:
         level = float(self.Level)
         weight = float(self.Weights.get(stat_name, 0.0))
         return (level * (1.0 + weight)) ** 2
 
+    def BuildStatBlock(self):
+        self.StatBlock = {name: self.ComputeStat(name) for name in StatNames}
+        self.StatLevel = self.Level
+        self.StatWeights = self.Weights
+        self.MpCosts = {}
+
+    def UseStatBlock(self, StatBlock: Dict[str, float], MpCosts: Dict[float, int]):
+        # Adopt a block already built for the same Level and Weights (shared between template instances)
+        self.StatBlock = StatBlock
+        self.MpCosts = MpCosts
+        self.StatLevel = self.Level
+        self.StatWeights = self.Weights
+
+    def InvalidateStats(self):
+        self.StatWeights = None
+
+    def Stat(self, stat_name: str) -> float:
+        if self.StatLevel != self.Level or self.StatWeights is not self.Weights:
+            self.BuildStatBlock()
+        value = self.StatBlock.get(stat_name)
+        if value is None:
+            value = self.StatBlock[stat_name] = self.ComputeStat(stat_name)
+        return value
+
     def MaxHp(self) -> float:
         return self.Stat("Vitality")
 
@@ -85,10 +170,8 @@ class BattleEntity:
         return self.Stat("Vitality")
 
     def HasStatus(self, status_name: str) -> bool:
-        return any(
-            s.Name == status_name and (s.RemainingTurns > 0 or s.DurationSeconds > 0)
-            for s in self.Statuses
-        )
+        # statuses leave the list as they run out
+        return any(s.Name == status_name for s in self.Statuses)
 
     def GetDefendMultipliers(self) -> Tuple[float, float]:
         if self.HasStatus("Defend"):
@@ -113,10 +196,7 @@ class BattleEntity:
         den = max(1.0, self.MaxHp())
         percent = Clamp(delta / den, 0.0, 1.0)
         duration = max(0.05, percent * FullBarDrainSeconds)
-        self.LagHpFrom = old
-        self.LagHpTo = new_value
-        self.LagHpTimer = 0.0
-        self.LagHpDuration = duration
+        self.State.StartLag("Hp", self.Row, old, new_value, duration)
 
     def BeginLagMp(self, new_value: float):
         old = float(self.LagMp)
@@ -124,10 +204,7 @@ class BattleEntity:
         den = max(1.0, self.MaxMp())
         percent = Clamp(delta / den, 0.0, 1.0)
         duration = max(0.05, percent * FullBarDrainSeconds)
-        self.LagMpFrom = old
-        self.LagMpTo = new_value
-        self.LagMpTimer = 0.0
-        self.LagMpDuration = duration
+        self.State.StartLag("Mp", self.Row, old, new_value, duration)
 
     def TakeDamage(self, amount: float):
         if not self.Alive:
@@ -161,29 +238,6 @@ class BattleEntity:
         self.CurrentMp = min(self.MaxMp(), self.CurrentMp + amount)
         self.BeginLagMp(self.CurrentMp)
 
-    def TickVisualBars(self, dt: float):
-        if self.LagHpDuration > 0:
-            self.LagHpTimer += dt
-            t = Clamp(self.LagHpTimer / self.LagHpDuration, 0.0, 1.0)
-            t = 1 - (1 - t) * (1 - t)
-            self.LagHp = self.LagHpFrom + (self.LagHpTo - self.LagHpFrom) * t
-            if self.LagHpTimer >= self.LagHpDuration:
-                self.LagHp = self.LagHpTo
-                self.LagHpDuration = 0.0
-        else:
-            self.LagHp = self.CurrentHp
-
-        if self.LagMpDuration > 0:
-            self.LagMpTimer += dt
-            t = Clamp(self.LagMpTimer / self.LagMpDuration, 0.0, 1.0)
-            t = 1 - (1 - t) * (1 - t)
-            self.LagMp = self.LagMpFrom + (self.LagMpTo - self.LagMpFrom) * t
-            if self.LagMpTimer >= self.LagMpDuration:
-                self.LagMp = self.LagMpTo
-                self.LagMpDuration = 0.0
-        else:
-            self.LagMp = self.CurrentMp
-
 
 @dataclass
 class FloatingNumber:
@@ -194,6 +248,7 @@ class FloatingNumber:
     Size: int
     Life: float = 0.8
     Age: float = 0.0
+    Surface: Any = field(default=None, repr=False)  # rendered once at spawn by the front end
 
     def Tick(self, dt: float):
         self.Age += dt
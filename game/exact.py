@@ -0,0 +1,618 @@
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .battle import BattleEngine
+from .data_loader import CreateDefaultData
+from .entities import StatNames
+from .sim import MakeSimEngine
+from .utils import *
+
+# Finished solves keyed by lineup (entity template, level, team), the data they were
+# built from (DataKey) and solver settings, stored as (result or None, state budget tried)
+SolveCache: Dict[Tuple, Tuple[Optional[Dict], int]] = {}
+
+# Strongly connected components up to this many states are solved densely; bigger
+# ones by Jacobi iteration over their edges
+DenseComponentStates = 1500
+IterationTolerance = 1e-9
+MaxIterations = 100_000
+
+# MP is only tracked for combatants who could run dry in one battle: anyone with the
+# MP for this many uses of their dearest ability is never limited by it
+MpTrackedUses = 20
+
+# StateBound runs several times over the states actually reached; lineups whose bound
+# is past this many budgets are turned away without exploring
+BoundSlack = 10
+
+# Quantization that gets the stock multi-combatant encounters in under DefaultMaxStates
+DefaultHpLevels = 3
+DefaultMaxStates = 400_000
+
+VitIndex, PowIndex, DexIndex, PrecIndex = (StatNames.index(S) for S in ("Vitality", "Power", "Dexterity", "Precision"))
+
+
+class StateBudgetExceeded(Exception):
+    pass
+
+
+class ExactSolver:
+    """Win probability and expected duration of one encounter, solved as a Markov chain.
+
+    The battle under the headless sim's uniform policy is a Markov chain over
+    decision points: whenever someone's turn comes up, every (ability, target,
+    QTE outcome) branch is weighted like the sim plays it, with enemy odds from
+    BattleEngine.EnemyQteOdds. Explore builds the chain and SolveChain solves it
+    one strongly connected component at a time, so states that recur (regen or
+    heals undoing damage) are solved as the linear system they are.
+
+    An estimate rather than an exact answer, because quantization keeps the
+    state space small: HP moves over HpLevels levels (see HpGrid), MP in
+    MpLevels steps of its maximum and buff timers in BuffStep seconds up to
+    BuffCap (the default is just on/off), all rounded stochastically so expected
+    values are kept (anyone alive keeps at least one HP level); action delays
+    snap to TimeStep seconds. Solving costs ~0.2 ms per state, so only 1v1
+    lineups answer in milliseconds. A closed component where both sides live
+    forever is a stalemate: the sim's time cap makes it a loss, and its time is
+    not counted.
+
+    Two more reductions keep stock encounters in budget: MP is dropped for
+    combatants it cannot limit (see MpTrackedUses), and identical combatants
+    (same template, level and team) are kept sorted so swapping them is one
+    state. The latter only changes who of the two moves first on an exact tie.
+    """
+
+    def __init__(self, Engine: BattleEngine, Players: List, Enemies: List, HpLevels: int=DefaultHpLevels,
+                 MpLevels: int=2, PlayerQteOdds: Optional[Dict[str, float]]=None, TimeStep: float=1.0,
+                 BuffStep: float=6.0, BuffCap: float=6.0, MaxStates: int=DefaultMaxStates):
+        self.Engine = Engine
+        self.All = Players + Enemies
+        C = len(self.All)
+        self.C = C
+        self.IsPlayer = [E.Team == "Player" for E in self.All]
+        self.HpLevels = HpLevels
+        self.MpLevels = MpLevels
+        # level k > 0 stands for (k - 1/2) / (HpLevels - 1/2) of max HP: the first step is half size, so
+        # keeping the nearly dead alive (rounding them up to level 1) overstates their HP by at most that
+        self.HpGrid = [0.0] + [(k - 0.5) / (HpLevels - 0.5) for k in range(1, HpLevels + 1)]
+        self.MaxStates = MaxStates
+        self.TimeStep = max(1, int(round(TimeStep * 10)))  # in tenths
+        self.BuffStep = max(1, int(round(BuffStep * 10)))
+        self.BuffLevels = max(1, int(round(BuffCap / BuffStep)))
+        self.PlayerOdds = list((PlayerQteOdds or Engine.PlayerQteOdds()).items())
+
+        self.MaxHp = [E.MaxHp() for E in self.All]
+        self.MaxMp = [E.MaxMp() for E in self.All]
+        self.Stats = [[E.Stat(S) for S in StatNames] for E in self.All]
+        Groups: Dict[Tuple, List[int]] = {}
+        for c, E in enumerate(self.All):
+            Groups.setdefault((E.Name, E.Level, E.Team), []).append(c)
+        self.Twins = [G for G in Groups.values() if len(G) > 1]
+
+        # Stat-changing buffs from Statuses.json; state holds one timer level per (combatant, buff)
+        Buffs = Engine.StatBuffs()
+        self.B = len(Buffs)
+        self.BuffIndex = {Name: b for b, (Name, _) in enumerate(Buffs)}
+        self.BuffMults = [[Mults.get(S, 1.0) for S in StatNames] for _, Mults in Buffs]
+
+        # (ability, mp cost) per combatant, plus the Attack fallback enemies use when short on MP
+        self.Abilities = []
+        for E in self.All:
+            Rows = []
+            for Name in E.AbilityNames:
+                A = Engine.GetAbility(Name)
+                Rows.append((A, Engine.ComputeMpCost(E, A)))
+            self.Abilities.append(Rows)
+        Attack = Engine.GetAbility("Attack")
+        self.Fallback = [(Attack, Engine.ComputeMpCost(E, Attack)) for E in self.All]
+        self.TrackMp = [max([Cost for _, Cost in Rows] + [0]) * MpTrackedUses > self.MaxMp[c]
+                        for c, Rows in enumerate(self.Abilities)]
+
+        self.StatsCache: Dict[Tuple[int, Tuple[bool, ...]], List[float]] = {}
+        self.OddsCache: Dict[Tuple, List[Tuple[str, float]]] = {}
+        self.EffectCache: Dict[Tuple, List[Tuple]] = {}
+        self.AdvanceCache: Dict[Tuple, List[Tuple]] = {}
+
+        # Chain: state i moves to EdgeTo[k] with probability EdgeP[k] for k in EdgeEnd[i - 1]..EdgeEnd[i];
+        # Cost[i] = expected seconds to the next decision. Flat arrays: stock encounters run to 10^7 edges
+        self.States: List[Tuple] = []
+        self.Index: Dict[Tuple, int] = {}
+        self.EdgeTo = array("q")
+        self.EdgeP = array("d")
+        self.EdgeEnd = array("q")
+        self.Cost = array("d")
+        self.Outcome: List[int] = []  # 1 players won, -1 players lost, 0 undecided
+
+    # ---------------- quantization ----------------
+
+    def DelayTenths(self, Seconds: float) -> int:
+        return max(1, int(round(Seconds * 10 / self.TimeStep))) * self.TimeStep
+
+    def Levels(self, Value: float, Unit: float, Steps: int) -> List[Tuple[int, float]]:
+        """Stochastic rounding of Value onto levels of Unit (0..Steps): [(level, probability)], mean kept."""
+        x = max(0.0, min(float(Steps), Value / max(1e-9, Unit)))
+        Low = math.floor(x + 1e-9)
+        Frac = x - Low
+        if Frac <= 1e-9 or Low >= Steps:
+            return [(min(Low, Steps), 1.0)]
+        return [(Low, 1.0 - Frac), (Low + 1, Frac)]
+
+    def HpValue(self, c: int, Level: int) -> float:
+        return self.MaxHp[c] * self.HpGrid[Level]
+
+    def HpSplit(self, c: int, Value: float) -> List[Tuple[int, float]]:
+        """Stochastic rounding of an HP value onto c's levels, mean kept; anyone alive keeps level 1."""
+        if Value <= 0:
+            return [(0, 1.0)]
+        x = min(1.0, Value / self.MaxHp[c])
+        Grid = self.HpGrid
+        Low = bisect.bisect_right(Grid, x + 1e-12) - 1
+        if Low < 1:
+            return [(1, 1.0)]
+        if Low >= self.HpLevels:
+            return [(self.HpLevels, 1.0)]
+        Frac = (x - Grid[Low]) / (Grid[Low + 1] - Grid[Low])
+        if Frac <= 1e-9:
+            return [(Low, 1.0)]
+        return [(Low, 1.0 - Frac), (Low + 1, Frac)]
+
+    def MpValue(self, c: int, Level: int) -> float:
+        return self.MaxMp[c] * Level / self.MpLevels
+
+    def Canonical(self, State: Tuple) -> Tuple:
+        """Sort identical combatants by their own (HP, MP, delay, buffs) so their order does not matter."""
+        if not self.Twins:
+            return State
+        Hp, Mp, Next, Buffs = (list(Part) for Part in State)
+        B = self.B
+        for Group in self.Twins:
+            Rows = sorted((Hp[c], Mp[c], Next[c], tuple(Buffs[c * B:(c + 1) * B])) for c in Group)
+            for c, (Hp[c], Mp[c], Next[c], Row) in zip(Group, Rows):
+                Buffs[c * B:(c + 1) * B] = Row
+        return (tuple(Hp), tuple(Mp), tuple(Next), tuple(Buffs))
+
+    # ---------------- rules ----------------
+
+    def Effective(self, c: int, Buffs: Tuple) -> List[float]:
+        """Stats of c with its active buffs, like BattleEngine.EffectiveStat."""
+        Active = tuple(Buffs[c * self.B + b] > 0 for b in range(self.B))
+        Key = (c, Active)
+        Stats = self.StatsCache.get(Key)
+        if Stats is None:
+            Stats = list(self.Stats[c])
+            for b, On in enumerate(Active):
+                if On:
+                    Stats = [s * m for s, m in zip(Stats, self.BuffMults[b])]
+            self.StatsCache[Key] = Stats
+        return Stats
+
+    def Odds(self, a: int, t: int, Buffs: Tuple) -> List[Tuple[str, float]]:
+        if self.IsPlayer[a]:
+            return self.PlayerOdds
+        PrecA = self.Effective(a, Buffs)[PrecIndex]
+        PrecT = self.Effective(t, Buffs)[PrecIndex]
+        Key = (PrecA, PrecT)
+        Odds = self.OddsCache.get(Key)
+        if Odds is None:
+            Odds = self.OddsCache[Key] = list(self.Engine.EnemyQteOdds(PowRatio(PrecA, PrecT)).items())
+        return Odds
+
+    def InitialState(self) -> Tuple:
+        C = self.C
+        Dex = [S[DexIndex] for S in self.Stats]
+        AvgDex = sum(Dex) / max(1, C)
+        Next = [self.DelayTenths(max(0.5, 5.0 / max(0.15, PowRatio(d, AvgDex)))) for d in Dex]
+        return (tuple([self.HpLevels] * C), tuple([self.MpLevels] * C), tuple(Next), tuple([0] * (C * self.B)))
+
+    def Advance(self, State: Tuple) -> List[Tuple[Tuple, float, float]]:
+        """Move time to the next actor: [(state with that actor at 0, probability, seconds elapsed)]."""
+        Hp, Mp, Next, Buffs = State
+        Key = (Next, Buffs, tuple(h > 0 for h in Hp))
+        Moves = self.AdvanceCache.get(Key)
+        if Moves is None:
+            Step = min(t for t, h in zip(Next, Hp) if h > 0)
+            Shifted = tuple(t - Step if t else 0 for t in Next)
+            Branches: List[Tuple[List[int], float]] = [([], 1.0)]
+            for r in Buffs:
+                Split = self.Levels(r * self.BuffStep - Step, self.BuffStep, self.BuffLevels) if r and Step else [(r, 1.0)]
+                Branches = [(Set + [L], P * Q) for Set, P in Branches for L, Q in Split]
+            Moves = self.AdvanceCache[Key] = [(Shifted, tuple(Set), P, Step / 10.0) for Set, P in Branches]
+        return [((Hp, Mp, Shifted, B), P, Seconds) for Shifted, B, P, Seconds in Moves]
+
+    def Successors(self, State: Tuple) -> List[Tuple[Tuple, float]]:
+        Hp, Mp, Next, Buffs = State
+        # Same tie-break as the turn scheduler: players first, then by index
+        a = min((c for c in range(self.C) if Hp[c] > 0 and Next[c] == 0), key=lambda c: (not self.IsPlayer[c], c))
+        Key = (a, Hp, Mp[a], Buffs)
+        Effects = self.EffectCache.get(Key)
+        if Effects is None:
+            Effects = self.EffectCache[Key] = self.Effects(a, Hp, Mp[a], Buffs)
+        Out = []
+        for NewHp, ActorMp, ActorNext, NewBuffs, P in Effects:
+            M = list(Mp)
+            N = list(Next)
+            M[a] = ActorMp
+            N[a] = ActorNext
+            for c, h in enumerate(NewHp):
+                if not h and Hp[c]:
+                    M[c] = N[c] = 0  # the fallen keep nothing that could tell two states apart
+            Out.append(((NewHp, tuple(M), tuple(N), NewBuffs), P))
+        return Out
+
+    def Targets(self, a: int, A) -> List[int]:
+        if A.Targeting == "Self":
+            return [a]
+        if A.Targeting == "Ally Single":
+            return [c for c in range(self.C) if self.IsPlayer[c] == self.IsPlayer[a]]
+        return [c for c in range(self.C) if self.IsPlayer[c] != self.IsPlayer[a]]
+
+    def Effects(self, a: int, Hp: Tuple, MpLevel: int, Buffs: Tuple) -> List[Tuple]:
+        """Every way a's turn can end: [(HP levels, a's MP level, a's delay, buff levels, probability)]."""
+        IsPlayer = self.IsPlayer[a]
+
+        # Turn regen (Defend never survives to a turn start, see CompleteActionAndScheduleNext)
+        ActorHp = min(self.MaxHp[a], self.HpValue(a, Hp[a]) + self.MaxHp[a] * TurnRegenPercent)
+        if self.TrackMp[a]:
+            ActorMp = min(self.MaxMp[a], self.MpValue(a, MpLevel) + self.MaxMp[a] * TurnRegenPercent)
+        else:
+            ActorMp = self.MaxMp[a]
+
+        Choices: List[Tuple[object, int, float]] = []
+        if IsPlayer:
+            Usable = [(A, Cost) for A, Cost in self.Abilities[a]
+                      if A.Kind != "Passive" and not (Cost > 0 and ActorMp < Cost)]
+            if not Usable:
+                Usable = [self.Fallback[a]]
+            for A, Cost in Usable:
+                Choices.append((A, Cost, 1.0 / len(Usable)))
+        else:
+            Rows = self.Abilities[a] or [self.Fallback[a]]
+            for A, Cost in Rows:
+                if Cost > 0 and ActorMp < Cost:
+                    A, Cost = self.Fallback[a]
+                Choices.append((A, Cost, 1.0 / len(Rows)))
+
+        Out: Dict[Tuple, float] = {}
+        for A, Cost, PChoice in Choices:
+            Targets = [t for t in self.Targets(a, A) if Hp[t] > 0]
+            for t in Targets:
+                PTarget = PChoice / len(Targets)
+                for Outcome, POutcome in self.Odds(a, t, Buffs):
+                    if POutcome <= 0:
+                        continue
+                    for Effect, P in self.Resolve(Hp, Buffs, a, ActorHp, ActorMp, A, Cost, t, Outcome):
+                        Out[Effect] = Out.get(Effect, 0.0) + PTarget * POutcome * P
+        return [Effect + (P,) for Effect, P in Out.items()]
+
+    def Resolve(self, Hp: Tuple, Buffs: Tuple, a: int, ActorHp: float, ActorMp: float, A, Cost: int, t: int,
+                Outcome: str) -> List[Tuple[Tuple, float]]:
+        """One action (BattleEngine.ApplyAbility + CompleteActionAndScheduleNext), rounded onto levels."""
+        HpF = {a: ActorHp}
+        BuffF: Dict[int, float] = {}
+
+        if not (Cost > 0 and ActorMp < Cost):
+            ActorMp -= Cost
+            QteMult = QteMultipliersAttack.get(Outcome, 1.0)
+            StatsA = self.Effective(a, Buffs)
+            StatsT = self.Effective(t, Buffs)
+            PowA = StatsA[PowIndex]
+            if A.Kind == "Attack":
+                Damage = PowA / 5.0 * PowRatio(PowA, StatsT[PowIndex]) * QteMult * A.Mult
+                if AddMpCostToOutput:
+                    Damage += Cost
+                HpF[t] = max(0.0, HpF.get(t, self.HpValue(t, Hp[t])) - max(0.0, round(Damage)))
+            elif A.Kind == "Heal":
+                Heal = PowA / 5.0 * PowRatio(StatsA[VitIndex], StatsT[VitIndex]) * QteMult * A.Mult
+                if AddMpCostToOutput:
+                    Heal += Cost
+                HpF[t] = min(self.MaxHp[t], HpF.get(t, self.HpValue(t, Hp[t])) + max(0.0, round(Heal)))
+            elif A.Kind == "Buff" and A.Name in self.BuffIndex:
+                Seconds = RoundTenths(6.0 * PowRatio(StatsA[VitIndex], StatsT[VitIndex]) * QteMult)
+                k = t * self.B + self.BuffIndex[A.Name]
+                BuffF[k] = Buffs[k] * self.BuffStep + Seconds * 10
+            # Defend lapses at the end of this same turn, so it only costs its delay
+
+        # Round every changed value onto its levels; the branches multiply out
+        Branches: List[Tuple[List, float]] = [([], 1.0)]
+        for c, Value in HpF.items():
+            Split = self.HpSplit(c, Value)
+            Branches = [(Set + [(0, c, L)], P * Q) for Set, P in Branches for L, Q in Split]
+        for k, Value in BuffF.items():
+            Split = self.Levels(Value, self.BuffStep, self.BuffLevels)
+            Branches = [(Set + [(1, k, L)], P * Q) for Set, P in Branches for L, Q in Split]
+        if self.TrackMp[a]:
+            MpSplit = self.Levels(ActorMp, self.MaxMp[a] / self.MpLevels, self.MpLevels)
+        else:
+            MpSplit = [(self.MpLevels, 1.0)]
+
+        Results = []
+        for Set, P in Branches:
+            H, Bf = list(Hp), list(Buffs)
+            for Kind, c, L in Set:
+                (H if Kind == 0 else Bf)[c] = L
+            for c in HpF:
+                if not H[c]:
+                    Bf[c * self.B:(c + 1) * self.B] = [0] * self.B
+            # a buff on the mover takes effect before its next turn is scheduled
+            DexRatio = PowRatio(self.Effective(a, Bf)[DexIndex], self.Effective(t, Bf)[DexIndex])
+            Delay = self.DelayTenths(A.BaseDelay / max(0.15, DexRatio))
+            for M, Q in MpSplit:
+                Results.append(((tuple(H), M, Delay, tuple(Bf)), P * Q))
+        return Results
+
+    # ---------------- chain ----------------
+
+    def StateBound(self) -> int:
+        """Upper bound on the state count from each combatant's own ranges (cheap, often 10x loose)."""
+        Dex = [S[DexIndex] for S in self.Stats]
+        DexMults = [m[DexIndex] for m in self.BuffMults] or [1.0]
+        Low, High = math.prod(m for m in DexMults if m < 1), math.prod(m for m in DexMults if m > 1)
+        Opening = self.InitialState()[2]
+        Spaces = []
+        for c in range(self.C):
+            Longest = Opening[c] - min(Opening)  # left over once the first turn comes up
+            for A, _ in self.Abilities[c] + [self.Fallback[c]]:
+                Ratio = min(PowRatio(Dex[c] * Low, Dex[t] * High) for t in self.Targets(c, A))
+                Longest = max(Longest, self.DelayTenths(A.BaseDelay / max(0.15, Ratio)))
+            TimeSlots = Longest // self.TimeStep + 1
+            Spends = self.TrackMp[c] and any(Cost > 0 for _, Cost in self.Abilities[c])
+            Receives = sum(1 for b in range(self.B) if self.CanReceive(c, b))
+            Spaces.append((self.HpLevels + 1) * ((self.MpLevels + 1) if Spends else 1) * TimeSlots *
+                          (self.BuffLevels + 1) ** Receives)
+        Bound = 1
+        Twinned = {c for Group in self.Twins for c in Group}
+        for c in range(self.C):
+            if c not in Twinned:
+                Bound *= Spaces[c]
+        for Group in self.Twins:
+            Bound *= math.comb(Spaces[Group[0]] + len(Group) - 1, len(Group))  # sorted, so a multiset
+        return Bound
+
+    def CanReceive(self, c: int, b: int) -> bool:
+        for s in range(self.C):
+            for A, _ in self.Abilities[s]:
+                if A.Kind != "Buff" or self.BuffIndex.get(A.Name) != b:
+                    continue
+                if (A.Targeting == "Self" and s == c) or (A.Targeting == "Ally Single" and self.IsPlayer[s] == self.IsPlayer[c]):
+                    return True
+        return False
+
+    def StateId(self, State: Tuple) -> int:
+        i = self.Index.get(State)
+        if i is None:
+            if len(self.States) >= self.MaxStates:
+                raise StateBudgetExceeded()
+            i = self.Index[State] = len(self.States)
+            self.States.append(State)
+            Hp = State[0]
+            if not any(h > 0 for h, p in zip(Hp, self.IsPlayer) if not p):
+                self.Outcome.append(1)
+            elif not any(h > 0 for h, p in zip(Hp, self.IsPlayer) if p):
+                self.Outcome.append(-1)
+            else:
+                self.Outcome.append(0)
+        return i
+
+    def IsUndecided(self, Hp: Tuple) -> bool:
+        return (any(h > 0 for h, p in zip(Hp, self.IsPlayer) if p) and
+                any(h > 0 for h, p in zip(Hp, self.IsPlayer) if not p))
+
+    def Explore(self) -> Tuple[int, float]:
+        """Breadth-first build of the chain; returns (start state id, seconds before the first turn)."""
+        # the first turn's start is the only place Advance is not keyed on the grid; time is deterministic
+        Starts = self.Advance(self.InitialState())
+        Elapsed = Starts[0][2]
+        Root = self.StateId(self.Canonical(Starts[0][0]))
+        Aliases: Dict[Tuple, int] = {}  # state as reached -> id of its canonical form
+        Undecided: Dict[Tuple, bool] = {}
+        i = 0
+        while i < len(self.States):
+            Edges: Dict[int, float] = {}
+            Cost = 0.0
+            if not self.Outcome[i]:
+                for Next, P in self.Successors(self.States[i]):
+                    Open = Undecided.get(Next[0])
+                    if Open is None:
+                        Open = Undecided[Next[0]] = self.IsUndecided(Next[0])
+                    for After, Q, Seconds in self.Advance(Next) if Open else [(Next, 1.0, 0.0)]:
+                        j = Aliases.get(After)
+                        if j is None:
+                            j = Aliases[After] = self.StateId(self.Canonical(After))
+                        Edges[j] = Edges.get(j, 0.0) + P * Q
+                        Cost += P * Q * Seconds
+            self.EdgeTo.extend(Edges.keys())
+            self.EdgeP.extend(Edges.values())
+            self.EdgeEnd.append(len(self.EdgeTo))
+            self.Cost.append(Cost)
+            i += 1
+        return Root, Elapsed
+
+    def Components(self) -> List[List[int]]:
+        """Tarjan's strongly connected components, iteratively; successors come before predecessors."""
+        N = len(self.States)
+        Order = [-1] * N
+        Low = [0] * N
+        OnStack = [False] * N
+        Stack: List[int] = []
+        Out: List[List[int]] = []
+        Counter = 0
+        To, End = self.EdgeTo, self.EdgeEnd
+        Start = [0] + list(End[:-1])
+        for Root in range(N):
+            if Order[Root] >= 0:
+                continue
+            Work = [(Root, Start[Root])]  # (state, next edge to follow)
+            Order[Root] = Low[Root] = Counter
+            Counter += 1
+            Stack.append(Root)
+            OnStack[Root] = True
+            while Work:
+                v, k = Work[-1]
+                if k < End[v]:
+                    Work[-1] = (v, k + 1)
+                    w = To[k]
+                    if Order[w] < 0:
+                        Order[w] = Low[w] = Counter
+                        Counter += 1
+                        Stack.append(w)
+                        OnStack[w] = True
+                        Work.append((w, Start[w]))
+                    elif OnStack[w]:
+                        Low[v] = min(Low[v], Order[w])
+                    continue
+                Work.pop()
+                if Work:
+                    u = Work[-1][0]
+                    Low[u] = min(Low[u], Low[v])
+                if Low[v] == Order[v]:
+                    Component = []
+                    while True:
+                        w = Stack.pop()
+                        OnStack[w] = False
+                        Component.append(w)
+                        if w == v:
+                            break
+                    Out.append(Component)
+        return Out
+
+    def SolveChain(self) -> np.ndarray:
+        """Per state: [win probability, expected seconds until decided, stalemate probability]."""
+        N = len(self.States)
+        Values = np.zeros((N, 3))
+        for Component in self.Components():
+            if len(Component) == 1:
+                i = Component[0]
+                if self.Outcome[i]:
+                    Values[i, 0] = 1.0 if self.Outcome[i] > 0 else 0.0
+                    continue
+                Stay = 0.0
+                Rhs = np.array([0.0, self.Cost[i], 0.0])
+                for k in range(self.EdgeEnd[i - 1] if i else 0, self.EdgeEnd[i]):
+                    j, P = self.EdgeTo[k], self.EdgeP[k]
+                    if j == i:
+                        Stay += P
+                    else:
+                        Rhs += P * Values[j]
+                if Stay >= 1.0 - 1e-12:
+                    Values[i] = (0.0, 0.0, 1.0)
+                else:
+                    Values[i] = Rhs / (1.0 - Stay)
+                continue
+            self.SolveComponent(Component, Values)
+        return Values
+
+    def SolveComponent(self, Component: List[int], Values: np.ndarray):
+        n = len(Component)
+        States = np.array(Component)
+        Ends = np.frombuffer(self.EdgeEnd, dtype=np.int64)
+        Starts = np.concatenate(([0], Ends[:-1]))[States]
+        Counts = Ends[States] - Starts
+        # every edge leaving the component's states: its row (local source), target state and probability
+        Rows = np.repeat(np.arange(n), Counts)
+        Edge = np.repeat(Starts - np.cumsum(Counts) + Counts, Counts) + np.arange(len(Rows))
+        Targets = np.frombuffer(self.EdgeTo, dtype=np.int64)[Edge]
+        Probs = np.frombuffer(self.EdgeP)[Edge]
+        Local = np.full(len(self.States), -1)
+        Local[States] = np.arange(n)
+        Cols = Local[Targets]
+        Inside = Cols >= 0
+        Rhs = np.zeros((n, 3))
+        Rhs[:, 1] = np.frombuffer(self.Cost)[States]
+        if Inside.all():
+            # closed: the battle goes round here forever (a stalemate)
+            Values[Component] = (0.0, 0.0, 1.0)
+            return
+        Out = ~Inside
+        for c in range(3):
+            Rhs[:, c] += np.bincount(Rows[Out], Probs[Out] * Values[Targets[Out], c], n)
+        Rows, Cols, Probs = Rows[Inside], Cols[Inside], Probs[Inside]
+        if n <= DenseComponentStates:
+            M = np.eye(n)
+            np.add.at(M, (Rows, Cols), -Probs)
+            Values[Component] = np.linalg.solve(M, Rhs)
+            return
+        X = Rhs.T.copy()  # one row per column: gathers and sums run over contiguous memory
+        for _ in range(MaxIterations):
+            Step = Rhs.T + np.array([np.bincount(Rows, Probs * Col[Cols], n) for Col in X])
+            Change = np.abs(Step - X).max()
+            X = Step
+            if Change <= IterationTolerance * max(1.0, np.abs(X).max()):
+                break
+        X = X.T
+        Values[Component] = X
+
+    def Solve(self) -> Optional[Dict]:
+        """None when the encounter needs more than MaxStates states (too big to solve)."""
+        try:
+            Root, Elapsed = self.Explore()
+        except StateBudgetExceeded:
+            return None
+        Values = self.SolveChain()
+        Win, Duration, Stalemate = Values[Root]
+        return {"WinProbability": float(Win), "ExpectedDuration": Elapsed + float(Duration),
+                "StalemateProbability": float(Stalemate), "States": len(self.States)}
+
+
+def LineupKey(Players: List, Enemies: List) -> Tuple:
+    return tuple((E.Name, E.Level, E.Team) for E in Players + Enemies)
+
+
+def DataKey(Engine: BattleEngine) -> str:
+    """Hash of the databases a solve reads, so edited entities, abilities or balance miss the cache."""
+    Content = json.dumps([Engine.EntitiesDb, Engine.AbilitiesDb, Engine.StatusesDb, Engine.BalanceDb], sort_keys=True)
+    return hashlib.sha256(Content.encode()).hexdigest()
+
+
+def SolveEncounter(Engine: BattleEngine, EncounterName: str, HpLevels: int=DefaultHpLevels, MpLevels: int=2,
+                   PlayerQteOdds: Optional[Dict[str, float]]=None, MaxStates: int=DefaultMaxStates) -> Optional[Dict]:
+    """Memoized by lineup (template + level), data content, quantization and odds.
+
+    Returns None when the lineup does not fit in MaxStates (solving is for small encounters);
+    lineups far past it by StateBound are turned away before any exploring.
+    """
+    Players, Enemies = Engine.MakeEncounterParties(Engine.EncountersByName[EncounterName])
+
+    Odds = PlayerQteOdds or Engine.PlayerQteOdds()
+    Key = (LineupKey(Players, Enemies), DataKey(Engine), HpLevels, MpLevels, tuple(sorted(Odds.items())))
+    Result, Budget = SolveCache.get(Key, (None, 0))
+    if Result is not None or Budget >= MaxStates:
+        return Result
+    Solver = ExactSolver(Engine, Players, Enemies, HpLevels, MpLevels, Odds, MaxStates=MaxStates)
+    Result = None if Solver.StateBound() > MaxStates * BoundSlack else Solver.Solve()
+    SolveCache[Key] = (Result, MaxStates)
+    return Result
+
+
+def main(argv=None):
+    Parser = argparse.ArgumentParser(prog="python -m game.exact",
+                                     description="Markov-chain win probability / expected duration per encounter.")
+    Parser.add_argument("--slot", default="Slot 1")
+    Parser.add_argument("--encounter", action="append", help="limit to this encounter (repeatable)")
+    Parser.add_argument("--hp-levels", type=int, default=DefaultHpLevels)
+    Parser.add_argument("--mp-levels", type=int, default=2)
+    Parser.add_argument("--max-states", type=int, default=DefaultMaxStates)
+    Args = Parser.parse_args(argv)
+
+    CreateDefaultData()
+    Engine = MakeSimEngine(Args.slot)
+    for Name in Args.encounter or [C["Name"] for C in Engine.EncountersDb]:
+        Start = time.perf_counter()
+        R = SolveEncounter(Engine, Name, Args.hp_levels, Args.mp_levels, MaxStates=Args.max_states)
+        Ms = (time.perf_counter() - Start) * 1000.0
+        if R is None:
+            print(f"{Name}: more than {Args.max_states} states, too large to solve ({Ms:.0f} ms)")
+            continue
+        print(f"{Name}: win {R['WinProbability'] * 100:.2f}%, expected {R['ExpectedDuration']:.1f}s "
+              f"({R['States']} states, {Ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import bisect
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Entries per block of SortedBlocks; a block splits at twice this
+BlockLoad = 64
+
+
+class SortedBlocks:
+    """(key, value) pairs in key order, read by position like a list.
+
+    The pairs live in blocks of at most 2 * BlockLoad, with a Fenwick tree over
+    the block lengths. An insert or remove bisects the block maxima, edits one
+    short block and updates log(blocks) tree nodes; reading position i walks
+    the tree down to its block. Only a block split or an emptied block
+    rebuilds the tree, once per BlockLoad changes at most.
+    """
+
+    __slots__ = ("Keys", "Values", "Maxes", "Tree", "Count")
+
+    def __init__(self, Pairs: List[Tuple[Any, Any]]):
+        # Pairs must already be sorted by key
+        self.Keys: List[List] = [[K for K, _ in Pairs[i:i + BlockLoad]] for i in range(0, len(Pairs), BlockLoad)]
+        self.Values: List[List] = [[V for _, V in Pairs[i:i + BlockLoad]] for i in range(0, len(Pairs), BlockLoad)]
+        self.Maxes: List = [Block[-1] for Block in self.Keys]
+        self.Count = len(Pairs)
+        self.BuildTree()
+
+    def __len__(self) -> int:
+        return self.Count
+
+    def __iter__(self) -> Iterator:
+        for Block in self.Values:
+            yield from Block
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += self.Count
+        if not 0 <= i < self.Count:
+            raise IndexError("SortedBlocks index out of range")
+        b, Offset = self.Locate(i)
+        return self.Values[b][Offset]
+
+    # ---------------- Fenwick tree over block lengths ----------------
+
+    def BuildTree(self):
+        Tree = [0] + [len(Block) for Block in self.Keys]
+        for i in range(1, len(Tree)):
+            j = i + (i & -i)
+            if j < len(Tree):
+                Tree[j] += Tree[i]
+        self.Tree = Tree
+
+    def TreeAdd(self, b: int, Delta: int):
+        i = b + 1
+        while i < len(self.Tree):
+            self.Tree[i] += Delta
+            i += i & -i
+
+    def Locate(self, i: int) -> Tuple[int, int]:
+        """(block, offset) of position i: descend the tree, skipping blocks that end at or before i."""
+        Tree = self.Tree
+        Pos = 0
+        Step = 1 << (len(Tree) - 1).bit_length()
+        while Step:
+            Next = Pos + Step
+            if Next < len(Tree) and Tree[Next] <= i:
+                Pos = Next
+                i -= Tree[Next]
+            Step >>= 1
+        return Pos, i
+
+    # ---------------- Edits ----------------
+
+    def Insert(self, Key, Value):
+        self.Count += 1
+        if not self.Keys:
+            self.Keys.append([Key])
+            self.Values.append([Value])
+            self.Maxes.append(Key)
+            self.BuildTree()
+            return
+        b = min(bisect.bisect_left(self.Maxes, Key), len(self.Maxes) - 1)
+        Keys, Values = self.Keys[b], self.Values[b]
+        k = bisect.bisect_left(Keys, Key)
+        Keys.insert(k, Key)
+        Values.insert(k, Value)
+        self.Maxes[b] = Keys[-1]
+        if len(Keys) > 2 * BlockLoad:
+            self.Keys[b:b + 1] = [Keys[:BlockLoad], Keys[BlockLoad:]]
+            self.Values[b:b + 1] = [Values[:BlockLoad], Values[BlockLoad:]]
+            self.Maxes[b:b + 1] = [Keys[BlockLoad - 1], Keys[-1]]
+            self.BuildTree()
+        else:
+            self.TreeAdd(b, 1)
+
+    def Remove(self, Key):
+        b = bisect.bisect_left(self.Maxes, Key)
+        Keys = self.Keys[b] if b < len(self.Keys) else []
+        k = bisect.bisect_left(Keys, Key)
+        if k == len(Keys) or Keys[k] != Key:
+            raise KeyError(Key)
+        self.Count -= 1
+        del Keys[k]
+        del self.Values[b][k]
+        if Keys:
+            self.Maxes[b] = Keys[-1]
+            self.TreeAdd(b, -1)
+        else:
+            del self.Keys[b], self.Values[b], self.Maxes[b]
+            self.BuildTree()
+
+
+class InventoryIndex:
+    """A save's Inventory list with a name -> slot index and a view sorted by stack value.
+
+    Items is the save's own list, so Save.json keeps its format. Changes go
+    through Add, which moves the one changed stack within the sorted view
+    (a SortedBlocks, so in log time) instead of re-sorting. Equal stack values
+    keep inventory order, like the stable sort the panel used to run every frame.
+    """
+
+    __slots__ = ("Items", "ItemsByName", "Slots", "View", "Version")
+
+    def __init__(self, Items: List[Dict], ItemsByName: Dict[str, Dict]):
+        self.Items = Items
+        self.ItemsByName = ItemsByName
+        self.Slots: Dict[str, int] = {}
+        for i, It in enumerate(Items):
+            self.Slots.setdefault(It["Name"], i)
+        # keyed by (-stack value, slot)
+        self.View = SortedBlocks(sorted((self.Key(i), Items[i]) for i in range(len(Items))))
+        self.Version = 0  # bumped on every change, for cheap redraw checks
+
+    def __len__(self) -> int:
+        return len(self.Items)
+
+    def StackValue(self, It: Dict) -> int:
+        return int(self.ItemsByName.get(It["Name"], {"Value": 0})["Value"]) * It["Amount"]
+
+    def Key(self, Slot: int) -> Tuple[int, int]:
+        return (-self.StackValue(self.Items[Slot]), Slot)
+
+    def Add(self, Name: str, Amount: int):
+        Slot = self.Slots.get(Name)
+        if Slot is None:
+            Slot = self.Slots[Name] = len(self.Items)
+            self.Items.append({"Name": Name, "Amount": Amount})
+        else:
+            self.View.Remove(self.Key(Slot))
+            self.Items[Slot]["Amount"] += Amount
+        self.View.Insert(self.Key(Slot), self.Items[Slot])
+        self.Version += 1
@@ -1,40 +1,35 @@
 import json
-import os
-import random
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import pygame
 
+from .battle import BattleEngine
 from .data_loader import CreateDefaultData
-from .entities import Ability, BattleEntity, FloatingNumber, Item, StatusEffect
-from .ui import Button, Tooltip
+from .entities import Ability, BattleEntity, FloatingNumber, Item, StatNames, StatusEffect
+from .ui import Button, DrawChrome, GetFont, GetOverlay, HitGrid, ReleasePools, RenderText, SharedTextCache, Tooltip
 from .utils import *
 
 
-class Game:
+class Game(BattleEngine):
     def __init__(self):
         pygame.init()
+        # fonts pooled before an earlier pygame.quit() are dead
+        ReleasePools()
         pygame.display.set_caption("QTE ATB Battle v2")
         self.Screen = pygame.display.set_mode((ScreenWidth, ScreenHeight))
         self.Clock = pygame.time.Clock()
 
-        self.FontSmall = pygame.font.Font(FontName, 16)
-        self.Font = pygame.font.Font(FontName, 20)
-        self.FontBig = pygame.font.Font(FontName, 28)
-        self.FontHuge = pygame.font.Font(FontName, 40)
+        self.FontSmall = GetFont(FontName, 16)
+        self.Font = GetFont(FontName, 20)
+        self.FontBig = GetFont(FontName, 28)
+        self.FontHuge = GetFont(FontName, 40)
 
         CreateDefaultData()
 
-        self.QteSpeed = 420.0  # needed before LoadDatabase
-        self.LoadDatabase()
+        super().__init__()
 
         self.Tooltip = Tooltip()
 
-        self.Mode = "Title"  # "Title" | "Battle" | "Dev"
-        self.SubMode = ""
-
-        self.ActiveSave: Optional[Dict] = None
-
         self.TitleButtons = [
             Button(pygame.Rect(520, 250, 240, 48), "Load Slot 1"),
             Button(pygame.Rect(520, 310, 240, 48), "New Slot 1"),
@@ -43,13 +38,8 @@ class Game:
 
         self.DevButton = Button(pygame.Rect(ScreenWidth-110, 10, 100, 36), "DEV")
 
-        # Battle runtime
-        self.BattleTime = 0.0
-        self.BattleFrozen = False
-        self.PlayerParty: List[BattleEntity] = []
-        self.EnemyParty: List[BattleEntity] = []
+        # Battle visuals
         self.FloatingNumbers: List[FloatingNumber] = []
-        self.BattleRewards: Dict = {}
 
         # Selection/inspect
         self.InspectSelection: Optional[Tuple[str, int]] = None  # (Team, Index)
@@ -70,288 +60,65 @@ class Game:
         self.QtePressed = False
         self.QteRadius = 0.0
         self.QteRadii = {}
+        self.QteRingLayer: Optional[Tuple[pygame.Rect, pygame.Surface]] = None  # static rings + labels
 
         # Inventory scrolling
         self.InventoryScroll = 0
 
+        # Hover / click index: (layout key, grid), rebuilt when the key changes
+        self.HitIndex: Optional[Tuple[Tuple, HitGrid]] = None
+
+        # Expert enemy AI search running for the current "Enemy Act"
+        self.EnemySearch = None
+
+        # Mass-battle formation scrolling, in grid rows
+        self.FormationScroll = {"Player": 0, "Enemy": 0}
+
+        # Dirty-rect rendering: what the last frame showed
+        self.LastScene: Optional[Tuple] = None
+        self.LastRegions: Dict[Tuple, Tuple[pygame.Rect, Tuple]] = {}
+        self.LastFloatRects: List[pygame.Rect] = []
+        self.ForceRedraw = True
+
         # Dev Menu
         self.DevTab = "Entities"
         self.DevSelectedName = ""
         self.DevScroll = 0
-
-    # ---------------- Database ----------------
-
-    def LoadDatabase(self):
-        self.EntitiesDb = LoadJson(os.path.join(DataFolder, "Entities.json"), [])
-        self.AbilitiesDb = LoadJson(os.path.join(DataFolder, "Abilities.json"), [])
-        self.ItemsDb = LoadJson(os.path.join(DataFolder, "Items.json"), [])
-        self.AreasDb = LoadJson(os.path.join(DataFolder, "Areas.json"), [])
-        self.EncountersDb = LoadJson(os.path.join(DataFolder, "Encounters.json"), [])
-        self.BalanceDb = LoadJson(os.path.join(DataFolder, "Balance.json"), {})
-
-        self.EntitiesByName = {E["Name"]: E for E in self.EntitiesDb}
-        self.AbilitiesByName = {A["Name"]: A for A in self.AbilitiesDb}
-        self.ItemsByName = {I["Name"]: I for I in self.ItemsDb}
-        self.EncountersByName = {C["Name"]: C for C in self.EncountersDb}
-        self.AreasByName = {A["Name"]: A for A in self.AreasDb}
-
-        self.QteSpeed = float(self.BalanceDb.get("QTE Ring Speed", self.QteSpeed))
-
-    def SaveDatabase(self):
-        SaveJson(os.path.join(DataFolder, "Entities.json"), self.EntitiesDb)
-        SaveJson(os.path.join(DataFolder, "Abilities.json"), self.AbilitiesDb)
-        SaveJson(os.path.join(DataFolder, "Items.json"), self.ItemsDb)
-        SaveJson(os.path.join(DataFolder, "Areas.json"), self.AreasDb)
-        SaveJson(os.path.join(DataFolder, "Encounters.json"), self.EncountersDb)
-        SaveJson(os.path.join(DataFolder, "Balance.json"), self.BalanceDb)
-        self.LoadDatabase()
-
-    # ---------------- Saves ----------------
-
-    def SavePath(self, SlotName: str) -> str:
-        return os.path.join(SavesFolder, SlotName, "Save.json")
-
-    def LoadSave(self, SlotName: str) -> Optional[Dict]:
-        Path = self.SavePath(SlotName)
-        if not os.path.exists(Path):
-            return None
-        return LoadJson(Path, None)
-
-    def CreateNewSave(self, SlotName: str):
-        EnsureFolder(os.path.join(SavesFolder, SlotName))
-        Save = {
-            "Slot": SlotName,
-            "Gold": 0,
-            "Party": [
-                {"Name": "Hero", "Level": 6, "Xp": 0},
-                {"Name": "Rogue", "Level": 6, "Xp": 0},
-            ],
-            "Inventory": [
-                {"Name": "Potion", "Amount": 2},
-                {"Name": "Ether", "Amount": 1},
-            ],
-            "Area": "Starter Field",
-            "Options": {"Difficulty": "Normal"}
-        }
-        SaveJson(self.SavePath(SlotName), Save)
-        self.ActiveSave = Save
-
-    def PersistSave(self):
-        if not self.ActiveSave:
-            return
-        EnsureFolder(os.path.join(SavesFolder, self.ActiveSave["Slot"]))
-        SaveJson(self.SavePath(self.ActiveSave["Slot"]), self.ActiveSave)
+        self.DevDifficulty: Dict[str, List[str]] = {}  # area name -> exact odds readout
+        self.DevTabLayer: Optional[Tuple[Tuple, pygame.Rect, pygame.Surface]] = None  # (key, strip rect, layer)
 
     # ============================================================
     # Battle Setup
     # ============================================================
 
-    def MakeBattleEntity(self, EntityName: str, Team: str, OverrideLevel: Optional[int]=None) -> BattleEntity:
-        T = self.EntitiesByName[EntityName]
-        Level = int(OverrideLevel if OverrideLevel is not None else T.get("Level", 1))
-        Weights = dict(T.get("Weights", {}))
-        AbilityNames = list(T.get("Abilities", []))
-        DropTable = list(T.get("Drop Table", []))
-        E = BattleEntity(
-            Name=T["Name"],
-            Level=Level,
-            Weights=Weights,
-            AbilityNames=AbilityNames,
-            DropTable=DropTable,
-            Team=Team,
-        )
-        E.CurrentHp = E.MaxHp()
-        E.CurrentMp = E.MaxMp()
-        E.LagHp = E.CurrentHp
-        E.LagMp = E.CurrentMp
-        return E
-
-    def StartBattleFromArea(self):
-        if not self.ActiveSave:
-            S = self.LoadSave("Slot 1")
-            if not S:
-                self.CreateNewSave("Slot 1")
-            else:
-                self.ActiveSave = S
-
-        AreaName = self.ActiveSave.get("Area", "Starter Field")
-        Area = self.AreasByName.get(AreaName, None)
-        EncounterNames = Area.get("Encounters", []) if Area else []
-        if not EncounterNames:
-            EncounterNames = ["Field Encounter 1"]
-        EncounterName = random.choice(EncounterNames)
-        Encounter = self.EncountersByName.get(EncounterName)
-
-        self.PlayerParty = []
-        for P in self.ActiveSave["Party"]:
-            Name = P["Name"]
-            Level = int(P.get("Level", self.EntitiesByName[Name].get("Level", 1)))
-            self.PlayerParty.append(self.MakeBattleEntity(Name, "Player", OverrideLevel=Level))
-
-        self.EnemyParty = []
-        for EnemyName in Encounter["Enemy Party"]:
-            self.EnemyParty.append(self.MakeBattleEntity(EnemyName, "Enemy"))
-
-        self.BattleTime = 0.0
-        self.BattleFrozen = False
+    def StartBattle(self, EncounterName: str):
+        super().StartBattle(EncounterName)
         self.FloatingNumbers = []
-        self.BattleRewards = {}
         self.InventoryScroll = 0
+        self.FormationScroll = {"Player": 0, "Enemy": 0}
+        if self.EnemySearch is not None:
+            self.EnemySearch.Stop()
+            self.EnemySearch = None
 
         # Default inspect selection
         self.InspectSelection = ("Player", 0)
 
-        # Initialize starting next-action times using dex bias
-        All = self.PlayerParty + self.EnemyParty
-        AvgDex = sum(e.Stat("Dexterity") for e in All) / max(1, len(All))
-        for E in All:
-            DexRatio = PowRatio(E.Stat("Dexterity"), AvgDex)
-            StartDelay = RoundTenths(max(0.5, 5.0 / max(0.15, DexRatio)))
-            E.NextActionTime = StartDelay
-
-        self.Mode = "Battle"
-        self.SubMode = "Free"
         self.SelectedAbility = None
         self.SelectedTargetIndex = 0
         self.TargetTeam = "Enemy"
 
-    # ============================================================
-    # Abilities / Costs / Effects
-    # ============================================================
-
-    def GetAbility(self, AbilityName: str) -> Ability:
-        A = self.AbilitiesByName[AbilityName]
-        return Ability(
-            Name=A["Name"],
-            Kind=A["Kind"],
-            Targeting=A["Targeting"],
-            BaseDelay=float(A["Base Delay"]),
-            Mult=float(A["Mult"]),
-            BaseMpCost=float(A["Base MP Cost"]),
-            Description=A.get("Description", "")
-        )
-
-    def ComputeMpCost(self, Caster: BattleEntity, AbilityObj: Ability) -> int:
-        Base = float(AbilityObj.BaseMpCost)
-        if Base <= 0:
-            return 0
-        Vit = max(1.0, Caster.Stat("Vitality"))
-        Scaled = Base * ((Vit / MpVitalityScale) ** MpVitalityExponent)
-        return int(round(max(1.0, Scaled)))
-
-    def AddOrExtendStatusTurns(self, EntityObj: BattleEntity, StatusName: str, Turns: int, Description: str=""):
-        for S in EntityObj.Statuses:
-            if S.Name == StatusName and S.DurationMaxSeconds <= 0:
-                S.RemainingTurns += Turns
-                return
-        EntityObj.Statuses.append(StatusEffect(Name=StatusName, RemainingTurns=Turns, Description=Description))
-
-    def AddTimedBuff(self, EntityObj: BattleEntity, BuffName: str, DurationSeconds: float, Description: str=""):
-        # stack duration of same exact kind
-        for S in EntityObj.Statuses:
-            if S.Name == BuffName and S.DurationMaxSeconds > 0:
-                # extend both remaining and max so % stays consistent for display simplicity
-                S.DurationSeconds += DurationSeconds
-                S.DurationMaxSeconds += DurationSeconds
-                return
-        EntityObj.Statuses.append(StatusEffect(Name=BuffName,
-                                              RemainingTurns=0,
-                                              DurationSeconds=DurationSeconds,
-                                              DurationMaxSeconds=DurationSeconds,
-                                              Description=Description))
-
-    def TickTimedBuffs(self, Dt: float):
-        for E in self.PlayerParty + self.EnemyParty:
-            NewStatuses = []
-            for S in E.Statuses:
-                if S.DurationMaxSeconds > 0:
-                    S.DurationSeconds = max(0.0, S.DurationSeconds - Dt)
-                    if S.DurationSeconds <= 0.0:
-                        continue
-                NewStatuses.append(S)
-            E.Statuses = NewStatuses
-
-    def EffectiveStat(self, E: BattleEntity, StatName: str) -> float:
-        Base = E.Stat(StatName)
-        for S in E.Statuses:
-            if S.Name == "Rally (Power +20%)" and StatName == "Power":
-                Base *= 1.20
-            if S.Name == "Focus (Precision +25%)" and StatName == "Precision":
-                Base *= 1.25
-        return Base
-
     def SpawnFloatOnEntity(self, EntityObj: BattleEntity, Text: str, Color: Tuple[int,int,int], Size: int):
-        TeamList = self.PlayerParty if EntityObj.Team == "Player" else self.EnemyParty
-        Index = TeamList.index(EntityObj)
-        R = self.EntityRect(EntityObj.Team, Index)
+        R = self.EntityRect(EntityObj.Team, EntityObj.Slot)
         self.FloatingNumbers.append(FloatingNumber(
-            X=R.centerx, Y=R.y - 10, Text=Text, Color=Color, Size=Size
+            X=R.centerx, Y=R.y - 10, Text=Text, Color=Color, Size=Size,
+            Surface=RenderText(GetFont(FontName, Size), Text, True, Color)
         ))
 
-    def ApplyAbility(self, Caster: BattleEntity, Target: BattleEntity, AbilityObj: Ability, QteOutcome: str):
-        if AbilityObj.Kind == "Passive":
-            return
-
-        MpCost = self.ComputeMpCost(Caster, AbilityObj)
-        if MpCost > 0 and not Caster.SpendMp(MpCost):
-            self.FloatingNumbers.append(FloatingNumber(
-                X=640, Y=60, Text="Not enough MP!", Color=(255,120,120), Size=22, Life=0.9
-            ))
-            return
-
-        QteMult = QteMultipliersAttack.get(QteOutcome, 1.0)
-
-        if AbilityObj.Kind == "Attack":
-            Base = self.EffectiveStat(Caster, "Power") / 5.0
-            Ratio = PowRatio(self.EffectiveStat(Caster, "Power"), self.EffectiveStat(Target, "Power"))
-            Damage = Base * Ratio * QteMult * AbilityObj.Mult
-            if AddMpCostToOutput:
-                Damage += MpCost
-            Damage = max(0.0, round(Damage))
-            Target.TakeDamage(Damage)
-
-            Color = (240,240,240)
-            Size = 22
-            if QteOutcome == "Crit":
-                Color = (255, 235, 80)
-                Size = 28
-            elif QteOutcome == "Vital":
-                Color = (255, 80, 80)
-                Size = 36
-            elif QteOutcome == "Miss":
-                Color = (200,200,200)
-                Size = 20
-            self.SpawnFloatOnEntity(Target, f"{FormatNumber(Damage)}", Color, Size)
-
-        elif AbilityObj.Kind == "Heal":
-            Base = self.EffectiveStat(Caster, "Power") / 5.0
-            Ratio = PowRatio(self.EffectiveStat(Caster, "Vitality"), self.EffectiveStat(Target, "Vitality"))
-            Heal = Base * Ratio * QteMult * AbilityObj.Mult
-            if AddMpCostToOutput:
-                Heal += MpCost
-            Heal = max(0.0, round(Heal))
-            Target.HealHp(Heal)
-            self.SpawnFloatOnEntity(Target, f"+{FormatNumber(Heal)}", (70,255,110), 28 if QteOutcome != "Miss" else 20)
-
-        elif AbilityObj.Kind == "Defend":
-            self.AddOrExtendStatusTurns(
-                Caster,
-                "Defend",
-                1,
-                Description="1 turn: -25% damage taken, x2 regen, +25% defense QTE window."
-            )
-
-        elif AbilityObj.Kind == "Buff":
-            BaseDuration = 6.0
-            DurRatio = PowRatio(self.EffectiveStat(Caster, "Vitality"), self.EffectiveStat(Target, "Vitality"))
-            Duration = RoundTenths(BaseDuration * DurRatio * QteMult)
-
-            if AbilityObj.Name == "Rally":
-                self.AddTimedBuff(Target, "Rally (Power +20%)", Duration, Description="Power +20%.")
-            elif AbilityObj.Name == "Focus":
-                self.AddTimedBuff(Target, "Focus (Precision +25%)", Duration, Description="Precision +25%.")
-            else:
-                self.AddTimedBuff(Target, f"{AbilityObj.Name} (Buff)", Duration, Description=AbilityObj.Description)
+    def SpawnFloatMessage(self, Text: str, Color: Tuple[int,int,int], Size: int, Life: float=0.8):
+        self.FloatingNumbers.append(FloatingNumber(
+            X=640, Y=60, Text=Text, Color=Color, Size=Size, Life=Life,
+            Surface=RenderText(GetFont(FontName, Size), Text, True, Color)
+        ))
 
     # ============================================================
     # QTE (Ring)
@@ -389,6 +156,37 @@ class Game:
             "HitOuter": HitOuter
         }
         self.QteRadius = HitOuter + 30.0  # start outside hit ring
+        self.QteRingLayer = self.BuildQteRingLayer()
+
+    def QteCenter(self) -> Tuple[int, int]:
+        return ScreenWidth // 2, ScreenHeight // 2 + 10
+
+    def BuildQteRingLayer(self) -> Tuple[pygame.Rect, pygame.Surface]:
+        # the zone rings and their labels only change with QteRadii, so they are drawn once per QTE
+        center = self.QteRadii["Center"]
+        vital = self.QteRadii["VitalOuter"]
+        crit = self.QteRadii["CritOuter"]
+        hit = self.QteRadii["HitOuter"]
+        labels = [
+            (RenderText(self.FontSmall, "HIT", True, (220,220,220)), hit),
+            (RenderText(self.FontSmall, "CRIT", True, (255,235,80)), crit),
+            (RenderText(self.FontSmall, "VITAL", True, (255,80,80)), vital),
+        ]
+        cx, cy = self.QteCenter()
+        Bounds = pygame.Rect(0, 0, int(hit) * 2 + 1, int(hit) * 2 + 1)
+        Bounds.center = (cx, cy)
+        for s, r in labels:
+            Bounds.union_ip(s.get_rect(topleft=(cx + r + 10, cy - 8)))
+
+        Layer = pygame.Surface(Bounds.size, pygame.SRCALPHA)
+        lx, ly = cx - Bounds.x, cy - Bounds.y
+        pygame.draw.circle(Layer, (90,90,100), (lx,ly), int(hit), width=3)
+        pygame.draw.circle(Layer, (120,120,140), (lx,ly), int(crit), width=3)
+        pygame.draw.circle(Layer, (150,140,80), (lx,ly), int(vital), width=3)
+        pygame.draw.circle(Layer, (120,120,120), (lx,ly), int(center), width=3)
+        for s, r in labels:
+            Layer.blit(s, (lx + r + 10, ly - 8))
+        return Bounds, Layer
 
     def ResolveQtePress(self) -> str:
         R = self.QteRadius
@@ -418,82 +216,23 @@ class Game:
             self.QteResult = "Hit"
             self.QtePressed = True
 
-    # ============================================================
-    # Enemy Virtual QTE
-    # ============================================================
-
-    def ChooseFromProbabilities(self, ProbDict: Dict[str, float]) -> str:
-        Roll = random.random()
-        Acc = 0.0
-        for K, V in ProbDict.items():
-            Acc += V
-            if Roll <= Acc:
-                return K
-        return list(ProbDict.keys())[-1]
-
-    def EnemyVirtualQteAttack(self, Attacker: BattleEntity, Defender: BattleEntity) -> str:
-        Strength = float(self.BalanceDb.get("Enemy QTE Shift Strength", EnemyQteShiftStrength))
-        Base = dict(self.BalanceDb.get("Enemy QTE Baseline Attack", EnemyQteBaselineAttack))
-        PrecRatio = PowRatio(self.EffectiveStat(Attacker, "Precision"), self.EffectiveStat(Defender, "Precision"))
-        Shift = Clamp((PrecRatio - 1.0) * Strength, -0.45, 0.45)
-
-        HitTake = min(Base["Hit"], abs(Shift))
-        if Shift > 0:
-            Base["Hit"] -= HitTake
-            Base["Crit"] += HitTake * 0.70
-            Base["Vital"] += HitTake * 0.30
-        else:
-            Base["Hit"] -= HitTake
-            Base["Miss"] += HitTake
-
-        Total = sum(max(0.0, v) for v in Base.values())
-        if Total <= 0:
-            return "Hit"
-        Norm = {k: max(0.0, v) / Total for k, v in Base.items()}
-        return self.ChooseFromProbabilities(Norm)
-
     # ============================================================
     # Turn Flow
     # ============================================================
 
-    def GetEntityByTeamIndex(self, Team: str, Index: int) -> Optional[BattleEntity]:
-        if Team == "Player":
-            if 0 <= Index < len(self.PlayerParty):
-                return self.PlayerParty[Index]
-        if Team == "Enemy":
-            if 0 <= Index < len(self.EnemyParty):
-                return self.EnemyParty[Index]
-        return None
-
-    def GetNextActor(self) -> Optional[Tuple[str, int, BattleEntity]]:
-        Candidates = []
-        for i, e in enumerate(self.PlayerParty):
-            if e.Alive:
-                Candidates.append(("Player", i, e))
-        for i, e in enumerate(self.EnemyParty):
-            if e.Alive:
-                Candidates.append(("Enemy", i, e))
-        if not Candidates:
-            return None
-        Candidates.sort(key=lambda t: t[2].NextActionTime)
-        Team, Index, E = Candidates[0]
-        if E.NextActionTime <= self.BattleTime + 1e-6:
-            return (Team, Index, E)
-        return None
-
     def FreezeForTurn(self, Team: str, Index: int):
         self.BattleFrozen = True
         self.ActiveTeam = Team
         self.ActiveEntityIndex = Index
 
-        Actor = self.GetEntityByTeamIndex(Team, Index)
-        if Actor and Actor.Alive:
-            Actor.ApplyTurnRegen()
+        self.BeginTurn(Team, Index)
 
         # default inspect follows active
         self.InspectSelection = (Team, Index)
 
-        if Team == "Player":
+        if Team == "Player" and self.PlayerParty[Index].AutoControl:
+            self.SubMode = "Ally Act"
+        elif Team == "Player":
             self.SubMode = "Choose Action"
             self.SelectedAbility = None
             self.SelectedTargetIndex = 0
@@ -510,108 +249,24 @@ class Game:
             return "Player"
         return "Enemy"
 
-    def GetTargetList(self) -> List[Tuple[BattleEntity, pygame.Rect]]:
-        Targets = []
-        if self.TargetTeam == "Enemy":
-            for i, E in enumerate(self.EnemyParty):
-                if E.Alive:
-                    Targets.append((E, self.EntityRect("Enemy", i)))
-        else:
-            for i, E in enumerate(self.PlayerParty):
-                if E.Alive:
-                    Targets.append((E, self.EntityRect("Player", i)))
-        return Targets
-
     def GetSelectedTarget(self) -> Optional[BattleEntity]:
-        Targets = self.GetTargetList()
-        if not Targets:
+        # SelectedTargetIndex is the ordinal among living targets
+        Count = self.BattleState.AliveCount(self.TargetTeam)
+        if not Count:
             return None
-        self.SelectedTargetIndex = int(Clamp(self.SelectedTargetIndex, 0, len(Targets)-1))
-        return Targets[self.SelectedTargetIndex][0]
-
-    def CompleteActionAndScheduleNext(self, Actor: BattleEntity, Target: BattleEntity, AbilityObj: Ability):
-        DexRatio = PowRatio(self.EffectiveStat(Actor, "Dexterity"), self.EffectiveStat(Target, "Dexterity"))
-        Delay = RoundTenths(AbilityObj.BaseDelay / max(0.15, DexRatio))
-        Actor.NextActionTime = RoundTenths(self.BattleTime + Delay)
-
-        # Decrement 1-turn statuses like Defend at end of actor's turn
-        NewStatuses = []
-        for S in Actor.Statuses:
-            if S.DurationMaxSeconds <= 0 and S.RemainingTurns > 0:
-                if S.Name == "Defend":
-                    S.RemainingTurns -= 1
-                if S.RemainingTurns > 0:
-                    NewStatuses.append(S)
-            else:
-                NewStatuses.append(S)
-        Actor.Statuses = NewStatuses
-
-    # ============================================================
-    # Rewards / Drops / XP
-    # ============================================================
-
-    def XpForEnemy(self, EnemyLevel: int) -> int:
-        return int(round((5 + EnemyLevel) ** 1.5))
-
-    def GoldForEnemy(self, EnemyLevel: int) -> int:
-        return self.XpForEnemy(EnemyLevel)
-
-    def RollDropTable(self, Enemy: BattleEntity) -> List[Tuple[str, int]]:
-        Drops = []
-        for Entry in Enemy.DropTable:
-            Qty = int(Entry["Quantity"])
-            ItemName = Entry["Item"]
-            Num = int(Entry["Chance Numerator"])
-            Den = int(Entry["Chance Denominator"])
-            if Den <= 0:
-                continue
-            if random.random() <= (Num / Den):
-                Drops.append((ItemName, Qty))
-        return Drops
-
-    def GiveItemToInventory(self, ItemName: str, Amount: int):
-        Inv = self.ActiveSave["Inventory"]
-        for It in Inv:
-            if It["Name"] == ItemName:
-                It["Amount"] += Amount
-                return
-        Inv.append({"Name": ItemName, "Amount": Amount})
-
-    def EndBattle(self, PlayerWon: bool):
-        self.SubMode = "Battle End"
-        self.BattleFrozen = True
-
-        TotalXp = 0
-        TotalGold = 0
-        LootDrops: List[Tuple[str,int]] = []
-
-        if PlayerWon and self.ActiveSave:
-            for E in self.EnemyParty:
-                TotalXp += self.XpForEnemy(E.Level)
-                TotalGold += self.GoldForEnemy(E.Level)
-                LootDrops.extend(self.RollDropTable(E))
-
-            self.ActiveSave["Gold"] += TotalGold
-            for P in self.ActiveSave["Party"]:
-                P["Xp"] = int(P.get("Xp", 0) + TotalXp)
-
-            for Name, Qty in LootDrops:
-                self.GiveItemToInventory(Name, Qty)
-
-            self.PersistSave()
-
-        self.BattleRewards = {
-            "PlayerWon": PlayerWon,
-            "TotalXp": TotalXp,
-            "TotalGold": TotalGold,
-            "Loot": LootDrops
-        }
+        self.SelectedTargetIndex = int(Clamp(self.SelectedTargetIndex, 0, Count-1))
+        return self.AliveMember(self.TargetTeam, self.SelectedTargetIndex)
 
     # ============================================================
     # Layout / Rects
     # ============================================================
 
     def EntityRect(self, Team: str, Index: int) -> pygame.Rect:
+        if self.IsMassFormation(Team):
+            Cols, _, Pitch, Cell = self.FormationGrid(Team)
+            Area = self.FormationArea(Team)
+            Row = Index // Cols - self.FormationScroll[Team]
+            return pygame.Rect(Area.x + (Index % Cols) * Pitch, Area.y + Row * Pitch, Cell, Cell)
         # shifted left; no player/enemy labels
         Size = 96
         Gap = 18
@@ -621,6 +276,48 @@ class Game:
             return pygame.Rect(X0 + Index*(Size+Gap), Y0, Size, Size)
         return pygame.Rect(X0 + Index*(Size+Gap), 445, Size, Size)
 
+    # ---------------- mass-battle formations ----------------
+
+    def FormationArea(self, Team: str) -> pygame.Rect:
+        # left of the inventory / inspect panels
+        if Team == "Enemy":
+            return pygame.Rect(20, 70, 810, 340)
+        return pygame.Rect(20, 430, 810, 270)
+
+    def IsMassFormation(self, Team: str) -> bool:
+        # one row of 96px boxes holds 7; bigger parties switch to a scrolling grid
+        return len(self.PartyOf(Team)) > 7
+
+    def FormationGrid(self, Team: str) -> Tuple[int, int, int, int]:
+        """(columns, visible rows, pitch, cell size) of a mass formation."""
+        Cell = 44
+        Pitch = Cell + 6
+        Area = self.FormationArea(Team)
+        return (Area.w // Pitch, Area.h // Pitch, Pitch, Cell)
+
+    def VisibleSlots(self, Team: str) -> range:
+        Count = len(self.PartyOf(Team))
+        if not self.IsMassFormation(Team):
+            return range(Count)
+        Cols, Rows, _, _ = self.FormationGrid(Team)
+        First = self.FormationScroll[Team] * Cols
+        return range(First, min(Count, First + Rows * Cols))
+
+    def ScrollFormation(self, Team: str, Rows: int):
+        Cols, Visible, _, _ = self.FormationGrid(Team)
+        Total = (len(self.PartyOf(Team)) + Cols - 1) // Cols
+        self.FormationScroll[Team] = int(Clamp(self.FormationScroll[Team] + Rows, 0, max(0, Total - Visible)))
+
+    def EnsureSlotVisible(self, Team: str, Index: int):
+        if not self.IsMassFormation(Team):
+            return
+        Cols, Visible, _, _ = self.FormationGrid(Team)
+        Row = Index // Cols
+        if Row < self.FormationScroll[Team]:
+            self.ScrollFormation(Team, Row - self.FormationScroll[Team])
+        elif Row >= self.FormationScroll[Team] + Visible:
+            self.ScrollFormation(Team, Row - self.FormationScroll[Team] - Visible + 1)
+
     def InspectPanelRect(self) -> pygame.Rect:
         # below inventory panel
         return pygame.Rect(850, 430, 380, 270)
@@ -629,12 +326,10 @@ class Game:
     # Inventory UI
     # ============================================================
 
-    def GetInventorySorted(self) -> List[Dict]:
-        if not self.ActiveSave:
-            return []
-        Inv = list(self.ActiveSave.get("Inventory", []))
-        Inv.sort(key=lambda it: int(self.ItemsByName.get(it["Name"], {"Value": 0})["Value"]) * it["Amount"], reverse=True)
-        return Inv
+    def GetInventorySorted(self) -> Sequence[Dict]:
+        # the model's own sorted view: read it, don't modify it
+        Model = self.InventoryModel()
+        return Model.View if Model else []
 
     # ============================================================
     # Tooltips
@@ -654,9 +349,9 @@ class Game:
             Lines.append("Statuses:")
             for S in E.Statuses:
                 if S.DurationMaxSeconds > 0:
-                    Lines.append(f" • {S.Name} ({S.DurationSeconds:.1f}s)")
+                    Lines.append(f" • {S.Name} ({self.StatusSecondsLeft(S):.1f}s)")
                 else:
-                    Lines.append(f" • {S.Name} (Turns: {S.RemainingTurns})")
+                    Lines.append(f" • {S.Name} (Turns: {self.StatusTurnsLeft(E, S)})")
         return Lines
 
     def ItemTooltipLines(self, Name: str, Amount: int) -> List[str]:
@@ -682,6 +377,9 @@ class Game:
         ]
         Cost = self.ComputeMpCost(Actor, AbilityObj)
         Lines.append(f"MP Cost: {FormatNumber(Cost)}")
+        Preview = self.ExpectedOutcomeLine(Actor, AbilityObj)
+        if Preview:
+            Lines.append(Preview)
         if AbilityObj.Description:
             Lines.append("")
             Lines.append(AbilityObj.Description)
@@ -693,6 +391,30 @@ class Game:
             Lines.append(DisabledReason)
         return Lines
 
+    def PreviewTarget(self, Actor: BattleEntity, AbilityObj: Ability) -> Optional[BattleEntity]:
+        if AbilityObj.Targeting == "Self":
+            return Actor
+        if self.SubMode == "Choose Target" and self.SelectedAbility is AbilityObj:
+            return self.GetSelectedTarget()
+        Team = Actor.Team if AbilityObj.Targeting == "Ally Single" else ("Enemy" if Actor.Team == "Player" else "Player")
+        if not self.BattleState.AliveCount(Team):
+            return None
+        return self.AliveMember(Team, 0)
+
+    def ExpectedOutcomeLine(self, Actor: BattleEntity, AbilityObj: Ability) -> str:
+        # read from the battle's expected-outcome table; nothing is recomputed while hovering
+        if self.Mode != "Battle" or AbilityObj.Kind not in ("Attack", "Heal", "Buff"):
+            return ""
+        Target = self.PreviewTarget(Actor, AbilityObj)
+        if Target is None:
+            return ""
+        Amount = self.Outcomes.Get(Actor, AbilityObj, Target)
+        if AbilityObj.Kind == "Attack":
+            return f"Expected: {FormatNumber(round(Amount))} damage to {Target.Name}"
+        if AbilityObj.Kind == "Heal":
+            return f"Expected: +{FormatNumber(round(Amount))} HP on {Target.Name}"
+        return f"Expected: {Amount:.1f}s on {Target.Name}"
+
     # ============================================================
     # Dev Menu helpers
     # ============================================================
@@ -711,6 +433,23 @@ class Game:
     def DevSaveRect(self) -> pygame.Rect:
         return pygame.Rect(ScreenWidth-150, 62, 130, 36)
 
+    def DevTabStrip(self) -> Tuple[pygame.Rect, pygame.Surface]:
+        # tab frames and labels composed into one layer, rebuilt when the active tab changes
+        Tabs = self.DevTabs()
+        Key = (tuple(Tabs), self.DevTab)
+        if self.DevTabLayer is None or self.DevTabLayer[0] != Key:
+            Rects = [self.DevTabRect(tab, i) for i, tab in enumerate(Tabs)]
+            Strip = Rects[0].unionall(Rects[1:])
+            Layer = pygame.Surface(Strip.size, pygame.SRCALPHA)
+            for tab, r in zip(Tabs, Rects):
+                active = (tab == self.DevTab)
+                r = r.move(-Strip.x, -Strip.y)
+                DrawChrome(Layer, r, (40,40,50) if active else (28,28,34), (160,160,190) if active else (90,90,110), 2, 10)
+                t = RenderText(self.FontSmall, tab, True, (240,240,240))
+                Layer.blit(t, t.get_rect(center=r.center))
+            self.DevTabLayer = (Key, Strip, Layer)
+        return self.DevTabLayer[1], self.DevTabLayer[2]
+
     # ============================================================
     # Main Loop
     # ============================================================
@@ -735,6 +474,8 @@ class Game:
 
     def HandleEvent(self, Event):
         MousePos = pygame.mouse.get_pos()
+        if Event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            self.ForceRedraw = True
 
         if self.Mode == "Title":
             if Event.type == pygame.MOUSEMOTION:
@@ -784,9 +525,11 @@ class Game:
 
             if Event.type == pygame.MOUSEWHEEL:
                 # inventory scroll when hovering inventory
-                inv_panel = pygame.Rect(850, 60, 380, 360)
-                if inv_panel.collidepoint(MousePos):
-                    self.InventoryScroll = max(0, self.InventoryScroll - int(Event.y * 30))
+                if self.InventoryPanelRect().collidepoint(MousePos):
+                    self.ScrollInventory(-int(Event.y * 30))
+                for Team in ("Enemy", "Player"):
+                    if self.IsMassFormation(Team) and self.FormationArea(Team).collidepoint(MousePos):
+                        self.ScrollFormation(Team, -int(Event.y))
 
                 # dev scroll handled in dev mode
 
@@ -796,6 +539,10 @@ class Game:
                         self.SelectedTargetIndex = max(0, self.SelectedTargetIndex - 1)
                     if Event.key == pygame.K_RIGHT:
                         self.SelectedTargetIndex += 1
+                    if Event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                        Target = self.GetSelectedTarget()
+                        if Target:
+                            self.EnsureSlotVisible(self.TargetTeam, Target.Slot)
                     if Event.key == pygame.K_RETURN:
                         self.BeginPlayerQte()
                     if Event.key == pygame.K_ESCAPE:
@@ -826,25 +573,21 @@ class Game:
 
     def ClickEntitySelect(self, MousePos) -> bool:
         # Click entities
-        for i, E in enumerate(self.EnemyParty):
-            if self.EntityRect("Enemy", i).collidepoint(MousePos):
-                self.InspectSelection = ("Enemy", i)
-                return True
-        for i, E in enumerate(self.PlayerParty):
-            if self.EntityRect("Player", i).collidepoint(MousePos):
-                self.InspectSelection = ("Player", i)
-                return True
+        Hit = self.HitTest(MousePos)
+        if Hit and Hit[0] == "Entity":
+            self.InspectSelection = (Hit[1], Hit[2])
+            return True
         return False
 
     def ClickTargetAt(self, MousePos) -> bool:
-        Targets = self.GetTargetList()
-        if not Targets:
+        Hit = self.HitTest(MousePos)
+        if not Hit or Hit[0] != "Entity" or Hit[1] != self.TargetTeam:
             return False
-        for i, (_, Rect) in enumerate(Targets):
-            if Rect.collidepoint(MousePos):
-                self.SelectedTargetIndex = i
-                return True
-        return False
+        i = Hit[2]
+        if not self.PartyOf(self.TargetTeam)[i].Alive:
+            return False
+        self.SelectedTargetIndex = self.BattleState.Teams[self.TargetTeam].Rank(i)
+        return True
 
     # Inspect panel ability clicking
     def ClickInspectAbility(self, MousePos) -> bool:
@@ -858,30 +601,79 @@ class Game:
             return False
 
         Actor = self.PlayerParty[Index]
-        Panel = self.InspectPanelRect()
-        if not Panel.collidepoint(MousePos):
-            return False
 
         # abilities list rects
-        rects = self.GetInspectAbilityRects(Actor, Panel)
-        for (AbilityName, Rect) in rects:
-            if Rect.collidepoint(MousePos):
-                AObj = self.GetAbility(AbilityName)
-                # passive abilities are non-clickable
-                if AObj.Kind == "Passive":
-                    return True
-                # mp requirement
-                cost = self.ComputeMpCost(Actor, AObj)
-                if cost > 0 and Actor.CurrentMp < cost:
-                    return True
-                self.SelectedAbility = AObj
-                self.TargetTeam = self.DetermineTargetTeam(AObj)
-                self.SelectedTargetIndex = 0
-                self.SubMode = "Choose Target" if AObj.Targeting != "Self" else "QTE"
-                if self.SubMode == "QTE":
-                    self.BeginPlayerQte()
-                return True
-        return False
+        Hit = self.HitTest(MousePos)
+        if not Hit or Hit[0] != "Ability":
+            return False
+        AObj = self.GetAbility(Hit[1])
+        # passive abilities are non-clickable
+        if AObj.Kind == "Passive":
+            return True
+        # mp requirement
+        cost = self.ComputeMpCost(Actor, AObj)
+        if cost > 0 and Actor.CurrentMp < cost:
+            return True
+        self.SelectedAbility = AObj
+        self.TargetTeam = self.DetermineTargetTeam(AObj)
+        self.SelectedTargetIndex = 0
+        self.SubMode = "Choose Target" if AObj.Targeting != "Self" else "QTE"
+        if self.SubMode == "QTE":
+            self.BeginPlayerQte()
+        return True
+
+    # ---------------- hit-test index ----------------
+
+    def HitLayoutKey(self) -> Tuple:
+        # everything the hover / click rects depend on; per-entity detail only for the small row layout
+        Parties = []
+        for Team in ("Enemy", "Player"):
+            Party = self.PartyOf(Team)
+            if self.IsMassFormation(Team):
+                Parties.append((len(Party), self.FormationScroll[Team]))
+            else:
+                Parties.append((len(Party), tuple((E.Alive, min(5, len(E.Statuses))) for E in Party)))
+        Model = self.InventoryModel()
+        Ent = self.GetEntityByTeamIndex(*self.InspectSelection) if self.InspectSelection else None
+        return (tuple(Parties), len(Model) if Model else -1, self.InventoryScroll,
+                self.InspectSelection, tuple(Ent.AbilityNames) if Ent else None)
+
+    def BuildHitGrid(self) -> HitGrid:
+        # add order is hover priority: entities, inventory, inspect abilities, statuses
+        Grid = HitGrid()
+        for Team in ("Enemy", "Player"):
+            for i in self.VisibleSlots(Team):
+                Grid.Add(self.EntityRect(Team, i), ("Entity", Team, i))
+
+        if self.ActiveSave:
+            Panel = self.InventoryPanelRect()
+            for idx in self.VisibleInventorySlots(Panel, len(self.GetInventorySorted())):
+                Grid.Add(self.InventoryItemRect(Panel, idx).clip(Panel), ("Item", idx))
+
+        Ent = self.GetEntityByTeamIndex(*self.InspectSelection) if self.InspectSelection else None
+        if Ent:
+            Panel = self.InspectPanelRect()
+            for Name, R in self.GetInspectAbilityRects(Ent, Panel):
+                Grid.Add(R.clip(Panel), ("Ability", Name))
+
+        # mass formations don't draw statuses
+        for Team in ("Enemy", "Player"):
+            if self.IsMassFormation(Team):
+                continue
+            Party = self.PartyOf(Team)
+            for i in self.VisibleSlots(Team):
+                if Party[i].Alive:
+                    for k, (_, R) in enumerate(self.StatusRectsForEntity(Party[i], self.EntityRect(Team, i))):
+                        Grid.Add(R, ("Status", Team, i, k))
+        return Grid
+
+    def HitTest(self, Pos) -> Optional[Tuple]:
+        """What the battle screen has under Pos: ("Entity", team, index), ("Item", sorted index),
+        ("Ability", name) or ("Status", team, index, status slot)."""
+        Key = self.HitLayoutKey()
+        if self.HitIndex is None or self.HitIndex[0] != Key:
+            self.HitIndex = (Key, self.BuildHitGrid())
+        return self.HitIndex[1].At(Pos)
 
     # ============================================================
     # Tick
@@ -894,8 +686,7 @@ class Game:
         self.Tooltip.Hide()
 
         # Update bars and floats always
-        for E in self.PlayerParty + self.EnemyParty:
-            E.TickVisualBars(Dt)
+        self.BattleState.TickVisualBars(Dt)
 
         new_f = []
         for F in self.FloatingNumbers:
@@ -912,8 +703,8 @@ class Game:
             self.BattleTime += Dt
             self.BattleTime = max(0.0, self.BattleTime)
 
-            # timed buffs tick only while free
-            self.TickTimedBuffs(Dt)
+            # timed buffs run on battle time, which only advances while free
+            self.ExpireTimedBuffs()
 
             nxt = self.GetNextActor()
             if nxt:
@@ -921,10 +712,7 @@ class Game:
                 self.FreezeForTurn(Team, Index)
 
             # end checks
-            if all(not e.Alive for e in self.EnemyParty):
-                self.EndBattle(PlayerWon=True)
-            if all(not e.Alive for e in self.PlayerParty):
-                self.EndBattle(PlayerWon=False)
+            self.CheckBattleEnd()
 
         elif self.SubMode == "Enemy Act":
             Enemy = self.EnemyParty[self.ActiveEntityIndex]
@@ -933,33 +721,39 @@ class Game:
                 self.BattleFrozen = False
                 return
 
-            targets = [p for p in self.PlayerParty if p.Alive]
-            if not targets:
+            # Expert enemies think on a worker thread; frames keep drawing until it
+            # finishes or the budget runs out, then the deepest finished answer is used
+            Choice = None
+            if self.EnemySearch is None and self.TacticalAiApplies():
+                Budget = float(self.BalanceDb.get("Enemy AI Budget Ms", EnemyAiBudgetMs))
+                self.EnemySearch = self.BeginTacticalSearch(Enemy, BudgetMs=Budget)
+                self.EnemySearch.Start()
+            if self.EnemySearch is not None:
+                if not self.EnemySearch.Done and not self.EnemySearch.OutOfTime():
+                    return
+                self.EnemySearch.Stop()
+                # no finished depth: take the cheap random move rather than let
+                # ChooseEnemyAction search again on this frame
+                Choice = self.TacticalChoice(self.EnemySearch) or self.ChooseRandomEnemyAction(Enemy)
+                self.EnemySearch = None
+                if Choice is None:
+                    self.EndBattle(PlayerWon=False)
+                    return
+
+            if not self.EnemyTakeTurn(Enemy, Choice):
                 self.EndBattle(PlayerWon=False)
                 return
-            target = random.choice(targets)
-
-            ability_name = random.choice(Enemy.AbilityNames)
-            AObj = self.GetAbility(ability_name)
-
-            cost = self.ComputeMpCost(Enemy, AObj)
-            if cost > 0 and Enemy.CurrentMp < cost:
-                AObj = self.GetAbility("Attack")
 
-            if AObj.Targeting == "Self":
-                target = Enemy
-            elif AObj.Targeting == "Ally Single":
-                allies = [e for e in self.EnemyParty if e.Alive]
-                target = random.choice(allies)
-            else:
-                target = random.choice([p for p in self.PlayerParty if p.Alive])
-
-            outcome = self.EnemyVirtualQteAttack(Enemy, target)
-            self.ApplyAbility(Enemy, target, AObj, outcome)
-            self.CompleteActionAndScheduleNext(Enemy, target, AObj)
+            self.SubMode = "Free"
+            self.BattleFrozen = False
 
+        elif self.SubMode == "Ally Act":
+            Ally = self.PlayerParty[self.ActiveEntityIndex]
+            if Ally.Alive:
+                self.AutoPlayerTurn(Ally)
             self.SubMode = "Free"
             self.BattleFrozen = False
+            self.CheckBattleEnd()
 
         elif self.SubMode == "QTE":
             self.TickQte(Dt)
@@ -975,10 +769,7 @@ class Game:
                 self.SubMode = "Free"
                 self.BattleFrozen = False
 
-                if all(not e.Alive for e in self.EnemyParty):
-                    self.EndBattle(PlayerWon=True)
-                if all(not e.Alive for e in self.PlayerParty):
-                    self.EndBattle(PlayerWon=False)
+                self.CheckBattleEnd()
 
     # ============================================================
     # Player QTE start
@@ -1003,98 +794,95 @@ class Game:
 
     def BattleHoverTooltips(self):
         mp = pygame.mouse.get_pos()
+        Hit = self.HitTest(mp)
+        if not Hit:
+            return
 
         # Entities
-        for i, E in enumerate(self.EnemyParty):
-            r = self.EntityRect("Enemy", i)
-            if r.collidepoint(mp):
-                self.Tooltip.Show(mp, self.EntityTooltipLines(E))
-                return
-        for i, E in enumerate(self.PlayerParty):
-            r = self.EntityRect("Player", i)
-            if r.collidepoint(mp):
-                self.Tooltip.Show(mp, self.EntityTooltipLines(E))
-                return
+        if Hit[0] == "Entity":
+            self.Tooltip.Show(mp, self.EntityTooltipLines(self.PartyOf(Hit[1])[Hit[2]]))
 
         # Inventory items
-        inv_panel = pygame.Rect(850, 60, 380, 360)
-        if inv_panel.collidepoint(mp) and self.ActiveSave:
-            items = self.GetInventorySorted()
-            item_rects = self.InventoryItemRects(inv_panel, items)
-            for (name, amount, rect) in item_rects:
-                if rect.collidepoint(mp):
-                    self.Tooltip.Show(mp, self.ItemTooltipLines(name, amount))
-                    return
+        elif Hit[0] == "Item":
+            it = self.GetInventorySorted()[Hit[1]]
+            self.Tooltip.Show(mp, self.ItemTooltipLines(it["Name"], int(it["Amount"])))
 
         # Inspect abilities hover
-        sel = self.InspectSelection
-        if sel:
-            team, idx = sel
-            panel = self.InspectPanelRect()
-            if panel.collidepoint(mp):
-                if team in ("Player", "Enemy"):
-                    actor = self.GetEntityByTeamIndex(team, idx)
-                    if actor:
-                        # abilities hover
-                        rects = self.GetInspectAbilityRects(actor, panel)
-                        for (ability_name, rect) in rects:
-                            if rect.collidepoint(mp):
-                                ab = self.GetAbility(ability_name)
-                                disabled = ""
-                                if ab.Kind == "Passive":
-                                    disabled = "(Passive)"
-                                else:
-                                    if self.SubMode == "Choose Action" and team == "Player" and self.ActiveEntityIndex == idx:
-                                        cost = self.ComputeMpCost(actor, ab)
-                                        if cost > 0 and actor.CurrentMp < cost:
-                                            disabled = "Not enough MP"
-                                    else:
-                                        # not your turn
-                                        if team == "Player":
-                                            disabled = "Not your turn"
-                                self.Tooltip.Show(mp, self.AbilityTooltipLines(actor, ab, DisabledReason=("" if disabled in ("(Passive)", "") else disabled)))
-                                return
+        elif Hit[0] == "Ability":
+            team, idx = self.InspectSelection
+            actor = self.GetEntityByTeamIndex(team, idx)
+            ab = self.GetAbility(Hit[1])
+            disabled = ""
+            if ab.Kind == "Passive":
+                disabled = "(Passive)"
+            else:
+                if self.SubMode == "Choose Action" and team == "Player" and self.ActiveEntityIndex == idx:
+                    cost = self.ComputeMpCost(actor, ab)
+                    if cost > 0 and actor.CurrentMp < cost:
+                        disabled = "Not enough MP"
+                else:
+                    # not your turn
+                    if team == "Player":
+                        disabled = "Not your turn"
+            self.Tooltip.Show(mp, self.AbilityTooltipLines(actor, ab, DisabledReason=("" if disabled in ("(Passive)", "") else disabled)))
 
         # Status hover under bars
-        for team, party in (("Enemy", self.EnemyParty), ("Player", self.PlayerParty)):
-            for i, E in enumerate(party):
-                if not E.Alive:
-                    continue
-                base = self.EntityRect(team, i)
-                status_rects = self.StatusRectsForEntity(E, base)
-                for (status_obj, rect) in status_rects:
-                    if rect.collidepoint(mp):
-                        lines = [status_obj.Name]
-                        if status_obj.Description:
-                            lines.append(status_obj.Description)
-                        if status_obj.DurationMaxSeconds > 0:
-                            lines.append(f"Remaining: {status_obj.DurationSeconds:.1f}s")
-                        else:
-                            lines.append(f"Turns: {status_obj.RemainingTurns}")
-                        self.Tooltip.Show(mp, lines)
-                        return
+        elif Hit[0] == "Status":
+            owner = self.PartyOf(Hit[1])[Hit[2]]
+            status_obj = owner.Statuses[Hit[3]]
+            lines = [status_obj.Name]
+            if status_obj.Description:
+                lines.append(status_obj.Description)
+            if status_obj.DurationMaxSeconds > 0:
+                lines.append(f"Remaining: {self.StatusSecondsLeft(status_obj):.1f}s")
+            else:
+                lines.append(f"Turns: {self.StatusTurnsLeft(owner, status_obj)}")
+            self.Tooltip.Show(mp, lines)
 
     # ============================================================
     # Inventory rects
     # ============================================================
 
-    def InventoryItemRects(self, Panel: pygame.Rect, Items: List[Dict]) -> List[Tuple[str, int, pygame.Rect]]:
-        # simple grid 3 columns
+    def InventoryPanelRect(self) -> pygame.Rect:
+        return pygame.Rect(850, 60, 380, 360)
+
+    def InventoryGrid(self) -> Tuple[int, int, int, int]:
+        # (pad, box, pitch, cols): simple grid 3 columns
         pad = 12
         box = 78
         gap = 10
-        cols = 3
-        out = []
+        return pad, box, box + gap, 3
+
+    def VisibleInventorySlots(self, Panel: pygame.Rect, Count: int) -> range:
+        # rows overlapping the panel body at the current scroll, by row math
+        _, box, pitch, cols = self.InventoryGrid()
         start_y = Panel.y + 54 - self.InventoryScroll
-        for idx, it in enumerate(Items):
-            r = idx // cols
-            c = idx % cols
-            x = Panel.x + pad + c * (box + gap)
-            y = start_y + r * (box + gap)
-            rect = pygame.Rect(x, y, box, box)
-            out.append((it["Name"], int(it["Amount"]), rect))
+        first = max(0, -((start_y + box - Panel.y - 50) // pitch))
+        last = (Panel.bottom - 10 - start_y) // pitch
+        return range(first * cols, min(Count, (last + 1) * cols))
+
+    def InventoryItemRect(self, Panel: pygame.Rect, Index: int) -> pygame.Rect:
+        pad, box, pitch, cols = self.InventoryGrid()
+        r, c = divmod(Index, cols)
+        return pygame.Rect(Panel.x + pad + c * pitch, Panel.y + 54 - self.InventoryScroll + r * pitch, box, box)
+
+    def InventoryItemRects(self, Panel: pygame.Rect, Items: Sequence[Dict]) -> List[Tuple[str, int, pygame.Rect]]:
+        # only the stacks in view
+        out = []
+        for idx in self.VisibleInventorySlots(Panel, len(Items)):
+            it = Items[idx]
+            out.append((it["Name"], int(it["Amount"]), self.InventoryItemRect(Panel, idx)))
         return out
 
+    def ScrollInventory(self, Pixels: int):
+        _, box, pitch, cols = self.InventoryGrid()
+        Panel = self.InventoryPanelRect()
+        Model = self.InventoryModel()
+        Rows = (len(Model) + cols - 1) // cols if Model else 0
+        # last row's bottom may rise to the panel's bottom margin
+        Bottom = 54 + max(0, Rows - 1) * pitch + box
+        self.InventoryScroll = int(Clamp(self.InventoryScroll + Pixels, 0, max(0, Bottom - (Panel.h - 10))))
+
     # ============================================================
     # Inspect panel ability list rects
     # ============================================================
@@ -1135,6 +923,41 @@ class Game:
     # ============================================================
 
     def Draw(self):
+        if not DirtyRectRendering:
+            self.DrawFrame()
+            pygame.display.flip()
+            return
+
+        Scene = self.SceneSignature()
+        Regions = self.RegionSignatures()
+        FloatRects = self.FloatRects()
+        if self.ForceRedraw or Scene != self.LastScene:
+            self.DrawFrame()
+            pygame.display.flip()
+        else:
+            Dirty = list(self.LastFloatRects) + FloatRects
+            for Key, (R, Sig) in Regions.items():
+                Last = self.LastRegions.get(Key)
+                if Last is None or Last[1] != Sig:
+                    Dirty.append(R)
+                    if Last is not None and Last[0] != R:
+                        Dirty.append(Last[0])
+            if Dirty:
+                # one clipped repaint per dirty area, so a bar at the top and a number at
+                # the bottom don't repaint everything between them; overlapping areas merge
+                Clips = self.MergeOverlapping([self.SnapToWidgets(R, Regions) for R in Dirty])
+                for Clip in Clips:
+                    self.Screen.set_clip(Clip)
+                    self.DrawFrame()
+                self.Screen.set_clip(None)
+                pygame.display.update(Clips)
+
+        self.LastScene = Scene
+        self.LastRegions = Regions
+        self.LastFloatRects = FloatRects
+        self.ForceRedraw = False
+
+    def DrawFrame(self):
         self.Screen.fill((8, 8, 10))
 
         if self.Mode == "Title":
@@ -1145,13 +968,124 @@ class Game:
             self.DrawDev()
 
         self.Tooltip.Draw(self.Screen, self.FontSmall)
-        pygame.display.flip()
+
+    # ---------------- dirty-rect bookkeeping ----------------
+
+    def SceneSignature(self) -> Tuple:
+        """State whose change repaints the whole screen: mode, turn, selections, hover, tooltip."""
+        Save = self.ActiveSave or {}
+        Scene = (
+            self.Mode, self.SubMode, self.BattleFrozen, self.ActiveTeam, self.ActiveEntityIndex,
+            self.SelectedAbility.Name if self.SelectedAbility else "", self.TargetTeam, self.SelectedTargetIndex,
+            self.InspectSelection, tuple(self.FormationScroll.values()), self.QtePressed, self.QteResult,
+            self.Tooltip.Visible, self.Tooltip.Pos if self.Tooltip.Visible else None, tuple(self.Tooltip.TextLines),
+            self.DevButton.Hovered, tuple(B.Hovered for B in self.TitleButtons),
+            Save.get("Slot"), Save.get("Gold"), len(self.PlayerParty), len(self.EnemyParty),
+        )
+        if self.Mode == "Dev":
+            Scene += (self.DevTab, self.DevSelectedName, self.DevScroll,
+                      tuple((K, tuple(V)) for K, V in list(self.DevDifficulty.items())))
+        return Scene
+
+    def RegionSignatures(self) -> Dict[Tuple, Tuple[pygame.Rect, Tuple]]:
+        """Regions that change inside a scene (timers, bars, statuses, the QTE ring) with what they show."""
+        Regions: Dict[Tuple, Tuple[pygame.Rect, Tuple]] = {}
+        if self.Mode == "Dev":
+            C = SharedTextCache
+            Regions[("TextCache",)] = (self.DevCacheStatsRect(), (len(C.Entries), C.Hits, C.Misses))
+        if self.Mode != "Battle":
+            return Regions
+
+        Regions[("Time",)] = (pygame.Rect(20, 10, 260, 20), (f"{self.BattleTime:.1f}",))
+        for Team in ("Enemy", "Player"):
+            Party = self.PartyOf(Team)
+            Mass = self.IsMassFormation(Team)
+            for i in self.VisibleSlots(Team):
+                E = Party[i]
+                R = self.EntityRect(Team, i)
+                Card = R.inflate(8, 8) if Mass else pygame.Rect(R.x, R.y - 16, R.w, R.h + 16 + 40 + 5 * 22)
+                if not Mass:
+                    # status labels run past the card's right edge
+                    for s, rr in self.StatusRectsForEntity(E, R):
+                        Card.union_ip(self.StatusLabelRect(E, s, rr))
+                Regions[("Entity", Team, i)] = (Card, self.EntitySignature(E, R, Mass))
+            if Mass:
+                Area = self.FormationArea(Team)
+                Regions[("Standing", Team)] = (pygame.Rect(Area.x, Area.bottom, Area.w, 20), (self.BattleState.AliveCount(Team),))
+
+        Model = self.InventoryModel()
+        Inv = (id(Model.Items), Model.Version) if Model else None
+        Regions[("Inventory",)] = (self.InventoryPanelRect(), (Inv, self.InventoryScroll))
+
+        Ent = self.GetEntityByTeamIndex(*self.InspectSelection) if self.InspectSelection else None
+        if Ent:
+            Stats = tuple(int(self.EffectiveStat(Ent, N)) for N in StatNames)
+            Regions[("Inspect",)] = (self.InspectPanelRect(), (Ent.Level, Stats, Ent.CurrentMp))
+
+        if self.SubMode == "QTE" and self.QteRadii:
+            Reach = int(self.QteRadii["HitOuter"] + 40)
+            Ring = pygame.Rect(0, 0, Reach * 2, Reach * 2)
+            Ring.center = self.QteCenter()
+            Regions[("QTE",)] = (Ring, (int(max(1, self.QteRadius)),))
+        return Regions
+
+    def EntitySignature(self, E: BattleEntity, R: pygame.Rect, Mass: bool) -> Tuple:
+        # the values DrawParty / DrawMassParty turn into pixels
+        remain = max(0.0, E.NextActionTime - self.BattleTime)
+        readiness = 1.0 - Clamp(remain / 5.0, 0.0, 1.0)
+        hp_max = max(1.0, E.MaxHp())
+        mp_max = max(1.0, E.MaxMp())
+        if Mass:
+            w = R.w - 8
+            return (E.Alive, int(w * readiness), int(w * Clamp(E.CurrentHp / hp_max, 0.0, 1.0)),
+                    int(w * Clamp(E.CurrentMp / mp_max, 0.0, 1.0)))
+        Statuses = tuple(
+            (S.Name, self.StatusTurnsLeft(E, S), f"{self.StatusSecondsLeft(S):.1f}" if S.DurationMaxSeconds > 0 else "",
+             int(R.w * Clamp(self.StatusSecondsLeft(S) / max(0.01, S.DurationMaxSeconds), 0.0, 1.0)) if S.DurationMaxSeconds > 0 else 0)
+            for S in E.Statuses[:5]
+        )
+        return (E.Alive, int(100.0 * readiness), int(E.CurrentHp), int(E.CurrentMp),
+                int(R.w * Clamp(E.LagHp / hp_max, 0.0, 1.0)), int(R.w * Clamp(E.LagMp / mp_max, 0.0, 1.0)), Statuses)
+
+    def SnapToWidgets(self, Clip: pygame.Rect, Regions: Dict[Tuple, Tuple[pygame.Rect, Tuple]]) -> pygame.Rect:
+        # pygame drops a line of an outlined rounded rect when a clip edge cuts through its
+        # border, so grow the clip until no outlined widget straddles the edge
+        Widgets = [R for R, _ in Regions.values()] + [self.DevButton.Rect]
+        Tip = self.Tooltip.Bounds(self.Screen, self.FontSmall)
+        if Tip:
+            Widgets.append(Tip)
+        Grown = True
+        while Grown:
+            Grown = False
+            for W in Widgets:
+                if Clip.colliderect(W) and not Clip.contains(W):
+                    Clip = Clip.union(W)
+                    Grown = True
+        return Clip
+
+    @staticmethod
+    def MergeOverlapping(Rects: List[pygame.Rect]) -> List[pygame.Rect]:
+        Merged: List[pygame.Rect] = []
+        for R in Rects:
+            R = R.copy()
+            # absorbing one rect can make R reach another, so rescan until none collide
+            i = R.collidelist(Merged)
+            while i >= 0:
+                R.union_ip(Merged.pop(i))
+                i = R.collidelist(Merged)
+            Merged.append(R)
+        return Merged
+
+    def FloatRects(self) -> List[pygame.Rect]:
+        if self.Mode != "Battle":
+            return []
+        return [f.Surface.get_rect(center=(int(f.X), int(f.Y))) for f in self.FloatingNumbers]
 
     def DrawTitle(self):
-        title = self.FontHuge.render("QTE ATB Battle v2", True, (240, 240, 240))
+        title = RenderText(self.FontHuge, "QTE ATB Battle v2", True, (240, 240, 240))
         self.Screen.blit(title, title.get_rect(center=(ScreenWidth // 2, 150)))
 
-        hint = self.Font.render("Keyboard: SPACE for QTE, ENTER to confirm target", True, (200, 200, 200))
+        hint = RenderText(self.Font, "Keyboard: SPACE for QTE, ENTER to confirm target", True, (200, 200, 200))
         self.Screen.blit(hint, hint.get_rect(center=(ScreenWidth // 2, 200)))
 
         for b in self.TitleButtons:
@@ -1159,12 +1093,12 @@ class Game:
 
         if self.ActiveSave:
             s = self.ActiveSave
-            txt = self.FontSmall.render(f"Loaded: {s['Slot']}   Gold: {FormatNumber(s.get('Gold',0))}", True, (200,200,200))
+            txt = RenderText(self.FontSmall, f"Loaded: {s['Slot']}   Gold: {FormatNumber(s.get('Gold',0))}", True, (200,200,200))
             self.Screen.blit(txt, (20, ScreenHeight - 30))
 
     def DrawBattle(self):
         # Top time display (round only on display)
-        t = self.FontSmall.render(f"Battle Time: {self.BattleTime:.1f}s", True, (220,220,220))
+        t = RenderText(self.FontSmall, f"Battle Time: {self.BattleTime:.1f}s", True, (220,220,220))
         self.Screen.blit(t, (20, 10))
 
         # DEV button
@@ -1180,11 +1114,9 @@ class Game:
         # Inspect panel
         self.DrawInspectPanel()
 
-        # Floating numbers
+        # Floating numbers (surfaces rendered at spawn)
         for f in self.FloatingNumbers:
-            font = pygame.font.Font(FontName, f.Size)
-            s = font.render(f.Text, True, f.Color)
-            self.Screen.blit(s, s.get_rect(center=(int(f.X), int(f.Y))))
+            self.Screen.blit(f.Surface, f.Surface.get_rect(center=(int(f.X), int(f.Y))))
 
         # QTE overlay
         if self.SubMode == "QTE":
@@ -1195,31 +1127,31 @@ class Game:
             self.DrawBattleEnd()
 
     def DrawParty(self, Team: str, Party: List[BattleEntity]):
+        sel_t = self.GetSelectedTarget() if self.SubMode == "Choose Target" else None
+        if self.IsMassFormation(Team):
+            self.DrawMassParty(Team, Party, sel_t)
+            return
+
         for i, E in enumerate(Party):
             R = self.EntityRect(Team, i)
 
             # highlight if active actor
-            is_active = (self.BattleFrozen and self.ActiveTeam == Team and self.ActiveEntityIndex == i and self.SubMode in ("Choose Action","Choose Target","QTE","Enemy Act"))
+            is_active = (self.BattleFrozen and self.ActiveTeam == Team and self.ActiveEntityIndex == i and self.SubMode in ("Choose Action","Choose Target","QTE","Enemy Act","Ally Act"))
             border_col = (220, 220, 120) if is_active else (110, 110, 125)
 
             # target highlight during target selection
-            if self.SubMode == "Choose Target":
-                targets = self.GetTargetList()
-                if targets:
-                    sel_t = self.GetSelectedTarget()
-                    if sel_t is E:
-                        border_col = (140, 220, 255)
+            if sel_t is E:
+                border_col = (140, 220, 255)
 
             # entity box
-            pygame.draw.rect(self.Screen, (36, 36, 44), R, border_radius=12)
-            pygame.draw.rect(self.Screen, border_col, R, width=3, border_radius=12)
+            DrawChrome(self.Screen, R, (36, 36, 44), border_col, 3, 12)
 
             # name (top)
-            name = self.FontSmall.render(E.Name, True, (240,240,240))
+            name = RenderText(self.FontSmall, E.Name, True, (240,240,240))
             self.Screen.blit(name, name.get_rect(center=(R.centerx, R.y + 22)))
 
             # XP bar (players only) bottom of name box
-            if Team == "Player" and self.ActiveSave:
+            if Team == "Player" and self.ActiveSave and not E.AutoControl:
                 party_entry = None
                 for P in self.ActiveSave.get("Party", []):
                     if P["Name"] == E.Name:
@@ -1245,7 +1177,7 @@ class Game:
             # map remain to readiness. If remain >= 5 => 0, if 0 => 100
             readiness = int(Clamp(100.0 * (1.0 - Clamp(remain / 5.0, 0.0, 1.0)), 0.0, 100.0))
             pygame.draw.rect(self.Screen, (90, 200, 120), pygame.Rect(atb_rect.x, atb_rect.y, int(atb_rect.w * readiness / 100.0), atb_rect.h), border_radius=6)
-            atb_txt = self.FontSmall.render(f"{readiness}/100", True, (240,240,240))
+            atb_txt = RenderText(self.FontSmall, f"{readiness}/100", True, (240,240,240))
             self.Screen.blit(atb_txt, atb_txt.get_rect(center=(R.centerx, atb_rect.centery)))
 
             # bars under box
@@ -1256,9 +1188,44 @@ class Game:
 
             # dead overlay
             if not E.Alive:
-                s = self.FontBig.render("KO", True, (255,90,90))
+                s = RenderText(self.FontBig, "KO", True, (255,90,90))
                 self.Screen.blit(s, s.get_rect(center=R.center))
 
+    def DrawMassParty(self, Team: str, Party: List[BattleEntity], sel_t: Optional[BattleEntity]):
+        # compact cells, only the rows in view; details live in the inspect panel / tooltip
+        Area = self.FormationArea(Team)
+        pygame.draw.rect(self.Screen, (14,14,18), Area, border_radius=10)
+        for i in self.VisibleSlots(Team):
+            E = Party[i]
+            R = self.EntityRect(Team, i)
+            is_active = (self.BattleFrozen and self.ActiveTeam == Team and self.ActiveEntityIndex == i)
+            border_col = (220, 220, 120) if is_active else (90, 90, 105)
+            if sel_t is E:
+                border_col = (140, 220, 255)
+            if self.InspectSelection == (Team, i):
+                border_col = (235, 235, 235)
+
+            DrawChrome(self.Screen, R, (36, 36, 44) if E.Alive else (22, 18, 18), border_col, 2, 6)
+            if not E.Alive:
+                continue
+
+            # ATB along the top, HP / MP along the bottom
+            remain = max(0.0, E.NextActionTime - self.BattleTime)
+            readiness = 1.0 - Clamp(remain / 5.0, 0.0, 1.0)
+            pygame.draw.rect(self.Screen, (90, 200, 120), pygame.Rect(R.x + 4, R.y + 4, int((R.w - 8) * readiness), 3))
+            hp_frac = Clamp(E.CurrentHp / max(1.0, E.MaxHp()), 0.0, 1.0)
+            mp_frac = Clamp(E.CurrentMp / max(1.0, E.MaxMp()), 0.0, 1.0)
+            pygame.draw.rect(self.Screen, (210, 70, 70), pygame.Rect(R.x + 4, R.bottom - 12, int((R.w - 8) * hp_frac), 4))
+            pygame.draw.rect(self.Screen, (65, 120, 255), pygame.Rect(R.x + 4, R.bottom - 6, int((R.w - 8) * mp_frac), 3))
+
+        # scroll position
+        Cols, Rows, _, _ = self.FormationGrid(Team)
+        TotalRows = (len(Party) + Cols - 1) // Cols
+        if TotalRows > Rows:
+            txt = RenderText(self.FontSmall, f"{Team} rows {self.FormationScroll[Team] + 1}-{self.FormationScroll[Team] + Rows} of {TotalRows}  "
+                                        f"({self.BattleState.AliveCount(Team)}/{len(Party)} standing)", True, (170,170,185))
+            self.Screen.blit(txt, (Area.x, Area.bottom + 2))
+
     def DrawBars(self, E: BattleEntity, R: pygame.Rect):
         barw = R.width
         hp_y = R.bottom + 8
@@ -1285,8 +1252,8 @@ class Game:
         pygame.draw.rect(self.Screen, (65,120,255), pygame.Rect(mp.x, mp.y, int(mp.w * mp_cur), mp.h), border_radius=6)
 
         # numbers on bars (centered)
-        hp_txt = self.FontSmall.render(f"{FormatNumber(int(E.CurrentHp))}/{FormatNumber(int(hp_max))}", True, (245,245,245))
-        mp_txt = self.FontSmall.render(f"{FormatNumber(int(E.CurrentMp))}/{FormatNumber(int(mp_max))}", True, (245,245,245))
+        hp_txt = RenderText(self.FontSmall, f"{FormatNumber(int(E.CurrentHp))}/{FormatNumber(int(hp_max))}", True, (245,245,245))
+        mp_txt = RenderText(self.FontSmall, f"{FormatNumber(int(E.CurrentMp))}/{FormatNumber(int(mp_max))}", True, (245,245,245))
         self.Screen.blit(hp_txt, hp_txt.get_rect(center=hp.center))
         self.Screen.blit(mp_txt, mp_txt.get_rect(center=mp.center))
 
@@ -1296,24 +1263,30 @@ class Game:
             # background bar behind timed statuses
             pygame.draw.rect(self.Screen, (18,18,20), rr, border_radius=6)
             if s.DurationMaxSeconds > 0:
-                frac = Clamp(s.DurationSeconds / max(0.01, s.DurationMaxSeconds), 0.0, 1.0)
+                frac = Clamp(self.StatusSecondsLeft(s) / max(0.01, s.DurationMaxSeconds), 0.0, 1.0)
                 pygame.draw.rect(self.Screen, (70,70,90), pygame.Rect(rr.x, rr.y, int(rr.w * frac), rr.h), border_radius=6)
 
-            label = s.Name
-            if s.DurationMaxSeconds > 0:
-                label = f"{s.Name} ({s.DurationSeconds:.1f}s)"
-            else:
-                label = f"{s.Name} ({s.RemainingTurns}t)"
-            txt = self.FontSmall.render(label, True, (235,235,235))
+            txt = self.StatusLabelText(E, s)
             self.Screen.blit(txt, txt.get_rect(midleft=(rr.x + 6, rr.centery)))
 
+    def StatusLabel(self, E: BattleEntity, s: StatusEffect) -> str:
+        if s.DurationMaxSeconds > 0:
+            return f"{s.Name} ({self.StatusSecondsLeft(s):.1f}s)"
+        return f"{s.Name} ({self.StatusTurnsLeft(E, s)}t)"
+
+    def StatusLabelText(self, E: BattleEntity, s: StatusEffect) -> pygame.Surface:
+        return RenderText(self.FontSmall, self.StatusLabel(E, s), True, (235,235,235))
+
+    def StatusLabelRect(self, E: BattleEntity, s: StatusEffect, rr: pygame.Rect) -> pygame.Rect:
+        # the surface DrawStatuses blits, from the text cache, so measuring costs no font work
+        return self.StatusLabelText(E, s).get_rect(midleft=(rr.x + 6, rr.centery))
+
     def DrawInventoryPanel(self):
-        panel = pygame.Rect(850, 60, 380, 360)
-        pygame.draw.rect(self.Screen, (18,18,22), panel, border_radius=14)
-        pygame.draw.rect(self.Screen, (120,120,140), panel, width=2, border_radius=14)
+        panel = self.InventoryPanelRect()
+        DrawChrome(self.Screen, panel, (18,18,22), (120,120,140), 2, 14)
 
         gold = self.ActiveSave.get("Gold", 0) if self.ActiveSave else 0
-        title = self.Font.render(f"Inventory   Gold: {FormatNumber(gold)}", True, (240,240,240))
+        title = RenderText(self.Font, f"Inventory   Gold: {FormatNumber(gold)}", True, (240,240,240))
         self.Screen.blit(title, (panel.x + 14, panel.y + 12))
 
         if not self.ActiveSave:
@@ -1322,27 +1295,21 @@ class Game:
         items = self.GetInventorySorted()
         rects = self.InventoryItemRects(panel, items)
         for name, amount, r in rects:
-            # clip draw to panel
-            if r.bottom < panel.y + 50 or r.y > panel.bottom - 10:
-                continue
-
-            pygame.draw.rect(self.Screen, (40,40,48), r, border_radius=12)
-            pygame.draw.rect(self.Screen, (110,110,130), r, width=2, border_radius=12)
+            DrawChrome(self.Screen, r, (40,40,48), (110,110,130), 2, 12)
 
             # item name centered
-            nm = self.FontSmall.render(name, True, (240,240,240))
+            nm = RenderText(self.FontSmall, name, True, (240,240,240))
             self.Screen.blit(nm, nm.get_rect(center=r.center))
 
             # amount upper-right
-            amt = self.FontSmall.render(str(amount), True, (240,240,240))
+            amt = RenderText(self.FontSmall, str(amount), True, (240,240,240))
             self.Screen.blit(amt, amt.get_rect(topright=(r.right - 6, r.top + 4)))
 
     def DrawInspectPanel(self):
         panel = self.InspectPanelRect()
-        pygame.draw.rect(self.Screen, (18,18,22), panel, border_radius=14)
-        pygame.draw.rect(self.Screen, (120,120,140), panel, width=2, border_radius=14)
+        DrawChrome(self.Screen, panel, (18,18,22), (120,120,140), 2, 14)
 
-        header = self.Font.render("Inspect", True, (240,240,240))
+        header = RenderText(self.Font, "Inspect", True, (240,240,240))
         self.Screen.blit(header, (panel.x + 14, panel.y + 10))
 
         if not self.InspectSelection:
@@ -1362,13 +1329,13 @@ class Game:
             f"Precision: {FormatNumber(int(self.EffectiveStat(ent,'Precision')))}",
         ]
         for L in lines:
-            s = self.FontSmall.render(L, True, (220,220,220))
+            s = RenderText(self.FontSmall, L, True, (220,220,220))
             self.Screen.blit(s, (panel.x + 14, y))
             y += 18
 
         # Abilities section
         y += 4
-        s = self.Font.render("Abilities", True, (240,240,240))
+        s = RenderText(self.Font, "Abilities", True, (240,240,240))
         self.Screen.blit(s, (panel.x + 14, y))
         y += 26
 
@@ -1395,25 +1362,24 @@ class Game:
 
             col_bg = (34,34,40) if can_click else (24,24,28)
             col_border = (120,120,140) if can_click else (80,80,90)
-            pygame.draw.rect(self.Screen, col_bg, rr, border_radius=10)
-            pygame.draw.rect(self.Screen, col_border, rr, width=2, border_radius=10)
+            DrawChrome(self.Screen, rr, col_bg, col_border, 2, 10)
 
             label = ability_name
             cost = self.ComputeMpCost(ent, ab)
             if cost > 0:
                 label = f"{ability_name}  ({FormatNumber(cost)} MP)"
-            txt = self.FontSmall.render(label, True, (240,240,240) if can_click else (150,150,160))
+            txt = RenderText(self.FontSmall, label, True, (240,240,240) if can_click else (150,150,160))
             self.Screen.blit(txt, txt.get_rect(midleft=(rr.x + 8, rr.centery)))
 
             if disabled_reason and disabled_reason != "(Passive)":
-                tag = self.FontSmall.render(disabled_reason, True, (255,170,120))
+                tag = RenderText(self.FontSmall, disabled_reason, True, (255,170,120))
                 self.Screen.blit(tag, tag.get_rect(midright=(rr.right - 8, rr.centery)))
 
         # Drop table for enemies
         if team == "Enemy":
             y2 = panel.y + 44
             drop_y = panel.y + panel.height - 70
-            s2 = self.Font.render("Drop Table", True, (240,240,240))
+            s2 = RenderText(self.Font, "Drop Table", True, (240,240,240))
             self.Screen.blit(s2, (panel.x + 14, drop_y))
             dy = drop_y + 24
             for entry in ent.DropTable[:3]:
@@ -1422,53 +1388,39 @@ class Game:
                 num = entry["Chance Numerator"]
                 den = entry["Chance Denominator"]
                 line = f"{qty}x {item}  ({num}/{den})"
-                ss = self.FontSmall.render(line, True, (220,220,220))
+                ss = RenderText(self.FontSmall, line, True, (220,220,220))
                 self.Screen.blit(ss, (panel.x + 14, dy))
                 dy += 18
 
     def DrawQte(self):
         # dim background
-        overlay = pygame.Surface((ScreenWidth, ScreenHeight), pygame.SRCALPHA)
-        overlay.fill((0,0,0,150))
-        self.Screen.blit(overlay, (0,0))
-
-        cx, cy = ScreenWidth // 2, ScreenHeight // 2 + 10
+        self.Screen.blit(GetOverlay(self.Screen.get_size(), (0,0,0,150)), (0,0))
 
-        # ring zones
-        center = self.QteRadii["Center"]
-        vital = self.QteRadii["VitalOuter"]
-        crit = self.QteRadii["CritOuter"]
+        cx, cy = self.QteCenter()
         hit = self.QteRadii["HitOuter"]
 
-        # draw static rings
-        pygame.draw.circle(self.Screen, (90,90,100), (cx,cy), int(hit), width=3)
-        pygame.draw.circle(self.Screen, (120,120,140), (cx,cy), int(crit), width=3)
-        pygame.draw.circle(self.Screen, (150,140,80), (cx,cy), int(vital), width=3)
-        pygame.draw.circle(self.Screen, (120,120,120), (cx,cy), int(center), width=3)
-
-        # labels
-        self.Screen.blit(self.FontSmall.render("HIT", True, (220,220,220)), (cx + hit + 10, cy - 8))
-        self.Screen.blit(self.FontSmall.render("CRIT", True, (255,235,80)), (cx + crit + 10, cy - 8))
-        self.Screen.blit(self.FontSmall.render("VITAL", True, (255,80,80)), (cx + vital + 10, cy - 8))
+        # static rings and labels, pre-rendered in BeginQte
+        if self.QteRingLayer is None:
+            self.QteRingLayer = self.BuildQteRingLayer()
+        bounds, layer = self.QteRingLayer
+        self.Screen.blit(layer, bounds)
 
         # moving ring
         rr = int(max(1, self.QteRadius))
         pygame.draw.circle(self.Screen, (240,240,240), (cx,cy), rr, width=6)
 
-        tip = self.Font.render("Press SPACE on the ring timing", True, (240,240,240))
+        tip = RenderText(self.Font, "Press SPACE on the ring timing", True, (240,240,240))
         self.Screen.blit(tip, tip.get_rect(center=(cx, cy - hit - 50)))
 
         if self.QtePressed and self.QteResult:
-            res = self.FontHuge.render(self.QteResult, True, (255,80,80) if self.QteResult=="Vital" else (255,235,80) if self.QteResult=="Crit" else (240,240,240))
+            res = RenderText(self.FontHuge, self.QteResult, True, (255,80,80) if self.QteResult=="Vital" else (255,235,80) if self.QteResult=="Crit" else (240,240,240))
             self.Screen.blit(res, res.get_rect(center=(cx, cy + hit + 55)))
 
     def DrawBattleEnd(self):
-        overlay = pygame.Surface((ScreenWidth, ScreenHeight), pygame.SRCALPHA)
-        overlay.fill((0,0,0,170))
-        self.Screen.blit(overlay, (0,0))
+        self.Screen.blit(GetOverlay(self.Screen.get_size(), (0,0,0,170)), (0,0))
 
         won = self.BattleRewards.get("PlayerWon", False)
-        title = self.FontHuge.render("Victory!" if won else "Defeat...", True, (240,240,240))
+        title = RenderText(self.FontHuge, "Victory!" if won else "Defeat...", True, (240,240,240))
         self.Screen.blit(title, title.get_rect(center=(ScreenWidth//2, 160)))
 
         if won:
@@ -1481,7 +1433,7 @@ class Game:
                 f"Gold Gained: {FormatNumber(gold)}",
                 "Loot:",
                 ]
-        confirm = self.Font.render("Press ENTER to return to Title", True, (240,240,240))
+        confirm = RenderText(self.Font, "Press ENTER to return to Title", True, (240,240,240))
         self.Screen.blit(confirm, confirm.get_rect(center=(ScreenWidth//2, 560)))
         
     # ============================================================
@@ -1510,6 +1462,7 @@ class Game:
         # Save db button
         if self.DevSaveRect().collidepoint(MousePos):
             self.SaveDatabase()
+            self.DevDifficulty = {}
             return
 
         # Left list selection area
@@ -1522,8 +1475,27 @@ class Game:
             idx = int((MousePos[1] - y0) // h)
             if 0 <= idx < len(names):
                 self.DevSelectedName = names[idx]
+                if self.DevTab == "Areas" and self.ActiveSave and names[idx] not in self.DevDifficulty:
+                    self.DevDifficulty[names[idx]] = self.AreaDifficultyLines(names[idx])
             return
 
+    def AreaDifficultyLines(self, AreaName: str) -> List[str]:
+        Lines = [f"Markov odds for {self.ActiveSave.get('Slot', 'current')} party:"]
+        try:
+            from .exact import SolveEncounter
+        except ImportError:
+            return Lines + ["  needs NumPy (pip install numpy)"]
+        for Name in self.AreasByName[AreaName].get("Encounters", []):
+            if Name not in self.EncountersByName:
+                continue
+            # lineups past the budget are turned away by their state bound, before any solving
+            R = SolveEncounter(self, Name, DevExactHpLevels, MaxStates=DevExactStateBudget)
+            if R is None:
+                Lines.append(f"  {Name}: too large for the readout (python -m game.exact / game.montecarlo)")
+            else:
+                Lines.append(f"  {Name}: win {R['WinProbability'] * 100:.1f}%, ~{R['ExpectedDuration']:.1f}s")
+        return Lines
+
     def DevCurrentNames(self) -> List[str]:
         if self.DevTab == "Entities":
             return [e["Name"] for e in self.EntitiesDb]
@@ -1537,31 +1509,32 @@ class Game:
             return sorted(list(self.BalanceDb.keys()))
         return []
 
+    def DevCacheStatsRect(self) -> pygame.Rect:
+        x = 20 + self.FontHuge.size("DEV MENU")[0] + 20
+        return pygame.Rect(x, 24, ScreenWidth - x - 20, self.FontSmall.get_linesize())
+
     def DrawDev(self):
         self.Screen.fill((10,10,12))
-        title = self.FontHuge.render("DEV MENU", True, (240,240,240))
+        title = RenderText(self.FontHuge, "DEV MENU", True, (240,240,240))
         self.Screen.blit(title, (20, 10))
+        C = SharedTextCache
+        # rendered fresh: the counters change every frame, and their region repaints with them
+        stats = self.FontSmall.render(f"Text cache: {len(C.Entries)} surfaces, {C.Hits} hits / {C.Misses} misses", True, (150,150,165))
+        self.Screen.blit(stats, self.DevCacheStatsRect().topleft)
 
         # Tabs
-        for i, tab in enumerate(self.DevTabs()):
-            r = self.DevTabRect(tab, i)
-            active = (tab == self.DevTab)
-            pygame.draw.rect(self.Screen, (40,40,50) if active else (28,28,34), r, border_radius=10)
-            pygame.draw.rect(self.Screen, (160,160,190) if active else (90,90,110), r, width=2, border_radius=10)
-            t = self.FontSmall.render(tab, True, (240,240,240))
-            self.Screen.blit(t, t.get_rect(center=r.center))
+        strip, layer = self.DevTabStrip()
+        self.Screen.blit(layer, strip)
 
         # Save button
         sb = self.DevSaveRect()
-        pygame.draw.rect(self.Screen, (40,40,50), sb, border_radius=10)
-        pygame.draw.rect(self.Screen, (160,160,190), sb, width=2, border_radius=10)
-        st = self.FontSmall.render("SAVE DB", True, (240,240,240))
+        DrawChrome(self.Screen, sb, (40,40,50), (160,160,190), 2, 10)
+        st = RenderText(self.FontSmall, "SAVE DB", True, (240,240,240))
         self.Screen.blit(st, st.get_rect(center=sb.center))
 
         # Left list
         list_rect = pygame.Rect(20, 110, 300, 580)
-        pygame.draw.rect(self.Screen, (18,18,22), list_rect, border_radius=14)
-        pygame.draw.rect(self.Screen, (120,120,140), list_rect, width=2, border_radius=14)
+        DrawChrome(self.Screen, list_rect, (18,18,22), (120,120,140), 2, 14)
 
         names = self.DevCurrentNames()
         y = list_rect.y + 10 - self.DevScroll
@@ -1570,16 +1543,15 @@ class Game:
             if rr.bottom >= list_rect.y and rr.top <= list_rect.bottom:
                 sel = (n == self.DevSelectedName)
                 pygame.draw.rect(self.Screen, (40,40,50) if sel else (26,26,30), rr, border_radius=8)
-                txt = self.FontSmall.render(n, True, (240,240,240))
+                txt = RenderText(self.FontSmall, n, True, (240,240,240))
                 self.Screen.blit(txt, txt.get_rect(midleft=(rr.x + 8, rr.centery)))
             y += 26
 
         # Right editor area (placeholder but functional tab switching)
         editor = pygame.Rect(340, 110, 920, 580)
-        pygame.draw.rect(self.Screen, (18,18,22), editor, border_radius=14)
-        pygame.draw.rect(self.Screen, (120,120,140), editor, width=2, border_radius=14)
+        DrawChrome(self.Screen, editor, (18,18,22), (120,120,140), 2, 14)
 
-        hdr = self.Font.render(f"{self.DevTab} Editor", True, (240,240,240))
+        hdr = RenderText(self.Font, f"{self.DevTab} Editor", True, (240,240,240))
         self.Screen.blit(hdr, (editor.x + 14, editor.y + 12))
 
         # Basic content view so you can verify tabs work
@@ -1599,13 +1571,19 @@ class Game:
                     lines = json.dumps(data, indent=2, ensure_ascii=False).splitlines()
                     # moved up so bottom doesn't overflow as much
                     for line in lines[:26]:
-                        s = self.FontSmall.render(line[:120], True, (220,220,220))
+                        s = RenderText(self.FontSmall, line[:120], True, (220,220,220))
+                        self.Screen.blit(s, (editor.x + 14, y))
+                        y += 18
+                if self.DevTab == "Areas":
+                    y += 10
+                    for line in self.DevDifficulty.get(self.DevSelectedName, ["Load a save to see exact odds."]):
+                        s = RenderText(self.FontSmall, line, True, (200,220,160))
                         self.Screen.blit(s, (editor.x + 14, y))
                         y += 18
         else:
             # Balance keys list
             for k in sorted(self.BalanceDb.keys()):
-                s = self.FontSmall.render(f"{k}: {self.BalanceDb[k]}", True, (220,220,220))
+                s = RenderText(self.FontSmall, f"{k}: {self.BalanceDb[k]}", True, (220,220,220))
                 self.Screen.blit(s, (editor.x + 14, y))
                 y += 18
                 if y > editor.bottom - 20:
@@ -0,0 +1,301 @@
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .battle import BattleEngine
+from .data_loader import CreateDefaultData
+from .entities import StatNames
+from .sim import MaxBattleSeconds, MakeSimEngine
+from .utils import *
+
+# Columns of the per-combatant stat matrix (StatNames order)
+VitCol, PowCol, DexCol, PrecCol = (StatNames.index(S) for S in ("Vitality", "Power", "Dexterity", "Precision"))
+Outcomes = ["Miss", "Hit", "Crit", "Vital"]
+
+KindCodes = {"Attack": 0, "Heal": 1, "Defend": 2, "Buff": 3, "Passive": 4}
+TargetCodes = {"Enemy Single": 0, "Ally Single": 1, "Self": 2}
+
+
+def PowRatioArray(Attacker: np.ndarray, Defender: np.ndarray) -> np.ndarray:
+    Safe = np.where(Defender <= 0, 1.0, Defender)
+    return np.where(Defender <= 0, 1.0, (Attacker / Safe) ** 0.75)
+
+
+def RoundTenthsArray(X: np.ndarray) -> np.ndarray:
+    # np.round rounds half to even, like the builtin round() in RoundTenths
+    return np.round(X * 10.0) / 10.0
+
+
+def PickMasked(Mask: np.ndarray, U: np.ndarray) -> np.ndarray:
+    """Uniformly pick one True column per row (rows with no True column get 0)."""
+    Counts = Mask.sum(axis=1)
+    Pick = np.floor(U * Counts).astype(np.int64)
+    return np.argmax(np.cumsum(Mask, axis=1) > Pick[:, None], axis=1)
+
+
+class EncounterBatch:
+    """Every trial of one encounter as (Trials, Combatants) arrays.
+
+    Rules mirror BattleEngine with the headless auto-player policy, advanced in
+    event time (each trial jumps to its next actor) rather than on the frame grid.
+    """
+
+    def __init__(self, Engine: BattleEngine, EncounterName: str):
+        Encounter = Engine.EncountersByName[EncounterName]
+        self.EncounterName = EncounterName
+
+        Players, Enemies = Engine.MakeEncounterParties(Encounter)
+        All = Players + Enemies
+        self.Entities = All
+
+        C = len(All)
+        self.IsPlayer = np.array([E.Team == "Player" for E in All])
+        self.Stats = np.array([[E.Stat(S) for S in StatNames] for E in All], dtype=np.float64)
+        self.MaxHp = np.array([E.MaxHp() for E in All], dtype=np.float64)
+        self.MaxMp = np.array([E.MaxMp() for E in All], dtype=np.float64)
+
+        # Ability table padded to K columns, plus column K = "Attack" (enemy MP fallback)
+        K = max(1, max(len(E.AbilityNames) for E in All))
+        self.K = K
+        self.AbCount = np.array([len(E.AbilityNames) for E in All], dtype=np.int64)
+        self.AbKind = np.full((C, K + 1), KindCodes["Passive"], dtype=np.int64)
+        self.AbTarget = np.zeros((C, K + 1), dtype=np.int64)
+        # Stat-changing buffs from Statuses.json; AbBuff holds 1 + the buff's index, 0 = no stat effect
+        Buffs = Engine.StatBuffs()
+        BuffCodes = {Name: b + 1 for b, (Name, _) in enumerate(Buffs)}
+        self.BuffMults = np.array([[Mults.get(S, 1.0) for S in StatNames] for _, Mults in Buffs]).reshape(len(Buffs), len(StatNames))
+        self.AbBuff = np.zeros((C, K + 1), dtype=np.int64)
+        self.AbMult = np.zeros((C, K + 1))
+        self.AbDelay = np.full((C, K + 1), BaselineAbilityDelay)
+        self.AbCost = np.zeros((C, K + 1))
+        for c, E in enumerate(All):
+            Names = list(E.AbilityNames) + [None] * (K - len(E.AbilityNames)) + ["Attack"]
+            for k, Name in enumerate(Names):
+                if Name is None:
+                    continue
+                A = Engine.GetAbility(Name)
+                self.AbKind[c, k] = KindCodes.get(A.Kind, KindCodes["Passive"])
+                self.AbTarget[c, k] = TargetCodes.get(A.Targeting, 0)
+                self.AbBuff[c, k] = BuffCodes.get(A.Name, 0)
+                self.AbMult[c, k] = A.Mult
+                self.AbDelay[c, k] = A.BaseDelay
+                self.AbCost[c, k] = Engine.ComputeMpCost(E, A)
+
+        AvgDex = self.Stats[:, DexCol].sum() / max(1, C)
+        DexRatio = PowRatioArray(self.Stats[:, DexCol], np.full(C, AvgDex))
+        self.StartTimes = RoundTenthsArray(np.maximum(0.5, 5.0 / np.maximum(0.15, DexRatio)))
+
+        self.QteMult = np.array([QteMultipliersAttack.get(O, 1.0) for O in Outcomes])
+        PlayerOdds = Engine.BalanceDb.get("Sim Player QTE Odds", SimPlayerQteProbabilities)
+        Odds = np.array([max(0.0, float(PlayerOdds.get(O, 0.0))) for O in Outcomes])
+        self.PlayerCdf = np.cumsum(Odds / max(1e-12, Odds.sum()))
+        Base = Engine.BalanceDb.get("Enemy QTE Baseline Attack", EnemyQteBaselineAttack)
+        self.EnemyBase = np.array([float(Base.get(O, 0.0)) for O in Outcomes])
+        self.EnemyShift = float(Engine.BalanceDb.get("Enemy QTE Shift Strength", EnemyQteShiftStrength))
+
+        self.WinXp = sum(Engine.XpForEnemy(E.Level) for E in Enemies)
+        self.WinGold = sum(Engine.GoldForEnemy(E.Level) for E in Enemies)
+        self.DropEntries = []  # (ItemName, Qty, Chance)
+        for E in Enemies:
+            self.DropEntries.extend(Engine.DropSamplerFor(E.Name).Entries)
+
+    def EnemyOutcomeCdf(self, PrecA: np.ndarray, PrecD: np.ndarray) -> np.ndarray:
+        # Array form of BattleEngine.EnemyVirtualQteAttack's probability shift
+        Shift = np.clip((PowRatioArray(PrecA, PrecD) - 1.0) * self.EnemyShift, -0.45, 0.45)
+        Probs = np.tile(self.EnemyBase, (Shift.size, 1))
+        Take = np.minimum(Probs[:, 1], np.abs(Shift))
+        Up = Shift > 0
+        Probs[:, 1] -= Take
+        Probs[:, 2] += np.where(Up, Take * 0.70, 0.0)
+        Probs[:, 3] += np.where(Up, Take * 0.30, 0.0)
+        Probs[:, 0] += np.where(Up, 0.0, Take)
+        Probs = np.maximum(0.0, Probs)
+        Probs /= np.maximum(1e-12, Probs.sum(axis=1, keepdims=True))
+        return np.cumsum(Probs, axis=1)
+
+    def BuffedStats(self, Buffs: np.ndarray, Rows: np.ndarray, c: np.ndarray) -> np.ndarray:
+        """(n, stats) effective stats of combatant c[r] in trial row r, like BattleEngine.EffectiveStat."""
+        Active = Buffs[Rows, c] > 0
+        return self.Stats[c] * np.where(Active[:, :, None], self.BuffMults[None, :, :], 1.0).prod(axis=1)
+
+    def Run(self, Trials: int, Rng: np.random.Generator, MaxTime: float=MaxBattleSeconds) -> Dict:
+        C = len(self.Entities)
+        IsPlayer = self.IsPlayer
+
+        Hp = np.tile(self.MaxHp, (Trials, 1))
+        Mp = np.tile(self.MaxMp, (Trials, 1))
+        Next = np.tile(self.StartTimes, (Trials, 1))
+        Alive = np.ones((Trials, C), dtype=bool)
+        Defend = np.zeros((Trials, C), dtype=np.int64)
+        Buffs = np.zeros((Trials, C, len(self.BuffMults)))  # seconds left per stat buff
+        Now = np.zeros(Trials)
+        Ids = np.arange(Trials)
+
+        Won = np.zeros(Trials, dtype=bool)
+        Duration = np.full(Trials, MaxTime)
+        Turns = 0
+
+        while Ids.size:
+            n = Ids.size
+            Rows = np.arange(n)
+
+            # Jump every trial to its own next actor
+            Masked = np.where(Alive, Next, np.inf)
+            a = np.argmin(Masked, axis=1)
+            T = Masked[Rows, a]
+            Elapsed = T - Now
+            Now = T
+            Buffs = np.maximum(0.0, Buffs - Elapsed[:, None, None])
+            Buffs[Buffs <= 1e-6] = 0.0
+
+            # Turn regen
+            RegenMult = np.where(Defend[Rows, a] > 0, DefendRegenMultiplier, 1.0)
+            Hp[Rows, a] = np.minimum(self.MaxHp[a], Hp[Rows, a] + self.MaxHp[a] * TurnRegenPercent * RegenMult)
+            Mp[Rows, a] = np.minimum(self.MaxMp[a], Mp[Rows, a] + self.MaxMp[a] * TurnRegenPercent * RegenMult)
+
+            # Ability choice: enemies roll any listed ability and fall back to Attack
+            # when short on MP; players roll among usable ones
+            ActorIsPlayer = IsPlayer[a]
+            Cols = np.arange(self.K + 1)
+            Cost = self.AbCost[a]
+            Usable = ((Cols[None, :] < self.AbCount[a][:, None])
+                      & (self.AbKind[a] != KindCodes["Passive"])
+                      & ((Cost <= 0) | (Mp[Rows, a][:, None] >= Cost)))
+            HasUsable = Usable.any(axis=1)
+            kPlayer = np.where(HasUsable, PickMasked(Usable, Rng.random(n)), self.K)
+            kEnemy = np.minimum(np.floor(Rng.random(n) * self.AbCount[a]).astype(np.int64), self.K - 1)
+            EnemyCost = Cost[Rows, kEnemy]
+            kEnemy = np.where((EnemyCost > 0) & (Mp[Rows, a] < EnemyCost), self.K, kEnemy)
+            k = np.where(ActorIsPlayer, kPlayer, kEnemy)
+
+            Kind = self.AbKind[a, k]
+            TargetCode = self.AbTarget[a, k]
+
+            # Target: random living opponent / ally, or self
+            SameSide = IsPlayer[None, :] == ActorIsPlayer[:, None]
+            OpponentMask = Alive & ~SameSide
+            AllyMask = Alive & SameSide
+            PickMask = np.where((TargetCode == TargetCodes["Ally Single"])[:, None], AllyMask, OpponentMask)
+            t = PickMasked(PickMask, Rng.random(n))
+            t = np.where(TargetCode == TargetCodes["Self"], a, t)
+
+            # MP cost; a failed spend still ends the turn
+            MpCost = self.AbCost[a, k]
+            Ok = (MpCost <= 0) | (Mp[Rows, a] >= MpCost)
+            Mp[Rows, a] -= np.where(Ok & (MpCost > 0), MpCost, 0.0)
+
+            # QTE outcome
+            StatsA = self.BuffedStats(Buffs, Rows, a)
+            StatsT = self.BuffedStats(Buffs, Rows, t)
+            Cdf = np.where(ActorIsPlayer[:, None], self.PlayerCdf[None, :],
+                           self.EnemyOutcomeCdf(StatsA[:, PrecCol], StatsT[:, PrecCol]))
+            Outcome = np.minimum((Cdf < Rng.random(n)[:, None]).sum(axis=1), len(Outcomes) - 1)
+            QteMult = self.QteMult[Outcome]
+
+            PowA = StatsA[:, PowCol]
+            PowT = StatsT[:, PowCol]
+            VitRatio = PowRatioArray(StatsA[:, VitCol], StatsT[:, VitCol])
+            Mult = self.AbMult[a, k]
+            Bonus = MpCost if AddMpCostToOutput else 0.0
+
+            IsAttack = Ok & (Kind == KindCodes["Attack"]) & Alive[Rows, t]
+            Damage = np.maximum(0.0, np.round(PowA / 5.0 * PowRatioArray(PowA, PowT) * QteMult * Mult + Bonus))
+            Damage *= np.where(Defend[Rows, t] > 0, DefendDamageTakenMultiplier, 1.0)
+            Hp[Rows, t] = np.where(IsAttack, np.maximum(0.0, Hp[Rows, t] - Damage), Hp[Rows, t])
+            Alive[Rows, t] &= ~(IsAttack & (Hp[Rows, t] <= 0))
+
+            IsHeal = Ok & (Kind == KindCodes["Heal"]) & Alive[Rows, t]
+            Heal = np.maximum(0.0, np.round(PowA / 5.0 * VitRatio * QteMult * Mult + Bonus))
+            Hp[Rows, t] = np.where(IsHeal, np.minimum(self.MaxHp[t], Hp[Rows, t] + Heal), Hp[Rows, t])
+
+            Defend[Rows, a] += (Ok & (Kind == KindCodes["Defend"])).astype(np.int64)
+
+            IsBuff = Ok & (Kind == KindCodes["Buff"])
+            BuffDuration = RoundTenthsArray(6.0 * VitRatio * QteMult)
+            Buff = self.AbBuff[a, k]
+            Gets = IsBuff & (Buff > 0)
+            Buffs[Rows[Gets], t[Gets], Buff[Gets] - 1] += BuffDuration[Gets]
+
+            # Schedule next action, then tick the actor's 1-turn statuses
+            DexRatio = PowRatioArray(StatsA[:, DexCol], StatsT[:, DexCol])
+            Delay = RoundTenthsArray(self.AbDelay[a, k] / np.maximum(0.15, DexRatio))
+            Next[Rows, a] = RoundTenthsArray(Now + Delay)
+            Defend[Rows, a] = np.maximum(0, Defend[Rows, a] - 1)
+            Turns += n
+
+            EnemiesDown = ~(Alive & ~IsPlayer[None, :]).any(axis=1)
+            PlayersDown = ~(Alive & IsPlayer[None, :]).any(axis=1)
+            Finished = EnemiesDown | PlayersDown | (Now >= MaxTime)
+            if Finished.any():
+                Done = Ids[Finished]
+                Won[Done] = EnemiesDown[Finished] & ~PlayersDown[Finished]
+                Duration[Done] = np.minimum(Now[Finished], MaxTime)
+                Keep = ~Finished
+                Ids = Ids[Keep]
+                Hp, Mp, Next, Alive = Hp[Keep], Mp[Keep], Next[Keep], Alive[Keep]
+                Defend, Buffs, Now = Defend[Keep], Buffs[Keep], Now[Keep]
+
+        return self.Summarize(Won, Duration, Turns, Rng)
+
+    def Summarize(self, Won: np.ndarray, Duration: np.ndarray, Turns: int, Rng: np.random.Generator) -> Dict:
+        Trials = Won.size
+        Wins = int(Won.sum())
+        WinRate = Wins / max(1, Trials)
+        WinTimes = Duration[Won]
+        Loot = {}
+        for ItemName, Qty, Chance in self.DropEntries:
+            Count = int((Rng.random(Wins) <= Chance).sum()) * Qty
+            Loot[ItemName] = Loot.get(ItemName, 0) + Count
+        return {
+            "Encounter": self.EncounterName,
+            "Trials": Trials,
+            "WinRate": WinRate,
+            "WinRate95": 1.96 * (WinRate * (1.0 - WinRate) / max(1, Trials)) ** 0.5,
+            "MeanTimeToKill": float(WinTimes.mean()) if Wins else float("nan"),
+            "MedianTimeToKill": float(np.median(WinTimes)) if Wins else float("nan"),
+            "MeanDuration": float(Duration.mean()),
+            "MedianDuration": float(np.median(Duration)),
+            "MeanXp": WinRate * self.WinXp,
+            "MeanGold": WinRate * self.WinGold,
+            "LootPerTrial": {K: V / max(1, Trials) for K, V in Loot.items()},
+            "Turns": Turns,
+        }
+
+
+def EvaluateEncounters(Trials: int=100_000, Seed: int=0, SlotName: str="Slot 1",
+                       EncounterNames: Optional[List[str]]=None, Engine: Optional[BattleEngine]=None) -> List[Dict]:
+    Engine = Engine or MakeSimEngine(SlotName)
+    Names = EncounterNames or [C["Name"] for C in Engine.EncountersDb]
+    Rng = np.random.default_rng(Seed)
+    return [EncounterBatch(Engine, Name).Run(Trials, Rng) for Name in Names]
+
+
+def main(argv=None):
+    Parser = argparse.ArgumentParser(prog="python -m game.montecarlo",
+                                     description="Batched Monte Carlo estimate of every encounter.")
+    Parser.add_argument("-n", "--trials", type=int, default=100_000)
+    Parser.add_argument("--seed", type=int, default=0)
+    Parser.add_argument("--slot", default="Slot 1")
+    Parser.add_argument("--encounter", action="append", help="limit to this encounter (repeatable)")
+    Args = Parser.parse_args(argv)
+
+    CreateDefaultData()
+
+    Start = time.perf_counter()
+    Results = EvaluateEncounters(Args.trials, Args.seed, Args.slot, Args.encounter)
+    Elapsed = time.perf_counter() - Start
+
+    for R in Results:
+        Loot = ", ".join(f"{K} {V:.3f}" for K, V in sorted(R["LootPerTrial"].items())) or "-"
+        print(f"{R['Encounter']}")
+        print(f"  Win rate:     {R['WinRate'] * 100:.2f}% (+/- {R['WinRate95'] * 100:.2f})")
+        print(f"  Time to kill: mean {R['MeanTimeToKill']:.1f}s, median {R['MedianTimeToKill']:.1f}s")
+        print(f"  Rewards:      {R['MeanXp']:.1f} XP, {R['MeanGold']:.1f} gold, loot/trial: {Loot}")
+    Trials = sum(R["Trials"] for R in Results)
+    print(f"{Trials} trials in {Elapsed:.2f}s ({Trials / max(1e-9, Elapsed):.0f} trials/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import bisect
+import random
+from typing import Dict, List, Tuple
+
+from .entities import Ability, BattleEntity
+from .utils import *
+
+
+class OutcomeCdf:
+    """QTE outcome odds as a cumulative table, sampled by bisection.
+
+    Picks the same outcome as BattleEngine.ChooseFromProbabilities for the same
+    roll (first cumulative value >= roll, else the last outcome).
+    """
+
+    __slots__ = ("Keys", "Cumulative")
+
+    def __init__(self, Odds: Dict[str, float]):
+        self.Keys: Tuple[str, ...] = tuple(Odds)
+        self.Cumulative: List[float] = []
+        Acc = 0.0
+        for V in Odds.values():
+            Acc += V
+            self.Cumulative.append(Acc)
+
+    def Pick(self, Roll: float) -> str:
+        i = bisect.bisect_left(self.Cumulative, Roll)
+        return self.Keys[i] if i < len(self.Keys) else self.Keys[-1]
+
+    def Sample(self, Rng: random.Random) -> str:
+        return self.Pick(Rng.random())
+
+    def SampleMany(self, Rng: random.Random, Count: int) -> List[str]:
+        Pick = self.Pick
+        Roll = Rng.random
+        return [Pick(Roll()) for _ in range(Count)]
+
+
+class ExpectedOutcomes:
+    """Expected damage / heal / buff seconds for every (caster, ability, target) of one battle.
+
+    Values come from BattleEngine.AbilityAmount (the ApplyAbility formulas)
+    averaged over the caster's QTE outcome odds. A caster's row is filled the
+    first time it is asked for and kept until one of its inputs changes: a
+    status change on an entity drops that entity's row and marks its column
+    stale in the rows already built, to be re-evaluated when that row is next
+    read, so no frame ever recomputes the table.
+    """
+
+    def __init__(self, Engine):
+        self.Engine = Engine
+        # caster row -> (caster, values, stale target row -> target)
+        self.Rows: Dict[int, Tuple[BattleEntity, Dict[Tuple[str, int], float], Dict[int, BattleEntity]]] = {}
+
+    def Reset(self):
+        self.Rows = {}
+
+    def Targets(self, Caster: BattleEntity, AbilityObj: Ability) -> List[BattleEntity]:
+        if AbilityObj.Targeting == "Self":
+            return [Caster]
+        if AbilityObj.Targeting == "Ally Single":
+            return self.Engine.PartyOf(Caster.Team)
+        return self.Engine.PartyOf("Enemy" if Caster.Team == "Player" else "Player")
+
+    def Evaluate(self, Caster: BattleEntity, AbilityObj: Ability, Target: BattleEntity) -> float:
+        Engine = self.Engine
+        MpCost = Engine.ComputeMpCost(Caster, AbilityObj)
+        Total = 0.0
+        for Outcome, P in Engine.QteOddsFor(Caster, Target).items():
+            Total += P * Engine.AbilityAmount(Caster, Target, AbilityObj, QteMultipliersAttack.get(Outcome, 1.0), MpCost)
+        if AbilityObj.Kind == "Attack":
+            Total *= Target.GetDefendMultipliers()[0]
+        return Total
+
+    def Row(self, Caster: BattleEntity) -> Dict[Tuple[str, int], float]:
+        Entry = self.Rows.get(Caster.Row)
+        if Entry is not None:
+            _, Values, Stale = Entry
+            if Stale:
+                for TargetRow, T in Stale.items():
+                    for Name in (*Caster.AbilityNames, "Attack"):
+                        Key = (Name, TargetRow)
+                        if Key in Values:
+                            Values[Key] = self.Evaluate(Caster, self.Engine.GetAbility(Name), T)
+                Stale.clear()
+            return Values
+        Values = {}
+        for Name in Caster.AbilityNames:
+            AObj = self.Engine.GetAbility(Name)
+            if AObj.Kind == "Passive":
+                continue
+            for T in self.Targets(Caster, AObj):
+                Values[(Name, T.Row)] = self.Evaluate(Caster, AObj, T)
+        self.Rows[Caster.Row] = (Caster, Values, {})
+        return Values
+
+    def Get(self, Caster: BattleEntity, AbilityObj: Ability, Target: BattleEntity) -> float:
+        Values = self.Row(Caster)
+        Key = (AbilityObj.Name, Target.Row)
+        Value = Values.get(Key)
+        if Value is None:
+            # e.g. the "Attack" fallback of a caster that doesn't list it
+            Value = Values[Key] = self.Evaluate(Caster, AbilityObj, Target)
+        return Value
+
+    def Invalidate(self, E: BattleEntity):
+        """E's stats or statuses changed: its row and column are rebuilt when next read."""
+        self.Rows.pop(E.Row, None)
+        for _, _, Stale in self.Rows.values():
+            Stale[E.Row] = E
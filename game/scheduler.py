@@ -0,0 +1,51 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from .entities import BattleEntity
+
+# Same tie-break as the old sort over PlayerParty + EnemyParty
+TeamOrder = {"Player": 0, "Enemy": 1}
+
+
+class TurnScheduler:
+    """Min-heap of combatants keyed by NextActionTime.
+
+    Entries are invalidated lazily: a reschedule pushes a fresh entry and bumps the
+    entity's sequence number, and dead or superseded entries are dropped when they
+    reach the top. Schedule is O(log n); Peek is O(1) once stale entries are gone.
+    """
+
+    def __init__(self):
+        self.Heap: List[Tuple] = []
+        self.Slots: Dict[int, Tuple[str, int]] = {}  # id(entity) -> (Team, Index)
+        self.Current: Dict[int, int] = {}  # id(entity) -> live sequence number
+        self.Seq = 0
+
+    def Reset(self, PlayerParty: List[BattleEntity], EnemyParty: List[BattleEntity]):
+        self.Heap = []
+        self.Slots = {}
+        self.Current = {}
+        for Team, Party in (("Player", PlayerParty), ("Enemy", EnemyParty)):
+            for i, E in enumerate(Party):
+                self.Slots[id(E)] = (Team, i)
+                self.Schedule(E)
+
+    def Schedule(self, E: BattleEntity):
+        Team, Index = self.Slots[id(E)]
+        self.Seq += 1
+        self.Current[id(E)] = self.Seq
+        heapq.heappush(self.Heap, (E.NextActionTime, TeamOrder[Team], Index, self.Seq, Team, E))
+
+    def Peek(self) -> Optional[Tuple[str, int, BattleEntity]]:
+        Heap = self.Heap
+        while Heap:
+            T, _, Index, Seq, Team, E = Heap[0]
+            if E.Alive and self.Current.get(id(E)) == Seq:
+                if E.NextActionTime == T:
+                    return (Team, Index, E)
+                # NextActionTime was assigned without a reschedule; requeue at the real time
+                heapq.heappop(Heap)
+                self.Schedule(E)
+                continue
+            heapq.heappop(Heap)
+        return None
@@ -0,0 +1,110 @@
+import argparse
+import copy
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from .battle import BattleEngine
+from .data_loader import CreateDefaultData
+from .utils import FramesPerSecond
+
+# Safety cap so a stalemate (e.g. both sides out of MP and healing) still ends
+MaxBattleSeconds = 600.0
+
+
+def MakeSimEngine(SlotName: str="Slot 1") -> BattleEngine:
+    """Engine with an in-memory copy of the save; nothing is written to disk."""
+    Engine = BattleEngine(AutoPersist=False)
+    Engine.ActiveSave = Engine.LoadSave(SlotName) or Engine.NewSaveData(SlotName)
+    return Engine
+
+
+def RunBattle(Engine: BattleEngine, Seed, BaseSave: Dict, EncounterName: Optional[str]=None,
+              Dt: Optional[float]=None, MaxTime: float=MaxBattleSeconds, EventSkip: bool=True) -> Dict:
+    # Dt defaults at call time, so a swept FramesPerSecond takes effect
+    if Dt is None:
+        Dt = 1.0 / FramesPerSecond
+    Engine.Rng.seed(Seed)
+    Engine.ActiveSave = copy.deepcopy(BaseSave)
+    if EncounterName:
+        Engine.StartBattle(EncounterName)
+    else:
+        Engine.StartBattleFromArea()
+
+    Steps = 0
+    while Engine.SubMode != "Battle End" and Engine.BattleTime < MaxTime:
+        if EventSkip:
+            Engine.StepEvent(Dt, Limit=MaxTime)
+        else:
+            Engine.StepFrame(Dt)
+        Steps += 1
+
+    Rewards = Engine.BattleRewards
+    return {
+        "Encounter": Engine.EncounterName,
+        "PlayerWon": bool(Rewards.get("PlayerWon", False)),
+        "TimedOut": Engine.SubMode != "Battle End",
+        "BattleTime": Engine.BattleTime,
+        "Steps": Steps,
+        "TotalXp": Rewards.get("TotalXp", 0),
+        "TotalGold": Rewards.get("TotalGold", 0),
+        "Loot": list(Rewards.get("Loot", [])),
+    }
+
+
+def RunBattles(Count: int, Seed: int=0, SlotName: str="Slot 1", EncounterName: Optional[str]=None,
+               Dt: Optional[float]=None, EventSkip: bool=True) -> List[Dict]:
+    Engine = MakeSimEngine(SlotName)
+    BaseSave = Engine.ActiveSave
+    # Per-battle string seeds keep battle i reproducible regardless of Count
+    return [RunBattle(Engine, f"{Seed}:{i}", BaseSave, EncounterName, Dt, EventSkip=EventSkip) for i in range(Count)]
+
+
+def Summarize(Results: List[Dict]) -> Dict:
+    """Rates and averages over every battle; time to kill over won battles only (NaN without a win)."""
+    N = max(1, len(Results))
+    WinTimes = [r["BattleTime"] for r in Results if r["PlayerWon"]]
+    return {
+        "Battles": len(Results),
+        "WinRate": sum(r["PlayerWon"] for r in Results) / N,
+        "TimeoutRate": sum(r["TimedOut"] for r in Results) / N,
+        "AvgBattleTime": sum(r["BattleTime"] for r in Results) / N,
+        "MedianBattleTime": statistics.median(r["BattleTime"] for r in Results) if Results else float("nan"),
+        "MeanTimeToKill": statistics.fmean(WinTimes) if WinTimes else float("nan"),
+        "MedianTimeToKill": statistics.median(WinTimes) if WinTimes else float("nan"),
+        "AvgSteps": sum(r["Steps"] for r in Results) / N,
+        "AvgGold": sum(r["TotalGold"] for r in Results) / N,
+    }
+
+
+def main(argv=None):
+    Parser = argparse.ArgumentParser(prog="python -m game.sim", description="Run seeded headless battles.")
+    Parser.add_argument("-n", "--battles", type=int, default=1000)
+    Parser.add_argument("--seed", type=int, default=0)
+    Parser.add_argument("--slot", default="Slot 1")
+    Parser.add_argument("--encounter", default=None, help="fixed encounter name (default: roll from the save's area)")
+    Parser.add_argument("--fps", type=float, default=FramesPerSecond, help="simulated frame rate")
+    Parser.add_argument("--frame-step", action="store_true", help="step every frame instead of skipping to events")
+    Args = Parser.parse_args(argv)
+
+    CreateDefaultData()
+
+    Start = time.perf_counter()
+    Results = RunBattles(Args.battles, Args.seed, Args.slot, Args.encounter, 1.0 / Args.fps,
+                         EventSkip=not Args.frame_step)
+    Elapsed = time.perf_counter() - Start
+
+    S = Summarize(Results)
+    print(f"Battles:        {S['Battles']}")
+    print(f"Win rate:       {S['WinRate'] * 100:.1f}%")
+    print(f"Timeouts:       {S['TimeoutRate'] * 100:.1f}%")
+    print(f"Avg duration:   {S['AvgBattleTime']:.1f}s battle time")
+    print(f"Time to kill:   mean {S['MeanTimeToKill']:.1f}s, median {S['MedianTimeToKill']:.1f}s (won battles)")
+    print(f"Avg steps:      {S['AvgSteps']:.0f}")
+    print(f"Avg gold:       {S['AvgGold']:.1f}")
+    print(f"Elapsed:        {Elapsed:.2f}s")
+    print(f"Battles/sec:    {S['Battles'] / max(1e-9, Elapsed):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from . import utils
+from .data_loader import CreateDefaultData
+from .sim import MakeSimEngine, RunBattle, Summarize
+
+SweepCacheFolder = os.path.join(utils.CacheFolder, "Sweeps")
+
+# Bump when the cached result layout changes
+CacheVersion = 3
+
+
+def ParseValues(Spec: str) -> List:
+    """A JSON list is the values as given and any other JSON (e.g. an object for a dict-valued
+    Balance key) one value; otherwise "a,b,c" is a list and "start:stop:count" an inclusive linear range."""
+    try:
+        Value = json.loads(Spec)
+    except ValueError:
+        pass
+    else:
+        return Value if isinstance(Value, list) else [Value]
+    if ":" in Spec:
+        Start, Stop, Count = Spec.split(":")
+        Start, Stop, Count = float(Start), float(Stop), int(Count)
+        if Count <= 1:
+            return [Start]
+        return [Start + (Stop - Start) * i / (Count - 1) for i in range(Count)]
+    Values = []
+    for Part in Spec.split(","):
+        try:
+            Values.append(json.loads(Part))
+        except ValueError:
+            Values.append(Part)
+    return Values
+
+
+def ParseParam(Text: str) -> Tuple[str, List]:
+    Name, _, Spec = Text.partition("=")
+    if not Spec:
+        raise ValueError(f"expected NAME=VALUES, got {Text!r}")
+    return Name.strip(), ParseValues(Spec.strip())
+
+
+def IsModuleConstant(Name: str) -> bool:
+    # Balance.json keys have spaces ("Enemy QTE Shift Strength"); constants are capitalized
+    # numbers or strings, which leaves out helpers and modules (Clamp, json)
+    return (Name.isidentifier() and Name[:1].isupper() and
+            isinstance(getattr(utils, Name, None), (int, float, str)))
+
+
+def CheckParamNames(Names) -> None:
+    """Raise ValueError for anything the headless evaluators would not read.
+
+    That is anything but a game.utils constant or a Balance key in SimBalanceKeys:
+    a typo, or a GUI-only key, would otherwise sweep to rows that differ only by noise.
+    """
+    for Name in Names:
+        if Name.isidentifier():
+            # catches typos like "TurnRegenPercnt" that would otherwise become a dead Balance key
+            if not IsModuleConstant(Name):
+                raise ValueError(f"{Name!r} is not a game.utils constant (Balance.json keys contain spaces)")
+        elif Name in utils.GuiBalanceKeys:
+            raise ValueError(f"{Name!r} is only read by the GUI; headless sweeps would not change with it")
+        elif Name not in utils.SimBalanceKeys:
+            raise ValueError(f"{Name!r} is not a Balance key the game reads; known keys: {', '.join(utils.SimBalanceKeys)}")
+
+
+def ApplyConstantOverrides(Overrides: Dict) -> Dict:
+    """Set game.utils constants everywhere they were star-imported; returns what was replaced.
+
+    Only reads at call time see the override, so game code must not bind these
+    constants as default argument values.
+    """
+    Previous = {}
+    Modules = [M for N, M in sys.modules.items() if M and (N == "game" or N.startswith("game."))]
+    for Name, Value in Overrides.items():
+        Previous[Name] = getattr(utils, Name)
+        for M in Modules:
+            if getattr(M, Name, None) is Previous[Name]:
+                setattr(M, Name, Value)
+    return Previous
+
+
+def RestoreConstants(Previous: Dict):
+    Modules = [M for N, M in sys.modules.items() if M and (N == "game" or N.startswith("game."))]
+    for Name, Value in Previous.items():
+        Current = getattr(utils, Name)
+        for M in Modules:
+            if getattr(M, Name, None) is Current:
+                setattr(M, Name, Value)
+
+
+def ContentHash(SlotName: str) -> str:
+    """Hash of everything a result depends on besides the swept parameters."""
+    H = hashlib.sha256()
+    Paths = sorted(glob.glob(os.path.join(utils.DataFolder, "*.json")))
+    Paths.append(os.path.join(utils.SavesFolder, SlotName, "Save.json"))
+    Paths += sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py")))
+    for Path in Paths:
+        H.update(os.path.basename(Path).encode())
+        if os.path.exists(Path):
+            with open(Path, "rb") as f:
+                H.update(f.read())
+    return H.hexdigest()
+
+
+def PointKey(Task: Dict) -> str:
+    Fields = {k: Task[k] for k in ("Params", "Seed", "Trials", "Evaluator", "Slot", "Encounters", "Content")}
+    Fields["Version"] = CacheVersion
+    return hashlib.sha256(json.dumps(Fields, sort_keys=True).encode()).hexdigest()
+
+
+def CachePath(Key: str) -> str:
+    return os.path.join(SweepCacheFolder, Key[:2], Key + ".json")
+
+
+def NameSeed(Name: str) -> int:
+    return int(hashlib.sha256(Name.encode()).hexdigest()[:16], 16)
+
+
+def EvaluatePoint(Task: Dict) -> Dict:
+    """Worker entry point: one grid point, every encounter."""
+    Params = Task["Params"]
+    Constants = {k: v for k, v in Params.items() if IsModuleConstant(k)}
+    Previous = ApplyConstantOverrides(Constants)
+    try:
+        Engine = MakeSimEngine(Task["Slot"])
+        for k, v in Params.items():
+            if k not in Constants:
+                Engine.BalanceDb[k] = v
+        Names = Task["Encounters"] or [C["Name"] for C in Engine.EncountersDb]
+
+        # Common random numbers: every point replays the same streams per (seed, encounter),
+        # so neighbouring points differ by their parameters, not by sampling noise
+        Results = {}
+        if Task["Evaluator"] == "montecarlo":
+            import numpy as np
+
+            from .montecarlo import EncounterBatch
+            for Name in Names:
+                Rng = np.random.default_rng(np.random.SeedSequence([Task["Seed"], NameSeed(Name)]))
+                R = EncounterBatch(Engine, Name).Run(Task["Trials"], Rng)
+                Results[Name] = {k: R[k] for k in ("WinRate", "MeanTimeToKill", "MedianTimeToKill", "MeanDuration", "MeanGold")}
+        else:
+            BaseSave = Engine.ActiveSave
+            for Name in Names:
+                Runs = [RunBattle(Engine, f"{Task['Seed']}:{Name}:{i}", BaseSave, Name)
+                        for i in range(Task["Trials"])]
+                S = Summarize(Runs)
+                Results[Name] = {"WinRate": S["WinRate"], "MeanTimeToKill": S["MeanTimeToKill"],
+                                 "MedianTimeToKill": S["MedianTimeToKill"], "MeanDuration": S["AvgBattleTime"],
+                                 "MeanGold": S["AvgGold"]}
+    finally:
+        RestoreConstants(Previous)
+
+    Out = {"Params": Params, "Results": Results}
+    Path = CachePath(Task["Key"])
+    utils.EnsureFolder(os.path.dirname(Path))
+    Tmp = f"{Path}.{os.getpid()}.tmp"
+    utils.SaveJson(Tmp, Out)
+    os.replace(Tmp, Path)
+    return Out
+
+
+def RunSweep(Grid: Dict[str, List], Trials: int=20_000, Seed: int=0, Evaluator: str="montecarlo",
+             SlotName: str="Slot 1", Encounters: Optional[List[str]]=None, Workers: Optional[int]=None,
+             Progress=None) -> List[Dict]:
+    CheckParamNames(Grid)
+
+    Content = ContentHash(SlotName)
+    Names = list(Grid.keys())
+    Tasks = []
+    for Values in itertools.product(*(Grid[n] for n in Names)):
+        Task = {
+            "Params": dict(zip(Names, Values)),
+            "Seed": Seed,
+            "Trials": Trials,
+            "Evaluator": Evaluator,
+            "Slot": SlotName,
+            "Encounters": Encounters or [],
+            "Content": Content,
+        }
+        Task["Key"] = PointKey(Task)
+        Tasks.append(Task)
+
+    Results: List[Optional[Dict]] = [None] * len(Tasks)
+    Pending = []
+    for i, Task in enumerate(Tasks):
+        Cached = utils.LoadJson(CachePath(Task["Key"]), None)
+        if Cached is not None:
+            Results[i] = Cached
+        else:
+            Pending.append(i)
+
+    if Progress:
+        Progress(f"{len(Tasks)} points, {len(Tasks) - len(Pending)} cached, {len(Pending)} to run")
+    if Pending:
+        with ProcessPoolExecutor(max_workers=Workers or os.cpu_count()) as Pool:
+            Futures = {Pool.submit(EvaluatePoint, Tasks[i]): i for i in Pending}
+            for Done, F in enumerate(as_completed(Futures), 1):
+                Results[Futures[F]] = F.result()
+                if Progress:
+                    Progress(f"  {Done}/{len(Pending)} {Tasks[Futures[F]]['Params']}")
+    return Results
+
+
+def main(argv=None):
+    Parser = argparse.ArgumentParser(
+        prog="python -m game.sweep",
+        description="Grid sweep over Balance.json keys and game.utils constants.",
+        epilog='example: -p "TurnRegenPercent=0.005:0.02:4" -p "Enemy QTE Shift Strength=0.2,0.35,0.5"',
+    )
+    Parser.add_argument("-p", "--param", action="append", required=True,
+                        help='NAME=a,b,c, NAME=start:stop:count or NAME=<JSON list of values> (repeatable)')
+    Parser.add_argument("-n", "--trials", type=int, default=20_000, help="trials per encounter per point")
+    Parser.add_argument("--seed", type=int, default=0)
+    Parser.add_argument("--slot", default="Slot 1")
+    Parser.add_argument("--encounter", action="append", help="limit to this encounter (repeatable)")
+    Parser.add_argument("--evaluator", choices=["montecarlo", "sim"], default="montecarlo")
+    Parser.add_argument("--workers", type=int, default=None, help="default: every core")
+    Parser.add_argument("--out", default=None, help="write all results to this JSON file")
+    Args = Parser.parse_args(argv)
+
+    CreateDefaultData()
+    Grid = dict(ParseParam(P) for P in Args.param)
+
+    Start = time.perf_counter()
+    Results = RunSweep(Grid, Args.trials, Args.seed, Args.evaluator, Args.slot, Args.encounter,
+                       Args.workers, Progress=print)
+    Elapsed = time.perf_counter() - Start
+
+    for R in Results:
+        Params = "  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in R["Params"].items())
+        Cells = "  ".join(f"{Name}: {V['WinRate'] * 100:.1f}% / {V['MeanDuration']:.1f}s" for Name, V in R["Results"].items())
+        print(f"{Params}  |  {Cells}")
+    print(f"Done in {Elapsed:.2f}s")
+
+    if Args.out:
+        utils.SaveJson(Args.out, Results)
+
+
+if __name__ == "__main__":
+    main()
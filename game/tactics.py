@@ -0,0 +1,193 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .scheduler import TeamOrder
+from .utils import *
+
+# Ability kinds the search plays. Buff needs live status bookkeeping the snapshot doesn't keep;
+# Defend lapses at the end of the turn it is used, so it only waits, and a depth cut-off
+# counted in turns rewards the quicker wait with an extra turn's regen that isn't there
+SearchedKinds = ("Attack", "Heal")
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class TacticalSnapshot:
+    """Plain-data copy of a battle that the tactical AI searches, safe off the main thread.
+
+    Per-outcome amounts and delays come from the engine's formulas at snapshot
+    time; statuses stay as they are then.
+    """
+
+    def __init__(self, Engine):
+        self.Entities = Engine.PlayerParty + Engine.EnemyParty
+        All = self.Entities
+        self.IsEnemy = [E.Team == "Enemy" for E in All]
+        self.TieKey = [(TeamOrder[E.Team], E.Slot) for E in All]
+        self.MaxHp = [E.MaxHp() for E in All]
+        self.MaxMp = [E.MaxMp() for E in All]
+        self.Regen = TurnRegenPercent
+        self.Time = Engine.BattleTime
+        self.Hp = tuple(E.CurrentHp if E.Alive else 0.0 for E in All)
+        self.Mp = tuple(E.CurrentMp for E in All)
+        self.Next = tuple(E.NextActionTime for E in All)
+
+        # Moves[i] = [(ability name, kind, MP cost, target indices)]
+        # Effects[(i, name, j)] = (delay, [(probability, amount)])
+        self.Moves: List[List[Tuple[str, str, float, Tuple[int, ...]]]] = []
+        self.Effects: Dict[Tuple[int, str, int], Tuple[float, List[Tuple[float, float]]]] = {}
+        Index = {E.Row: i for i, E in enumerate(All)}
+        for i, E in enumerate(All):
+            Moves = []
+            for Name in (*E.AbilityNames, "Attack"):
+                AObj = Engine.GetAbility(Name)
+                if AObj.Kind not in SearchedKinds or any(M[0] == Name for M in Moves):
+                    continue
+                Cost = Engine.ComputeMpCost(E, AObj)
+                if AObj.Targeting == "Self":
+                    Targets = [E]
+                else:
+                    Targets = Engine.Outcomes.Targets(E, AObj)
+                Targets = tuple(Index[T.Row] for T in Targets if T.Alive)
+                for j in Targets:
+                    T = All[j]
+                    DexRatio = PowRatio(Engine.EffectiveStat(E, "Dexterity"), Engine.EffectiveStat(T, "Dexterity"))
+                    Delay = RoundTenths(AObj.BaseDelay / max(0.15, DexRatio))
+                    Amounts: Dict[float, float] = {}
+                    for Outcome, P in Engine.QteOddsFor(E, T).items():
+                        A = Engine.AbilityAmount(E, T, AObj, QteMultipliersAttack.get(Outcome, 1.0), Cost)
+                        if AObj.Kind == "Attack":
+                            A *= T.GetDefendMultipliers()[0]
+                        Amounts[A] = Amounts.get(A, 0.0) + P
+                    self.Effects[(i, Name, j)] = (Delay, [(P, A) for A, P in Amounts.items() if P > 0] or [(1.0, 0.0)])
+                Moves.append((Name, AObj.Kind, Cost, Targets))
+            self.Moves.append(Moves)
+
+
+class TacticalSearch:
+    """Iterative-deepening expectiminimax for one enemy turn.
+
+    Enemy turns maximise and player turns minimise the evaluation, and each QTE
+    outcome is a chance node weighted by its odds. Every finished depth replaces
+    Best, so the search can be stopped at any moment (deadline or Stop()) and
+    still hand back the move of the deepest completed iteration.
+    """
+
+    def __init__(self, Snapshot: TacticalSnapshot, ActorIndex: int, MaxDepth: int, BudgetMs: Optional[float]=None):
+        self.Snapshot = Snapshot
+        self.ActorIndex = ActorIndex
+        self.MaxDepth = MaxDepth
+        self.BudgetMs = BudgetMs
+        self.Deadline = float("inf")
+        self.Best: Optional[Tuple[str, int]] = None  # (ability name, snapshot target index)
+        self.BestValue = 0.0
+        self.Depth = 0
+        self.Nodes = 0
+        self.Done = False
+        self.Cancelled = threading.Event()
+        self.Thread: Optional[threading.Thread] = None
+
+    # ---------------- Running ----------------
+
+    def Run(self):
+        if self.BudgetMs is not None:
+            self.Deadline = time.perf_counter() + self.BudgetMs / 1000.0
+        try:
+            for Depth in range(1, self.MaxDepth + 1):
+                Move, Value = self.SearchRoot(Depth)
+                if Move is None:
+                    break
+                self.Best, self.BestValue, self.Depth = Move, Value, Depth
+        except SearchTimeout:
+            pass
+        self.Done = True
+
+    def Start(self):
+        self.Thread = threading.Thread(target=self.Run, name="TacticalSearch", daemon=True)
+        self.Thread.start()
+
+    def Stop(self):
+        self.Cancelled.set()
+
+    def OutOfTime(self) -> bool:
+        return self.Cancelled.is_set() or time.perf_counter() >= self.Deadline
+
+    # ---------------- Search ----------------
+
+    def SearchRoot(self, Depth: int) -> Tuple[Optional[Tuple[str, int]], float]:
+        S = self.Snapshot
+        State = (S.Hp, S.Mp, S.Next)
+        Best, BestValue = None, float("-inf")
+        for Name, Kind, Cost, Targets in self.LegalMoves(State, self.ActorIndex):
+            for j in Targets:
+                Value = self.MoveValue(State, self.ActorIndex, Name, Kind, Cost, j, Depth)
+                if Value > BestValue:
+                    Best, BestValue = (Name, j), Value
+        return Best, BestValue
+
+    def LegalMoves(self, State, i: int):
+        Hp, Mp, _ = State
+        Moves = []
+        for Name, Kind, Cost, Targets in self.Snapshot.Moves[i]:
+            if Cost > 0 and Mp[i] < Cost:
+                continue
+            Alive = tuple(j for j in Targets if Hp[j] > 0)
+            if Alive:
+                Moves.append((Name, Kind, Cost, Alive))
+        return Moves
+
+    def MoveValue(self, State, i: int, Name: str, Kind: str, Cost: float, j: int, Depth: int) -> float:
+        Hp, Mp, Next = State
+        Delay, Outcomes = self.Snapshot.Effects[(i, Name, j)]
+        Mp = list(Mp)
+        Mp[i] -= Cost
+        Mp = tuple(Mp)
+        Next = list(Next)
+        Next[i] = RoundTenths(Next[i] + Delay)
+        Next = tuple(Next)
+        Total = 0.0
+        for P, Amount in Outcomes:
+            After = list(Hp)
+            if Kind == "Attack":
+                After[j] = max(0.0, After[j] - Amount)
+            else:
+                After[j] = min(self.Snapshot.MaxHp[j], After[j] + Amount)
+            Total += P * self.Value((tuple(After), Mp, Next), Depth - 1)
+        return Total
+
+    def Value(self, State, Depth: int) -> float:
+        self.Nodes += 1
+        if not self.Nodes & 255 and self.OutOfTime():
+            raise SearchTimeout()
+        S = self.Snapshot
+        Hp, Mp, Next = State
+        if Depth <= 0 or not any(h > 0 for h, e in zip(Hp, S.IsEnemy) if e) or not any(h > 0 for h, e in zip(Hp, S.IsEnemy) if not e):
+            return self.Evaluate(Hp)
+
+        # Next actor, with the scheduler's tie-break; its turn regen lands first
+        i = min((k for k in range(len(Hp)) if Hp[k] > 0), key=lambda k: (Next[k], S.TieKey[k]))
+        Hp = list(Hp)
+        Mp = list(Mp)
+        Hp[i] = min(S.MaxHp[i], Hp[i] + S.MaxHp[i] * S.Regen)
+        Mp[i] = min(S.MaxMp[i], Mp[i] + S.MaxMp[i] * S.Regen)
+        State = (tuple(Hp), tuple(Mp), Next)
+
+        Moves = self.LegalMoves(State, i)
+        if not Moves:
+            return self.Evaluate(State[0])
+        Values = [self.MoveValue(State, i, Name, Kind, Cost, j, Depth) for Name, Kind, Cost, Targets in Moves for j in Targets]
+        return max(Values) if S.IsEnemy[i] else min(Values)
+
+    def Evaluate(self, Hp) -> float:
+        # Living members count for one each plus their HP fraction; enemies want it high
+        S = self.Snapshot
+        Score = 0.0
+        for h, Max, IsEnemy in zip(Hp, S.MaxHp, S.IsEnemy):
+            if h <= 0:
+                continue
+            v = 1.0 + h / max(1.0, Max)
+            Score += v if IsEnemy else -v
+        return Score
@@ -0,0 +1,246 @@
+import argparse
+import copy
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from . import utils
+from .data_loader import CreateDefaultData
+from .entities import StatNames
+from .sim import MakeSimEngine, RunBattle, Summarize
+from .sweep import ApplyConstantOverrides, RestoreConstants
+
+# Balance.json keys the tuner may move, with (default, min, max)
+TunableBalance = {
+    "Enemy QTE Shift Strength": (utils.EnemyQteShiftStrength, 0.0, 1.0),
+}
+# Balance.json odds tables the tuner may move per outcome, with (default table, min, max) for each weight.
+# Readers normalize the table, so the weights need not sum to 1. "Sim Player QTE Odds" stays fixed:
+# it stands in for the player's presses, and moving it would fit the target without changing the game
+TunableOdds = {
+    "Enemy QTE Baseline Attack": (utils.EnemyQteBaselineAttack, 0.0, 1.0),
+}
+# game.utils constants the tuner may move, with (min, max); proposed values go to the report
+TunableConstants = {
+    "TurnRegenPercent": (0.0, 0.05),
+    "DefendRegenMultiplier": (1.0, 4.0),
+}
+WeightRange = (0.0, 3.0)
+
+TuningFolder = "Tuning"
+
+
+class SearchSpace:
+    """Maps a flat parameter vector to Balance.json keys and enemy Weights."""
+
+    def __init__(self, BalanceDb: Dict, EntitiesByName: Dict, EncountersDb: List[Dict]):
+        # ("Balance", key, "") | ("Odds", key, outcome) | ("Constant", name, "") | ("Weight", entity, stat)
+        self.Names: List[Tuple[str, str, str]] = []
+        self.Start: List[float] = []
+        self.Bounds: List[Tuple[float, float]] = []
+
+        for Key, (Default, Lo, Hi) in TunableBalance.items():
+            self.Names.append(("Balance", Key, ""))
+            self.Start.append(float(BalanceDb.get(Key, Default)))
+            self.Bounds.append((Lo, Hi))
+        for Key, (Default, Lo, Hi) in TunableOdds.items():
+            for Outcome, Value in BalanceDb.get(Key, Default).items():
+                self.Names.append(("Odds", Key, Outcome))
+                self.Start.append(float(Value))
+                self.Bounds.append((Lo, Hi))
+        for Name, (Lo, Hi) in TunableConstants.items():
+            self.Names.append(("Constant", Name, ""))
+            self.Start.append(float(getattr(utils, Name)))
+            self.Bounds.append((Lo, Hi))
+
+        Enemies = []
+        for C in EncountersDb:
+            for Entry in C.get("Enemy Party", []):
+                Name = Entry if isinstance(Entry, str) else Entry["Name"]
+                if Name not in Enemies:
+                    Enemies.append(Name)
+        for Name in Enemies:
+            Weights = EntitiesByName[Name].get("Weights", {})
+            for Stat in StatNames:
+                self.Names.append(("Weight", Name, Stat))
+                self.Start.append(float(Weights.get(Stat, 0.0)))
+                self.Bounds.append(WeightRange)
+
+    def Clip(self, X: List[float]) -> List[float]:
+        return [utils.Clamp(v, Lo, Hi) for v, (Lo, Hi) in zip(X, self.Bounds)]
+
+    def Apply(self, X: List[float], BalanceDb: Dict, EntitiesByName: Dict) -> Dict[str, float]:
+        """Write X into the databases; returns the game.utils constants, which have no data file."""
+        Constants = {}
+        for (Kind, Key, Stat), Value in zip(self.Names, X):
+            if Kind == "Balance":
+                BalanceDb[Key] = round(Value, 4)
+            elif Kind == "Odds":
+                BalanceDb[Key] = {**BalanceDb.get(Key, TunableOdds[Key][0]), Stat: round(Value, 4)}
+            elif Kind == "Constant":
+                Constants[Key] = round(Value, 6)
+            else:
+                EntitiesByName[Key].setdefault("Weights", {})[Stat] = round(Value, 4)
+        return Constants
+
+    def Describe(self, X: List[float]) -> Dict[str, float]:
+        return {(Key if Kind in ("Balance", "Constant") else f"{Key}.{Stat}"): round(V, 4)
+                for (Kind, Key, Stat), V in zip(self.Names, X)}
+
+
+def EncounterTargets(Encounter: Dict, DefaultWin: float, DefaultMedian: float) -> Tuple[float, float]:
+    # Encounters.json may pin its own targets; otherwise the CLI defaults apply
+    return (float(Encounter.get("Target Win Rate", DefaultWin)),
+            float(Encounter.get("Target Median Seconds", DefaultMedian)))
+
+
+def EvaluateCandidate(Task: Dict) -> Dict:
+    """Worker entry point: loss and per-encounter metrics for one parameter vector."""
+    Engine = MakeSimEngine(Task["Slot"])
+    Engine.EntitiesByName = copy.deepcopy(Engine.EntitiesByName)
+    Space = SearchSpace(Engine.BalanceDb, Engine.EntitiesByName, Engine.EncountersDb)
+    Previous = ApplyConstantOverrides(Space.Apply(Task["X"], Engine.BalanceDb, Engine.EntitiesByName))
+
+    # Both evaluators score the median length of every battle, won or not, so the
+    # loss stays continuous when a candidate's win rate reaches 0
+    Metrics = {}
+    Loss = 0.0
+    try:
+        if Task["Evaluator"] == "montecarlo":
+            import numpy as np
+
+            from .montecarlo import EncounterBatch
+            Rng = np.random.default_rng(Task["Seed"])
+        for C in Engine.EncountersDb:
+            Name = C["Name"]
+            if Task["Evaluator"] == "montecarlo":
+                R = EncounterBatch(Engine, Name).Run(Task["Trials"], Rng)
+                Win, Median = R["WinRate"], R["MedianDuration"]
+            else:
+                Runs = [RunBattle(Engine, f"{Task['Seed']}:{Name}:{i}", Engine.ActiveSave, Name)
+                        for i in range(Task["Trials"])]
+                S = Summarize(Runs)
+                Win, Median = S["WinRate"], S["MedianBattleTime"]
+            TargetWin, TargetMedian = EncounterTargets(C, Task["TargetWin"], Task["TargetMedian"])
+            Loss += (Win - TargetWin) ** 2 + Task["TimeWeight"] * ((Median - TargetMedian) / max(1e-6, TargetMedian)) ** 2
+            Metrics[Name] = {"WinRate": Win, "MedianSeconds": Median, "TargetWinRate": TargetWin, "TargetMedianSeconds": TargetMedian}
+    finally:
+        RestoreConstants(Previous)
+    return {"Loss": Loss / max(1, len(Engine.EncountersDb)), "Encounters": Metrics}
+
+
+def Tune(TargetWin: float=0.75, TargetMedian: float=20.0, TimeWeight: float=0.25, Trials: int=4000,
+         Population: int=8, MaxGenerations: int=40, Patience: int=6, Tolerance: float=1e-4, Sigma: float=0.15,
+         Seed: int=0, Evaluator: str="montecarlo", SlotName: str="Slot 1", Workers: Optional[int]=None,
+         Progress=None) -> Dict:
+    """(1, lambda) evolution strategy with 1/5th-rule step adaptation.
+
+    Every candidate in a generation shares one RNG seed (common random numbers),
+    so comparisons within a generation are not swamped by Monte Carlo noise.
+    """
+    Engine = MakeSimEngine(SlotName)
+    Space = SearchSpace(Engine.BalanceDb, Engine.EntitiesByName, Engine.EncountersDb)
+    Rng = random.Random(Seed)
+
+    def MakeTask(X, Gen):
+        return {"X": X, "Seed": Seed * 1_000_003 + Gen, "Trials": Trials, "Evaluator": Evaluator, "Slot": SlotName,
+                "TargetWin": TargetWin, "TargetMedian": TargetMedian, "TimeWeight": TimeWeight}
+
+    Best = Space.Clip(list(Space.Start))
+    History = []
+    Stale = 0
+    Start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=Workers or os.cpu_count()) as Pool:
+        BestEval = Pool.submit(EvaluateCandidate, MakeTask(Best, 0)).result()
+        History.append({"Generation": 0, "Loss": BestEval["Loss"], "Sigma": Sigma, "Seconds": 0.0})
+        if Progress:
+            Progress(f"gen 0: loss {BestEval['Loss']:.5f}")
+
+        for Gen in range(1, MaxGenerations + 1):
+            Candidates = [Best]  # re-score the incumbent on this generation's seed
+            for _ in range(Population):
+                Candidates.append(Space.Clip([v + Rng.gauss(0.0, Sigma * max(0.1, Hi - Lo))
+                                              for v, (Lo, Hi) in zip(Best, Space.Bounds)]))
+            Evals = list(Pool.map(EvaluateCandidate, [MakeTask(X, Gen) for X in Candidates]))
+
+            Incumbent = Evals[0]["Loss"]
+            i = min(range(len(Evals)), key=lambda j: Evals[j]["Loss"])
+            Successes = sum(E["Loss"] < Incumbent for E in Evals[1:])
+            Sigma *= 1.5 if Successes / Population > 0.2 else 0.82
+
+            Improved = i != 0 and Evals[i]["Loss"] < Incumbent - Tolerance
+            if Improved:
+                Best, BestEval = Candidates[i], Evals[i]
+                Stale = 0
+            else:
+                BestEval = Evals[0]
+                Stale += 1
+            History.append({"Generation": Gen, "Loss": BestEval["Loss"], "Sigma": Sigma,
+                            "Seconds": round(time.perf_counter() - Start, 2)})
+            if Progress:
+                Progress(f"gen {Gen}: loss {BestEval['Loss']:.5f} sigma {Sigma:.3f}{'' if Improved else ' (no gain)'}")
+
+            if BestEval["Loss"] <= Tolerance:
+                StopReason = "converged"
+                break
+            if Stale >= Patience:
+                StopReason = f"no improvement for {Patience} generations"
+                break
+        else:
+            StopReason = "generation limit"
+
+    BalanceDb = dict(Engine.BalanceDb)
+    EntitiesDb = copy.deepcopy(Engine.EntitiesDb)
+    Constants = Space.Apply(Best, BalanceDb, {E["Name"]: E for E in EntitiesDb})
+    return {
+        "StopReason": StopReason,
+        "Start": Space.Describe(Space.Start),
+        "Proposed": Space.Describe(Best),
+        "Final": BestEval,
+        "History": History,
+        "Balance": BalanceDb,
+        "Entities": EntitiesDb,
+        "Constants": Constants,
+    }
+
+
+def main(argv=None):
+    Parser = argparse.ArgumentParser(prog="python -m game.tune",
+                                     description="Search Balance.json and enemy Weights for target win rates.")
+    Parser.add_argument("--win", type=float, default=0.75, help="target win rate per encounter")
+    Parser.add_argument("--median", type=float, default=20.0, help="target median battle seconds")
+    Parser.add_argument("--time-weight", type=float, default=0.25, help="weight of the duration term in the loss")
+    Parser.add_argument("-n", "--trials", type=int, default=4000, help="trials per encounter per candidate")
+    Parser.add_argument("--population", type=int, default=8)
+    Parser.add_argument("--generations", type=int, default=40)
+    Parser.add_argument("--patience", type=int, default=6)
+    Parser.add_argument("--seed", type=int, default=0)
+    Parser.add_argument("--slot", default="Slot 1")
+    Parser.add_argument("--evaluator", choices=["montecarlo", "sim"], default="montecarlo")
+    Parser.add_argument("--workers", type=int, default=None)
+    Parser.add_argument("--out", default=TuningFolder, help="folder for the proposed files and report")
+    Args = Parser.parse_args(argv)
+
+    CreateDefaultData()
+    Result = Tune(Args.win, Args.median, Args.time_weight, Args.trials, Args.population, Args.generations,
+                  Args.patience, Seed=Args.seed, Evaluator=Args.evaluator, SlotName=Args.slot,
+                  Workers=Args.workers, Progress=print)
+
+    utils.EnsureFolder(Args.out)
+    utils.SaveJson(os.path.join(Args.out, "Balance.json"), Result["Balance"])
+    utils.SaveJson(os.path.join(Args.out, "Entities.json"), Result["Entities"])
+    Report = {k: Result[k] for k in ("StopReason", "Start", "Proposed", "Constants", "Final", "History")}
+    utils.SaveJson(os.path.join(Args.out, "Report.json"), Report)
+
+    print(f"Stopped: {Result['StopReason']}")
+    for Name, M in Result["Final"]["Encounters"].items():
+        print(f"  {Name}: win {M['WinRate'] * 100:.1f}% (target {M['TargetWinRate'] * 100:.0f}%), "
+              f"median {M['MedianSeconds']:.1f}s (target {M['TargetMedianSeconds']:.0f}s)")
+    print(f"Proposed files written to {Args.out}/ (copy into {utils.DataFolder}/ to adopt)")
+    print("Proposed game/utils.py constants: " + ", ".join(f"{k} = {v}" for k, v in Result["Constants"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,123 @@
-from typing import List, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import pygame
 
 from .utils import Clamp
 
+TextCacheSize = 2048
+ChromeCacheSize = 512
+
+FontPool: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+
+def GetFont(Name: Optional[str], Size: int) -> pygame.font.Font:
+    """One pygame Font per (file name, size), loaded on first use."""
+    Font = FontPool.get((Name, Size))
+    if Font is None:
+        Font = FontPool[(Name, Size)] = pygame.font.Font(Name, Size)
+    return Font
+
+
+OverlayPool: Dict[Tuple[Tuple[int, int], Tuple[int, int, int, int]], pygame.Surface] = {}
+
+
+def GetOverlay(Size: Tuple[int, int], Color) -> pygame.Surface:
+    """One translucent full-screen fill per (screen size, RGBA color), allocated on first use."""
+    Key = (tuple(Size), tuple(Color))
+    Surf = OverlayPool.get(Key)
+    if Surf is None:
+        Surf = OverlayPool[Key] = pygame.Surface(Size, pygame.SRCALPHA)
+        Surf.fill(Color)
+    return Surf
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, antialias, color).
+
+    Returned surfaces are shared between callers; blit them, don't draw on them.
+    """
+
+    def __init__(self, MaxEntries: int=TextCacheSize):
+        self.MaxEntries = MaxEntries
+        self.Entries: "OrderedDict[Tuple, pygame.Surface]" = OrderedDict()
+        self.Hits = 0
+        self.Misses = 0
+
+    def Render(self, Font: pygame.font.Font, Text: str, Antialias: bool, Color) -> pygame.Surface:
+        Key = (Font, Text, Antialias, tuple(Color))
+        Surf = self.Entries.get(Key)
+        if Surf is not None:
+            self.Hits += 1
+            self.Entries.move_to_end(Key)
+            return Surf
+        self.Misses += 1
+        Surf = Font.render(Text, Antialias, Color)
+        self.Entries[Key] = Surf
+        if len(self.Entries) > self.MaxEntries:
+            self.Entries.popitem(last=False)
+        return Surf
+
+    def Clear(self):
+        self.Entries.clear()
+
+
+SharedTextCache = TextCache()
+
+
+def RenderText(Font: pygame.font.Font, Text: str, Antialias: bool, Color) -> pygame.Surface:
+    """Font.render through the shared LRU cache."""
+    return SharedTextCache.Render(Font, Text, Antialias, Color)
+
+
+class ChromeCache:
+    """LRU cache of rounded-rect frames (fill plus optional outline) keyed by size, colors and radius.
+
+    A frame is rasterised once onto a transparent layer and blitted after that;
+    a layout or state change (new size, new border color) is a new key, so
+    nothing needs invalidating by hand.
+    """
+
+    def __init__(self, MaxEntries: int=ChromeCacheSize):
+        self.MaxEntries = MaxEntries
+        self.Entries: "OrderedDict[Tuple, pygame.Surface]" = OrderedDict()
+
+    def Layer(self, Size: Tuple[int, int], Fill, Border, Width: int, Radius: int) -> pygame.Surface:
+        Key = (Size, tuple(Fill), tuple(Border) if Border else None, Width, Radius)
+        Surf = self.Entries.get(Key)
+        if Surf is not None:
+            self.Entries.move_to_end(Key)
+            return Surf
+        Surf = pygame.Surface(Size, pygame.SRCALPHA)
+        Rect = Surf.get_rect()
+        pygame.draw.rect(Surf, Fill, Rect, border_radius=Radius)
+        if Border and Width:
+            pygame.draw.rect(Surf, Border, Rect, width=Width, border_radius=Radius)
+        self.Entries[Key] = Surf
+        if len(self.Entries) > self.MaxEntries:
+            self.Entries.popitem(last=False)
+        return Surf
+
+    def Clear(self):
+        self.Entries.clear()
+
+
+SharedChromeCache = ChromeCache()
+
+
+def ReleasePools():
+    """Drop every pooled font and surface; they belong to the pygame session that made them."""
+    FontPool.clear()
+    OverlayPool.clear()
+    SharedTextCache.Clear()
+    SharedChromeCache.Clear()
+
+
+def DrawChrome(Surface, Rect: pygame.Rect, Fill, Border=None, Width: int=0, Radius: int=0):
+    """Rounded-rect fill and outline in one blit from the shared chrome cache."""
+    if Rect.w > 0 and Rect.h > 0:
+        Surface.blit(SharedChromeCache.Layer(Rect.size, Fill, Border, Width, Radius), Rect)
+
 
 class Button:
     def __init__(self, Rect: pygame.Rect, Text: str):
@@ -12,9 +126,8 @@ class Button:
         self.Hovered = False
 
     def Draw(self, Surface, Font, Color=(235, 235, 235), HoverColor=(255, 255, 255)):
-        pygame.draw.rect(Surface, (40, 40, 40), self.Rect, border_radius=8)
-        pygame.draw.rect(Surface, (90, 90, 90), self.Rect, width=2, border_radius=8)
-        Txt = Font.render(self.Text, True, HoverColor if self.Hovered else Color)
+        DrawChrome(Surface, self.Rect, (40, 40, 40), (90, 90, 90), 2, 8)
+        Txt = RenderText(Font, self.Text, True, HoverColor if self.Hovered else Color)
         Surface.blit(Txt, Txt.get_rect(center=self.Rect.center))
 
     def HandleMotion(self, Pos):
@@ -24,6 +137,38 @@ class Button:
         return self.Rect.collidepoint(Pos)
 
 
+HitCellSize = 64
+
+
+class HitGrid:
+    """Uniform-grid index of rects for point queries.
+
+    A rect goes into the bucket of every cell it overlaps; a query scans one
+    bucket and returns the key of the earliest-added rect containing the point,
+    so add order is hit priority.
+    """
+
+    def __init__(self, CellSize: int=HitCellSize):
+        self.CellSize = CellSize
+        self.Cells: Dict[Tuple[int, int], List[Tuple[pygame.Rect, Any]]] = {}
+
+    def Add(self, Rect: pygame.Rect, Key: Any):
+        if Rect.w <= 0 or Rect.h <= 0:
+            return
+        C = self.CellSize
+        Entry = (Rect, Key)
+        for cx in range(Rect.left // C, (Rect.right - 1) // C + 1):
+            for cy in range(Rect.top // C, (Rect.bottom - 1) // C + 1):
+                self.Cells.setdefault((cx, cy), []).append(Entry)
+
+    def At(self, Pos) -> Optional[Any]:
+        C = self.CellSize
+        for Rect, Key in self.Cells.get((int(Pos[0]) // C, int(Pos[1]) // C), ()):
+            if Rect.collidepoint(Pos):
+                return Key
+        return None
+
+
 class Tooltip:
     def __init__(self):
         self.TextLines: List[str] = []
@@ -38,19 +183,26 @@ class Tooltip:
     def Hide(self):
         self.Visible = False
 
-    def Draw(self, Surface, Font):
+    Padding = 8
+
+    def Bounds(self, Surface, Font) -> Optional[pygame.Rect]:
         if not self.Visible or not self.TextLines:
-            return
-        Padding = 8
-        LineSurfs = [Font.render(L, True, (240, 240, 240)) for L in self.TextLines]
-        W = max(s.get_width() for s in LineSurfs) + Padding * 2
-        H = sum(s.get_height() for s in LineSurfs) + Padding * 2
+            return None
+        LineSurfs = [RenderText(Font, L, True, (240, 240, 240)) for L in self.TextLines]
+        W = max(s.get_width() for s in LineSurfs) + self.Padding * 2
+        H = sum(s.get_height() for s in LineSurfs) + self.Padding * 2
         X, Y = self.Pos
         X = Clamp(X + 16, 0, Surface.get_width() - W - 4)
         Y = Clamp(Y + 16, 0, Surface.get_height() - H - 4)
-        Rect = pygame.Rect(int(X), int(Y), int(W), int(H))
-        pygame.draw.rect(Surface, (18, 18, 18), Rect, border_radius=10)
-        pygame.draw.rect(Surface, (120, 120, 120), Rect, width=2, border_radius=10)
+        return pygame.Rect(int(X), int(Y), int(W), int(H))
+
+    def Draw(self, Surface, Font):
+        Rect = self.Bounds(Surface, Font)
+        if Rect is None:
+            return
+        Padding = self.Padding
+        LineSurfs = [RenderText(Font, L, True, (240, 240, 240)) for L in self.TextLines]
+        DrawChrome(Surface, Rect, (18, 18, 18), (120, 120, 120), 2, 10)
         Ty = Rect.y + Padding
         for S in LineSurfs:
             Surface.blit(S, (Rect.x + Padding, Ty))
@@ -12,8 +12,12 @@ ScreenWidth = 1280
 ScreenHeight = 720
 FramesPerSecond = 60
 
+# Repaint and push only the regions that changed (Game.Draw); False repaints and flips every frame
+DirtyRectRendering = True
+
 DataFolder = "Data"
 SavesFolder = "Saves"
+CacheFolder = "Cache"  # tool results (sweeps etc.), safe to delete
 
 FontName = None  # default pygame font
 
@@ -37,6 +41,45 @@ MpVitalityExponent = 0.50
 # Add MP cost to damage/heal (your rule)
 AddMpCostToOutput = True
 
+# QTE outcome multipliers (damage, heal and buff duration)
+QteMultipliersAttack = {"Miss": 0.5, "Hit": 1.0, "Crit": 1.5, "Vital": 2.0}
+
+# Enemy virtual QTE: baseline outcome odds, shifted by precision ratio
+EnemyQteBaselineAttack = {"Miss": 0.10, "Hit": 0.65, "Crit": 0.18, "Vital": 0.07}
+EnemyQteShiftStrength = 0.35
+
+# Headless simulation: stand-in odds for the player's QTE presses
+SimPlayerQteProbabilities = {"Miss": 0.05, "Hit": 0.55, "Crit": 0.28, "Vital": 0.12}
+
+# Expert enemy AI: search depth in turns, and how long the GUI lets it think per enemy turn
+# (Balance "Enemy AI Budget Ms" overrides). Headless runs search a fixed depth so seeds stay reproducible
+EnemyAiBudgetMs = 30.0
+EnemyAiMaxDepth = 8
+EnemyAiSimDepth = 2
+EnemyAiMaxCombatants = 8
+
+# Balance.json keys the game reads, each with a built-in default when missing (sweeps reject anything else).
+# The headless sim and Monte Carlo evaluators read only SimBalanceKeys; the rest shape the GUI's QTE and AI
+SimBalanceKeys = (
+    "Enemy QTE Shift Strength",
+    "Enemy QTE Baseline Attack",
+    "Sim Player QTE Odds",
+)
+GuiBalanceKeys = (
+    "Precision Ratio Clamp Min",
+    "Precision Ratio Clamp Max",
+    "QTE Vital Zone Min Width",
+    "QTE Crit Zone Min Width",
+    "QTE Ring Speed",
+    "Enemy AI Budget Ms",
+)
+BalanceKeys = SimBalanceKeys + GuiBalanceKeys
+
+# Dev menu odds readout (game.exact): solved on click, so the budget keeps it to milliseconds
+# (1v1 lineups; the stock 2v2 encounters need tens of thousands of states and are refused)
+DevExactHpLevels = 4
+DevExactStateBudget = 1_000
+
 # ============================================================
 # Helpers
 # ============================================================
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from game.battle import BattleEngine
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.chdir(Root)
+    Engine = BattleEngine(Seed=1, AutoPersist=False)
+    Engine.ActiveSave = Engine.NewSaveData("Test")
+    return Engine
+
+
+def test_ally_without_usable_ability_stays_scheduled(engine):
+    engine.StartBattle("Field Encounter 1")
+    Ally = engine.PlayerParty[0]
+    Ally.AbilityNames = ("Quick Jab",)
+    Ally.CurrentMp = 0
+    engine.BattleTime = Ally.NextActionTime
+
+    assert not engine.AutoPlayerTurn(Ally)
+    assert Ally.NextActionTime > engine.BattleTime
+    Live = engine.Scheduler.Current[id(Ally)]
+    assert any(Entry[-1] is Ally and Entry[3] == Live for Entry in engine.Scheduler.Heap)
+
+
+def test_visual_bars_animate_only_rows_in_motion(engine):
+    engine.StartBattle("Field Encounter 1")
+    Hit, Other = engine.PlayerParty[0], engine.PlayerParty[1]
+    Before = Hit.CurrentHp
+    Hit.TakeDamage(Before / 2)
+    Other.CurrentHp -= 1  # changed without an animation: the bar just follows
+
+    engine.BattleState.TickVisualBars(0.01)
+    assert Hit.CurrentHp < Hit.LagHp < Before
+    assert Other.LagHp == Other.CurrentHp
+
+    for _ in range(300):
+        engine.BattleState.TickVisualBars(0.01)
+    assert Hit.LagHp == Hit.CurrentHp
+    assert not engine.BattleState.Animating["Hp"]
+
+
+
+def test_statuses_expire_from_their_heaps(engine):
+    engine.StartBattle("Field Encounter 1")
+    Actor, Target = engine.PlayerParty[0], engine.EnemyParty[0]
+    engine.AddTimedBuff(Actor, "Focus (Precision +25%)", 3.0)
+    engine.AddTimedBuff(Actor, "Focus (Precision +25%)", 2.0)  # extends to 5s
+    engine.ApplyAbility(Actor, Actor, engine.GetAbility("Defend"), "Hit")
+    assert engine.StatusTurnsLeft(Actor, Actor.Statuses[-1]) == 1
+
+    engine.BattleTime = 4.9
+    engine.ExpireTimedBuffs()
+    assert [S.Name for S in Actor.Statuses] == ["Focus (Precision +25%)", "Defend"]
+    assert engine.StatusSecondsLeft(Actor.Statuses[0]) == pytest.approx(0.1)
+
+    # Defend lapses at the end of the turn it is used
+    engine.CompleteActionAndScheduleNext(Actor, Target, engine.GetAbility("Defend"))
+    assert not Actor.HasStatus("Defend")
+    engine.BattleTime = 5.0
+    engine.ExpireTimedBuffs()
+    assert Actor.Statuses == []
+    assert Actor.StatusMultipliers == {}
@@ -0,0 +1,34 @@
+import random
+
+from game.battlestate import AliveIndex, BattleState
+
+
+def test_alive_index_matches_brute_force():
+    Rng = random.Random(11)
+    Index = AliveIndex()
+    Flags = []
+    for _ in range(300):
+        Alive = Rng.random() < 0.7
+        Flags.append(Alive)
+        Index.Append(Alive)
+    for _ in range(2000):
+        Slot = Rng.randrange(len(Flags))
+        Flags[Slot] = Rng.random() < 0.5
+        Index.Set(Slot, Flags[Slot])
+        Alive = [i for i, f in enumerate(Flags) if f]
+        assert Index.Count == len(Alive)
+        Probe = Rng.randrange(len(Flags))
+        assert Index.Rank(Probe) == sum(Flags[:Probe])
+        if Alive:
+            k = Rng.randrange(len(Alive))
+            assert Index.Kth(k) == Alive[k]
+
+
+def test_rows_are_tracked_per_team():
+    State = BattleState()
+    Rows = [State.Allocate(Team) for Team in ("Player", "Enemy", "Enemy", "Player", "Enemy")]
+    assert [Slot for _, Slot in Rows] == [0, 0, 1, 1, 2]
+    State.SetAlive(Rows[2][0], False)
+    assert State.AliveCount("Enemy") == 2
+    assert State.AliveCount("Player") == 2
+    assert State.Teams["Enemy"].Kth(1) == 2
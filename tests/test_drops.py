@@ -0,0 +1,45 @@
+import random
+
+from game.drops import DropSampler
+
+Table = [
+    {"Item": "Potion", "Quantity": 1, "Chance Numerator": 1, "Chance Denominator": 4},
+    {"Item": "Ether", "Quantity": 2, "Chance Numerator": 1, "Chance Denominator": 10},
+    {"Item": "Iron Sword", "Quantity": 1, "Chance Numerator": 1, "Chance Denominator": 50},
+]
+
+
+def test_alias_table_reproduces_joint_drop_odds():
+    Sampler = DropSampler(Table)
+    Sampler.BuildAlias()
+    Count = len(Sampler.Prob)
+    assert Count == 8
+    # each cell's mass: its own keep share plus what other cells alias over to it
+    Mass = [0.0] * Count
+    for i, (P, A) in enumerate(zip(Sampler.Prob, Sampler.Alias)):
+        Mass[i] += P / Count
+        Mass[A] += (1.0 - P) / Count
+    for m in range(Count):
+        Expected = 1.0
+        for k, (_, _, Chance) in enumerate(Sampler.Entries):
+            Expected *= Chance if m >> k & 1 else 1.0 - Chance
+        assert abs(Mass[m] - Expected) < 1e-12
+
+
+def test_roll_many_matches_expected_counts():
+    Kills = 200_000
+    Totals = DropSampler(Table).RollMany(random.Random(3), Kills)
+    for Entry in Table:
+        Mean = Kills * Entry["Quantity"] * Entry["Chance Numerator"] / Entry["Chance Denominator"]
+        Sd = Entry["Quantity"] * (Mean * Entry["Quantity"]) ** 0.5
+        assert abs(Totals.get(Entry["Item"], 0) - Mean) < 5 * Sd
+
+
+def test_roll_keeps_one_draw_per_entry():
+    Rng, Replay = random.Random(5), random.Random(5)
+    Sampler = DropSampler(Table)
+    for _ in range(1000):
+        Rolls = [Replay.random() for _ in Table]
+        Expected = [(E["Item"], E["Quantity"]) for E, R in zip(Table, Rolls)
+                    if R <= E["Chance Numerator"] / E["Chance Denominator"]]
+        assert Sampler.Roll(Rng) == Expected
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from game import main as GameMain
+from game.tactics import TacticalSearch
+
+
+@pytest.fixture
+def game(monkeypatch):
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    G = GameMain.Game()
+    G.AutoPersist = False
+    G.ActiveSave = G.NewSaveData("Test")
+    G.ActiveSave["Options"]["Difficulty"] = "Expert"
+    yield G
+    pygame.quit()
+
+
+def test_unfinished_search_falls_back_to_a_random_move(game, monkeypatch):
+    # a search that runs out of budget before finishing depth 1
+    def Start(self):
+        self.Done = True
+    monkeypatch.setattr(TacticalSearch, "Start", Start)
+    monkeypatch.setattr(TacticalSearch, "Run", lambda self: pytest.fail("searched on the frame"))
+
+    game.Mode = "Battle"
+    game.StartBattle("Field Encounter 1")
+    Enemy = game.EnemyParty[0]
+    game.BattleTime = Enemy.NextActionTime
+    game.FreezeForTurn("Enemy", 0)
+    assert game.TacticalAiApplies()
+
+    game.Tick(1.0 / 60.0)
+    assert game.SubMode == "Free"
+    assert game.EnemySearch is None
+    assert Enemy.NextActionTime > game.BattleTime
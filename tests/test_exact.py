@@ -0,0 +1,44 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from game import exact
+from game.battle import BattleEngine
+from game.utils import DevExactHpLevels, DevExactStateBudget
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.chdir(Root)
+    monkeypatch.setattr(exact, "SolveCache", {})
+    Engine = BattleEngine(AutoPersist=False)
+    Engine.ActiveSave = Engine.NewSaveData("Test")
+    Engine.ActiveSave["Party"] = [{"Name": "Rogue", "Level": 6, "Xp": 0}]
+    Engine.EncountersByName["Duel"] = {"Name": "Duel", "Enemy Party": ["Goblin"]}
+    return Engine
+
+
+def Solve(Engine, Name="Duel"):
+    return exact.SolveEncounter(Engine, Name, DevExactHpLevels, MaxStates=DevExactStateBudget)
+
+
+def test_dev_readout_budget_answers_1v1_in_milliseconds_and_refuses_2v2(engine):
+    Start = time.perf_counter()
+    R = Solve(engine)
+    assert R is not None and 0.0 <= R["WinProbability"] <= 1.0
+    engine.ActiveSave["Party"] = engine.NewSaveData("Test")["Party"]
+    assert Solve(engine, "Field Encounter 2") is None
+    assert time.perf_counter() - Start < 0.5
+
+
+def test_cache_misses_after_data_edits(engine):
+    Before = Solve(engine)
+    assert Solve(engine) == Before
+    engine.EntitiesByName["Goblin"]["Weights"] = dict(engine.EntitiesByName["Goblin"]["Weights"], Power=0.9)
+    After = Solve(engine)
+    assert After["WinProbability"] < Before["WinProbability"]
@@ -0,0 +1,26 @@
+import random
+
+from game import inventory
+from game.inventory import InventoryIndex
+
+
+def test_sorted_view_matches_a_full_sort(monkeypatch):
+    monkeypatch.setattr(inventory, "BlockLoad", 4)  # small blocks, so splits and emptied blocks happen
+    Rng = random.Random(23)
+    ItemsByName = {f"Item {i}": {"Value": Rng.randrange(1, 50)} for i in range(300)}
+    Items = [{"Name": f"Item {i}", "Amount": Rng.randrange(1, 5)} for i in range(40)]
+    Model = InventoryIndex(Items, ItemsByName)
+
+    def Expected():
+        Order = sorted(range(len(Items)), key=lambda i: -Model.StackValue(Items[i]))  # stable, like the old panel
+        return [Items[i] for i in Order]
+
+    for _ in range(1500):
+        Model.Add(f"Item {Rng.randrange(300)}", Rng.randrange(-2, 6))
+        if Rng.random() < 0.05:
+            assert list(Model.View) == Expected()
+            Probe = Rng.randrange(len(Items))
+            assert Model.View[Probe] is Expected()[Probe]
+    assert [Model.View[i] for i in range(len(Model.View))] == Expected()
+    assert len(Model.View) == len(Items) == len(Model.Slots)
+    assert len(Model.View.Keys) > 1
@@ -0,0 +1,58 @@
+import os
+import random
+
+import pytest
+
+from game.battle import BattleEngine
+from game.outcomes import OutcomeCdf
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.chdir(Root)
+    Engine = BattleEngine(Seed=1, AutoPersist=False)
+    Engine.ActiveSave = Engine.NewSaveData("Test")
+    Engine.StartBattle("Field Encounter 1")
+    return Engine
+
+
+def test_status_change_marks_column_stale_until_read(engine, monkeypatch):
+    Player, Enemy = engine.PlayerParty[0], engine.EnemyParty[0]
+    Attack = engine.GetAbility("Attack")
+    Before = engine.Outcomes.Get(Player, Attack, Enemy)
+
+    Calls = []
+    Evaluate = engine.Outcomes.Evaluate
+    monkeypatch.setattr(engine.Outcomes, "Evaluate", lambda *a: Calls.append(a) or Evaluate(*a))
+    engine.ApplyAbility(Enemy, Enemy, engine.GetAbility("Defend"), "Hit")
+    assert not Calls
+
+    After = engine.Outcomes.Get(Player, Attack, Enemy)
+    assert After < Before
+    assert After == pytest.approx(Evaluate(Player, Attack, Enemy))
+    Seen = len(Calls)
+    engine.Outcomes.Get(Player, Attack, Enemy)
+    assert len(Calls) == Seen
+
+
+def test_outcome_cdf_picks_like_a_linear_scan():
+    Odds = {"Miss": 0.1, "Hit": 0.5, "Crit": 0.3, "Vital": 0.1}
+    Cdf = OutcomeCdf(Odds)
+
+    def Scan(Roll):
+        Acc = 0.0
+        for K, V in Odds.items():
+            Acc += V
+            if Roll <= Acc:
+                return K
+        return list(Odds)[-1]
+
+    Rolls = [i / 1000 for i in range(1001)] + [0.1, 0.6, 0.9, 1.0 - 1e-12]
+    assert [Cdf.Pick(R) for R in Rolls] == [Scan(R) for R in Rolls]
+    Counts = {K: 0 for K in Odds}
+    for K in Cdf.SampleMany(random.Random(1), 100_000):
+        Counts[K] += 1
+    for K, P in Odds.items():
+        assert abs(Counts[K] / 100_000 - P) < 0.01
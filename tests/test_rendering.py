@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from game import main as GameMain
+
+
+@pytest.fixture
+def game(monkeypatch):
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    monkeypatch.setattr(GameMain, "DirtyRectRendering", True)
+    G = GameMain.Game()
+    G.AutoPersist = False
+    G.ActiveSave = G.NewSaveData("Test")
+    yield G
+    pygame.quit()
+
+
+def test_dirty_rect_frames_match_full_repaint(game):
+    Frames = Mismatched = 0
+    for Battle, Encounter in enumerate(["Field Encounter 1", "Field Encounter 2"]):
+        game.Rng.seed(Battle)
+        game.Mode = "Battle"
+        game.StartBattle(Encounter)
+        game.ForceRedraw = True
+        for E in game.PlayerParty:
+            E.AutoControl = True  # no input in a test; allies play themselves
+        while game.SubMode != "Battle End" and Frames < 4000:
+            game.Tick(1.0 / 60.0)
+            game.Draw()
+            Dirty = pygame.image.tobytes(game.Screen, "RGB")
+            game.DrawFrame()
+            Mismatched += Dirty != pygame.image.tobytes(game.Screen, "RGB")
+            Frames += 1
+    assert Frames > 100
+    assert Mismatched == 0
+
+
+def test_dirty_rects_merge_only_when_they_overlap():
+    R = pygame.Rect
+    Merged = GameMain.Game.MergeOverlapping([R(0, 0, 10, 10), R(500, 500, 10, 10), R(8, 8, 10, 10), R(15, 0, 100, 5)])
+    assert sorted(map(tuple, Merged)) == [(0, 0, 115, 18), (500, 500, 10, 10)]
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from game.battle import BattleEngine
+from game.sim import RunBattle
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# RunBattle(Engine, f"7:{i}", level-4 party) for i in 0..11: (encounter, won, time, steps, gold, loot).
+# Recorded with the sorted-scan turn order and per-entity fields, before the heap scheduler and
+# the BattleState columns; both reproduce it exactly, so drift here is a change in rules or RNG use.
+Golden = [
+    ("Field Encounter 1", True, 55.1, 93, 54, []),
+    ("Field Encounter 1", False, 44.8, 73, 0, []),
+    ("Field Encounter 2", False, 12.1, 17, 0, []),
+    ("Field Encounter 2", False, 9.9, 12, 0, []),
+    ("Field Encounter 2", False, 13.0, 17, 0, []),
+    ("Field Encounter 1", True, 23.8, 33, 54, [("Potion", 1)]),
+    ("Field Encounter 2", False, 9.6, 12, 0, []),
+    ("Field Encounter 1", False, 54.0, 84, 0, []),
+    ("Field Encounter 1", True, 27.9, 43, 54, []),
+    ("Field Encounter 1", True, 27.2, 41, 54, [("Potion", 1)]),
+    ("Field Encounter 2", False, 13.2, 15, 0, []),
+    ("Field Encounter 2", False, 9.7, 10, 0, []),
+]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.chdir(Root)
+    return BattleEngine(AutoPersist=False)
+
+
+@pytest.fixture
+def save(engine):
+    Save = engine.NewSaveData("Test")
+    for P in Save["Party"]:
+        P["Level"] = 4
+    return Save
+
+
+def Row(r):
+    return (r["Encounter"], r["PlayerWon"], round(r["BattleTime"], 6), r["Steps"], r["TotalGold"], r["Loot"])
+
+
+def test_seeded_battles_match_golden(engine, save):
+    assert [Row(RunBattle(engine, f"7:{i}", save)) for i in range(len(Golden))] == Golden
+
+
+
+def test_event_skip_matches_frame_stepping(engine, save):
+    for i in range(12):
+        Skip = RunBattle(engine, f"skip:{i}", save)
+        Frames = RunBattle(engine, f"skip:{i}", save, EventSkip=False)
+        assert Skip["Steps"] <= Frames["Steps"]
+        Skip["Steps"] = Frames["Steps"]
+        assert Skip == Frames
+
+
+def test_heap_scheduler_matches_sorted_scan(engine, save, monkeypatch):
+    def SortedNextActor(self):
+        # the pre-heap GetNextActor: every living combatant, sorted by next action time
+        Candidates = [("Player", i, e) for i, e in enumerate(self.PlayerParty) if e.Alive]
+        Candidates += [("Enemy", i, e) for i, e in enumerate(self.EnemyParty) if e.Alive]
+        if not Candidates:
+            return None
+        Candidates.sort(key=lambda t: t[2].NextActionTime)
+        if Candidates[0][2].NextActionTime <= self.BattleTime + 1e-6:
+            return Candidates[0]
+        return None
+
+    Heap = [RunBattle(engine, f"heap:{i}", save, EventSkip=False) for i in range(12)]
+    monkeypatch.setattr(BattleEngine, "GetNextActor", SortedNextActor)
+    Sorted = [RunBattle(engine, f"heap:{i}", save, EventSkip=False) for i in range(12)]
+    assert Heap == Sorted
@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from game import sweep
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.chdir(Root)
+    monkeypatch.setattr(sweep, "SweepCacheFolder", str(tmp_path))
+    # points run in this process, so they see the patched cache folder
+    monkeypatch.setattr(sweep, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return tmp_path
+
+
+def test_parse_values():
+    assert sweep.ParseValues("1,2,3") == [1, 2, 3]
+    assert sweep.ParseValues("0.1:0.3:3") == pytest.approx([0.1, 0.2, 0.3])
+    assert sweep.ParseValues("0.5") == [0.5]
+    assert sweep.ParseValues('{"Hit": 0.8, "Crit": 0.2}') == [{"Hit": 0.8, "Crit": 0.2}]
+    assert sweep.ParseValues('[{"Hit": 1.0}, {"Crit": 1.0}]') == [{"Hit": 1.0}, {"Crit": 1.0}]
+
+
+def test_names_the_evaluators_would_not_read_are_rejected(cache):
+    with pytest.raises(ValueError, match="TurnRegenPercnt"):
+        sweep.RunSweep({"TurnRegenPercnt": [0.01]}, Trials=2, Evaluator="sim")
+    with pytest.raises(ValueError, match="Enemy QTE Shift Strenght"):
+        sweep.CheckParamNames(["Enemy QTE Shift Strenght"])
+    with pytest.raises(ValueError, match="only read by the GUI"):
+        sweep.CheckParamNames(["QTE Ring Speed"])
+    for Name in ("Clamp", "json", "os"):
+        with pytest.raises(ValueError):
+            sweep.CheckParamNames([Name])
+    sweep.CheckParamNames(["TurnRegenPercent", "Enemy QTE Shift Strength", "Sim Player QTE Odds"])
+
+
+def test_points_share_random_numbers(cache):
+    # ScreenWidth is a constant battles never read, so under common random numbers the points match
+    Results = sweep.RunSweep({"ScreenWidth": [1280, 1281]}, Trials=10, Evaluator="sim")
+    assert Results[0]["Results"] == Results[1]["Results"]
+
+
+def test_finished_points_are_served_from_cache(cache):
+    Grid = {"TurnRegenPercent": [0.01, 0.02], "Enemy QTE Shift Strength": [0.35]}
+    Log = []
+    First = sweep.RunSweep(Grid, Trials=3, Evaluator="sim", Encounters=["Field Encounter 1"], Progress=Log.append)
+    assert Log[0] == "2 points, 0 cached, 2 to run"
+    assert len(list(cache.rglob("*.json"))) == 2
+
+    Log.clear()
+    Grid["TurnRegenPercent"].append(0.03)
+    Second = sweep.RunSweep(Grid, Trials=3, Evaluator="sim", Encounters=["Field Encounter 1"], Progress=Log.append)
+    assert Log[0] == "3 points, 2 cached, 1 to run"
+    assert Second[:2] == First
+    # a different seed is a different point
+    Log.clear()
+    sweep.RunSweep(Grid, Trials=3, Seed=1, Evaluator="sim", Encounters=["Field Encounter 1"], Progress=Log.append)
+    assert Log[0] == "3 points, 0 cached, 3 to run"
@@ -0,0 +1,51 @@
+import copy
+import os
+
+import pytest
+
+from game import tune, utils
+from game.sim import MakeSimEngine, MaxBattleSeconds
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.chdir(Root)
+    return MakeSimEngine("Slot 1")
+
+
+def test_search_space_covers_odds_and_constants(engine):
+    Space = tune.SearchSpace(engine.BalanceDb, engine.EntitiesByName, engine.EncountersDb)
+    Kinds = {Kind for Kind, _, _ in Space.Names}
+    assert {"Balance", "Odds", "Constant", "Weight"} <= Kinds
+
+    X = list(Space.Start)
+    i = Space.Names.index(("Odds", "Enemy QTE Baseline Attack", "Crit"))
+    X[i] = 0.5
+    X[Space.Names.index(("Constant", "TurnRegenPercent", ""))] = 0.02
+    BalanceDb = {}
+    Constants = Space.Apply(X, BalanceDb, copy.deepcopy(engine.EntitiesByName))
+    assert Constants["TurnRegenPercent"] == 0.02
+    assert BalanceDb["Enemy QTE Baseline Attack"]["Crit"] == 0.5
+    assert utils.EnemyQteBaselineAttack["Crit"] == 0.18
+
+
+def test_candidate_scores_median_of_every_battle_and_restores_constants(engine):
+    Space = tune.SearchSpace(engine.BalanceDb, engine.EntitiesByName, engine.EncountersDb)
+    X = list(Space.Start)
+    X[Space.Names.index(("Constant", "TurnRegenPercent", ""))] = 0.0
+    # enemies this strong win every battle, where time to kill would be undefined
+    for i, (Kind, _, Stat) in enumerate(Space.Names):
+        if Kind == "Weight" and Stat in ("Vitality", "Power"):
+            X[i] = 3.0
+    Task = {"X": X, "Seed": 0, "Trials": 4, "Evaluator": "sim", "Slot": "Slot 1",
+            "TargetWin": 0.75, "TargetMedian": 20.0, "TimeWeight": 0.25}
+    R = tune.EvaluateCandidate(Task)
+    for M in R["Encounters"].values():
+        assert M["WinRate"] == 0.0
+        assert 0.0 < M["MedianSeconds"] < MaxBattleSeconds
+    assert R["Loss"] == R["Loss"]
+    assert utils.TurnRegenPercent == 0.01
+    from game import entities
+    assert entities.TurnRegenPercent == 0.01